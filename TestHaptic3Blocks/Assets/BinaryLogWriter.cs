@@ -0,0 +1,118 @@
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Text;
+
+// Fixed-record binary session log, read by binary_log.py.
+// Layout (little-endian): "HLOG", version u16, flags u16, metadata length u32,
+// record size u32, record count u64, JSON metadata padded to 8 bytes, then
+// record count x columns float32 values. Text columns hold category codes.
+public class BinaryLogWriter : IDisposable
+{
+    const ushort Version = 1;
+    const ushort FlagClosed = 1;
+    const int FlagsOffset = 6;
+    const int CountOffset = 16;
+    const int HeaderSize = 24;
+
+    private readonly FileStream stream;
+    private readonly BinaryWriter writer;
+    private readonly string[] columns;
+    private readonly Dictionary<string, string[]> categories;
+    private readonly int flushEvery;
+    private ulong recordCount = 0;
+    private int pending = 0;
+
+    public BinaryLogWriter(string path, string kind, string[] columns,
+                           Dictionary<string, string[]> categories, int flushEvery = 50)
+    {
+        this.columns = columns;
+        this.categories = categories;
+        this.flushEvery = flushEvery;
+
+        byte[] meta = Encoding.UTF8.GetBytes(BuildMetadata(kind));
+        int padding = (8 - (HeaderSize + meta.Length) % 8) % 8;
+
+        stream = new FileStream(path, FileMode.Create, FileAccess.Write, FileShare.Read);
+        writer = new BinaryWriter(stream);
+        writer.Write(Encoding.ASCII.GetBytes("HLOG"));
+        writer.Write(Version);
+        writer.Write((ushort)0);
+        writer.Write((uint)(meta.Length + padding));
+        writer.Write((uint)(columns.Length * sizeof(float)));
+        writer.Write((ulong)0);
+        writer.Write(meta);
+        for (int i = 0; i < padding; i++)
+            writer.Write((byte)' ');
+        writer.Flush();
+    }
+
+    public int ColumnCount => columns.Length;
+
+    string BuildMetadata(string kind)
+    {
+        var sb = new StringBuilder();
+        sb.Append("{\"kind\": \"").Append(kind).Append("\", \"columns\": [");
+        sb.Append(string.Join(", ", Array.ConvertAll(columns, c => "\"" + c + "\"")));
+        sb.Append("], \"categories\": {");
+        bool first = true;
+        foreach (var kvp in categories)
+        {
+            if (!first) sb.Append(", ");
+            first = false;
+            sb.Append("\"").Append(kvp.Key).Append("\": [");
+            sb.Append(string.Join(", ", Array.ConvertAll(kvp.Value, v => "\"" + v + "\"")));
+            sb.Append("]");
+        }
+        sb.Append("}}");
+        return sb.ToString();
+    }
+
+    // Category code of a text value, -1 when it is not declared
+    public float CategoryCode(string column, string value)
+    {
+        return Array.IndexOf(categories[column], value ?? "");
+    }
+
+    public void Append(float[] record)
+    {
+        if (record.Length != columns.Length)
+            throw new ArgumentException($"Expected {columns.Length} values, got {record.Length}");
+
+        // BinaryWriter always writes little-endian
+        for (int i = 0; i < record.Length; i++)
+            writer.Write(record[i]);
+        recordCount++;
+        if (++pending >= flushEvery)
+            Flush();
+    }
+
+    // Records first, then the count, so readers never see a count ahead of the data
+    public void Flush(ushort flags = 0)
+    {
+        writer.Flush();
+        long end = stream.Position;
+        stream.Seek(CountOffset, SeekOrigin.Begin);
+        writer.Write(recordCount);
+        if (flags != 0)
+        {
+            stream.Seek(FlagsOffset, SeekOrigin.Begin);
+            writer.Write(flags);
+        }
+        writer.Flush();
+        stream.Seek(end, SeekOrigin.Begin);
+        pending = 0;
+    }
+
+    public void Close()
+    {
+        if (!stream.CanWrite) return;
+        Flush(FlagClosed);
+        writer.Close();
+    }
+
+    public void Dispose()
+    {
+        Close();
+    }
+}
@@ -43,6 +43,8 @@ public class ExperimentDataCollector : MonoBehaviour
     public float samplingRate = 0.02f; // 50Hz
     public float forceSamplingRate = 0.016f; // 60Hz for force sampling
     public bool autoStartRecording = false;
+    [Tooltip("Also write experiment_session_<id>.hlog, a fixed-record float32 log (see binary_log.py)")]
+    public bool writeBinaryLog = false;
 
     [Header("Experimental Parameters")]
     public float targetRotation = 0f;
@@ -64,6 +66,19 @@ public class ExperimentDataCollector : MonoBehaviour
     private string dataPath;
     private StreamWriter writer;
     private StreamWriter contactWriter;
+    private BinaryLogWriter binaryLog;
+    private float[] binaryRecord;
+
+    private static readonly string[] SessionColumns = {
+        "TaskTime", "BoxRotation", "RotationError", "BoxPosX", "BoxPosY", "BoxPosZ",
+        "BoxAngVelX", "BoxAngVelY", "BoxAngVelZ",
+        "Robot1PosX", "Robot1PosY", "Robot1PosZ", "Robot2PosX", "Robot2PosY", "Robot2PosZ",
+        "Robot1Speed", "Robot2Speed", "RobotDistanceDiff",
+        "HapticPosX", "HapticPosY", "HapticPosZ",
+        "HapticForceX", "HapticForceY", "HapticForceZ", "ForceMagnitude",
+        "IsInContact", "ContactType", "ContactDuration", "Phase",
+        "CumulativeError", "StabilityMetric"
+    };
 
     // Performance metrics
     private float totalRotationError = 0f;
@@ -116,6 +131,19 @@ public class ExperimentDataCollector : MonoBehaviour
         contactWriter = new StreamWriter(contactFilename, false);
         
         WriteHeaders();
+
+        if (writeBinaryLog)
+        {
+            var categories = new Dictionary<string, string[]>
+            {
+                { "ContactType", new[] { "", "box", "robot1", "robot2" } },
+                { "Phase", new[] { "initialization", "stable_contact", "correction", "release" } }
+            };
+            string binaryFilename = Path.Combine(dataPath, $"experiment_session_{sessionID}.hlog");
+            binaryLog = new BinaryLogWriter(binaryFilename, "experiment_session", SessionColumns,
+                                            categories, Mathf.Max(1, Mathf.RoundToInt(1f / samplingRate)));
+            binaryRecord = new float[SessionColumns.Length];
+        }
         
         Debug.Log($"Started recording session: {sessionID} at time: {experimentStartTime}");
     }
@@ -123,16 +151,7 @@ public class ExperimentDataCollector : MonoBehaviour
     void WriteHeaders()
     {
         // Main experiment data header
-        writer.WriteLine(
-            "TaskTime,BoxRotation,RotationError,BoxPosX,BoxPosY,BoxPosZ," +
-            "BoxAngVelX,BoxAngVelY,BoxAngVelZ," +
-            "Robot1PosX,Robot1PosY,Robot1PosZ,Robot2PosX,Robot2PosY,Robot2PosZ," +
-            "Robot1Speed,Robot2Speed,RobotDistanceDiff," +
-            "HapticPosX,HapticPosY,HapticPosZ," +
-            "HapticForceX,HapticForceY,HapticForceZ,ForceMagnitude," +
-            "IsInContact,ContactType,ContactDuration,Phase," +
-            "CumulativeError,StabilityMetric"
-        );
+        writer.WriteLine(string.Join(",", SessionColumns));
 
         // Contact data header
         contactWriter.WriteLine(
@@ -361,6 +380,28 @@ public class ExperimentDataCollector : MonoBehaviour
             totalRotationError / (rotationErrorSamples > 0 ? rotationErrorSamples : 1),
             stabilityMetric
         ));
+
+        if (binaryLog != null)
+        {
+            float[] r = binaryRecord;
+            r[0] = currentTaskTime;
+            r[1] = boxRotation; r[2] = rotationError;
+            r[3] = boxPosition.x; r[4] = boxPosition.y; r[5] = boxPosition.z;
+            r[6] = boxAngularVelocity.x; r[7] = boxAngularVelocity.y; r[8] = boxAngularVelocity.z;
+            r[9] = robot1Position.x; r[10] = robot1Position.y; r[11] = robot1Position.z;
+            r[12] = robot2Position.x; r[13] = robot2Position.y; r[14] = robot2Position.z;
+            r[15] = robot1Speed; r[16] = robot2Speed; r[17] = robotDistance;
+            r[18] = hapticPosition.x; r[19] = hapticPosition.y; r[20] = hapticPosition.z;
+            r[21] = hapticForce.x; r[22] = hapticForce.y; r[23] = hapticForce.z;
+            r[24] = forceMagnitude;
+            r[25] = isInContact ? 1f : 0f;
+            r[26] = binaryLog.CategoryCode("ContactType", currentContactType);
+            r[27] = currentDuration;
+            r[28] = binaryLog.CategoryCode("Phase", phase);
+            r[29] = totalRotationError / (rotationErrorSamples > 0 ? rotationErrorSamples : 1);
+            r[30] = stabilityMetric;
+            binaryLog.Append(r);
+        }
     }
 
     private string UpdateExperimentPhase(float boxRotation, float rotationError)
@@ -406,6 +447,12 @@ public class ExperimentDataCollector : MonoBehaviour
             contactWriter.Close();
             contactWriter = null;
         }
+
+        if (binaryLog != null)
+        {
+            binaryLog.Close();
+            binaryLog = null;
+        }
         
         Debug.Log($"Stopped recording session: {sessionID}");
     }
@@ -0,0 +1,198 @@
+import argparse
+import contextlib
+import glob
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from figure_export import DEFAULT_PROFILES, PROFILES, output_path
+
+SESSION_PATTERN = 'experiment_session_*.csv'
+
+# Figure templates of this worker process, reused across its tasks
+_templates = None
+
+
+def find_sessions(inputs):
+    """Expand directories and glob patterns into a sorted list of session CSVs"""
+    sessions = set()
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            sessions.update(path.glob(SESSION_PATTERN))
+        else:
+            sessions.update(Path(p) for p in glob.glob(item))
+    return sorted(p for p in sessions if p.is_file())
+
+
+def output_files(output_dir, csv_file, name, profiles=DEFAULT_PROFILES):
+    """Files written for one (session, figure) pair, one per export profile"""
+    session_dir = Path(output_dir) / Path(csv_file).stem
+    return [output_path(session_dir, name, profile, profiles) for profile in profiles]
+
+
+def is_up_to_date(targets, sources):
+    """True when every target exists and is newer than every source file"""
+    if not all(target.exists() for target in targets):
+        return False
+    target_mtime = min(target.stat().st_mtime for target in targets)
+    return all(target_mtime >= Path(src).stat().st_mtime for src in sources)
+
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def _load_plotter(csv_file, use_cache, columns=None):
+    from experiment_plotter import ExperimentPlotter
+    # Keep the per-session event printout out of the batch log
+    with contextlib.redirect_stdout(io.StringIO()):
+        return ExperimentPlotter(csv_file, use_cache=use_cache, columns=columns)
+
+
+def warm_session(csv_file, use_cache):
+    """Parse a session once so the figure tasks all hit the cache"""
+    start = time.perf_counter()
+    _load_plotter(csv_file, use_cache)
+    return time.perf_counter() - start
+
+
+def render_figure(csv_file, name, session_dir, use_cache, profiles, encode_workers=0):
+    """Render one (session, figure) pair to every profile.
+
+    Returns the elapsed time and the export records of the written files.
+    """
+    global _templates
+    from experiment_plotter import ExperimentPlotter
+    from figure_export import FigureExporter
+    from figure_templates import FigureTemplates
+
+    start = time.perf_counter()
+    if _templates is None:
+        _templates = FigureTemplates()
+    plotter = _load_plotter(csv_file, use_cache, ExperimentPlotter.figure_columns([name]))
+    fig = _templates.get(name).render(plotter)
+    with FigureExporter(profiles, encode_workers) as exporter:
+        # The figure belongs to the template and is reused for the next session
+        exporter.export(fig, session_dir, name, close=False)
+    return time.perf_counter() - start, exporter.records
+
+
+def run_batch(sessions, output_dir, figures, workers=None, force=False,
+              use_cache=True, profiles=DEFAULT_PROFILES, encode_workers=0):
+    """Render every (session, figure) pair in a process pool.
+
+    Returns a dict with per-figure timings, export records, skipped and
+    failed tasks.
+    """
+    import experiment_plotter
+    import figure_export
+    import figure_templates
+    code_files = [experiment_plotter.__file__, figure_templates.__file__,
+                  figure_export.__file__]
+
+    # Figure-major order so each worker keeps re-rendering the same templates
+    tasks = []
+    skipped = 0
+    for name in figures:
+        for csv_file in sessions:
+            targets = output_files(output_dir, csv_file, name, profiles)
+            if not force and is_up_to_date(targets, [csv_file] + code_files):
+                skipped += 1
+                continue
+            tasks.append((csv_file, name, targets[0].parent))
+
+    timings = {name: [] for name in figures}
+    records = []
+    failures = []
+    wall_start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        if use_cache:
+            pending = sorted({csv_file for csv_file, _, _ in tasks})
+            warm = [pool.submit(warm_session, csv_file, use_cache) for csv_file in pending]
+            for future in as_completed(warm):
+                future.result()
+
+        futures = {pool.submit(render_figure, csv_file, name, session_dir, use_cache,
+                               profiles, encode_workers):
+                   (csv_file, name, session_dir)
+                   for csv_file, name, session_dir in tasks}
+        for future in as_completed(futures):
+            csv_file, name, session_dir = futures[future]
+            try:
+                elapsed, written = future.result()
+                timings[name].append(elapsed)
+                records.extend(written)
+                for record in written:
+                    print(f"Saved {record['path']}")
+            except Exception as e:
+                failures.append((str(csv_file), name, str(e)))
+                print(f'Error rendering {name} for {csv_file}: {e}')
+
+    return {
+        'wall_time': time.perf_counter() - wall_start,
+        'rendered': sum(len(t) for t in timings.values()),
+        'skipped': skipped,
+        'failures': failures,
+        'timings': timings,
+        'records': records,
+    }
+
+
+def print_summary(result):
+    """Print the timing summary for a batch run"""
+    print('\nBatch report summary:')
+    print(f"Rendered: {result['rendered']}  Skipped (up to date): {result['skipped']}  "
+          f"Failed: {len(result['failures'])}")
+    print(f"Wall time: {result['wall_time']:.2f}s")
+    written = sum(r['bytes'] for r in result['records'])
+    print(f"Written: {len(result['records'])} files, {written / 1024 / 1024:.2f} MB")
+    for name, times in result['timings'].items():
+        if times:
+            print(f'  {name:<20} n={len(times):<5} total={sum(times):8.2f}s  '
+                  f'mean={sum(times) / len(times):6.2f}s  max={max(times):6.2f}s')
+
+
+def main(argv=None):
+    """Command line entry point for batch report generation."""
+    from experiment_plotter import ExperimentPlotter
+
+    parser = argparse.ArgumentParser(
+        description='Render experiment plots for many sessions in parallel')
+    parser.add_argument('inputs', nargs='+',
+                        help='session CSV files, glob patterns or directories')
+    parser.add_argument('-o', '--output-dir', default='experiment_plots')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(),
+                        help='number of worker processes (default: all cores)')
+    parser.add_argument('--figures', nargs='+', choices=list(ExperimentPlotter.PLOTS),
+                        default=list(ExperimentPlotter.PLOTS))
+    parser.add_argument('--profiles', nargs='+', choices=list(PROFILES),
+                        default=list(DEFAULT_PROFILES),
+                        help='export targets (default: publication PNG)')
+    parser.add_argument('--encode-workers', type=int, default=0,
+                        help='threads per process for PNG encoding')
+    parser.add_argument('--force', action='store_true',
+                        help='re-render outputs that are already up to date')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='parse the CSVs directly instead of using the session cache')
+    args = parser.parse_args(argv)
+
+    sessions = find_sessions(args.inputs)
+    if not sessions:
+        print('No session files found')
+        return 1
+
+    print(f'Found {len(sessions)} sessions, {len(args.figures)} figures each')
+    result = run_batch(sessions, args.output_dir, args.figures,
+                       workers=args.workers, force=args.force,
+                       use_cache=not args.no_cache, profiles=args.profiles,
+                       encode_workers=args.encode_workers)
+    print_summary(result)
+    return 1 if result['failures'] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
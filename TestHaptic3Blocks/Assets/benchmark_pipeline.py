@@ -0,0 +1,326 @@
+import argparse
+import contextlib
+import io
+import json
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from session_reader import (CONTACT_DATA_COLUMNS, EXPERIMENT_SESSION_COLUMNS,
+                            SYSTEM_PERFORMANCE_COLUMNS)
+
+CONTACT_TYPES = np.array(['box', 'robot1', 'robot2'])
+
+
+def _contact_intervals(rng, duration):
+    """Alternating no-contact / contact periods covering `duration` seconds"""
+    count = int(duration / 2.5) + 4
+    gaps = rng.exponential(3.0, count) + 0.2
+    holds = rng.exponential(2.0, count) + 0.1
+    starts = np.cumsum(gaps + np.concatenate(([0.0], holds[:-1])))
+    ends = starts + holds
+    keep = starts < duration
+    return starts[keep], np.minimum(ends[keep], duration)
+
+
+def synthetic_session(duration, rate=50.0, seed=0):
+    """Synthetic experiment_session, contact_data and system_performance frames"""
+    rng = np.random.default_rng(seed)
+    n = int(duration * rate)
+    t = np.arange(n) / rate
+
+    # Robots drive for 20 s, then pause for 10 s
+    moving = (t % 30.0) < 20.0
+    speed1 = np.where(moving, 0.1, 0.0) + rng.normal(0, 0.005, n).clip(0)
+    speed2 = np.where(moving, 0.1, 0.0) + rng.normal(0, 0.005, n).clip(0)
+    robot1_x = np.cumsum(speed1) / rate
+    robot2_x = np.cumsum(speed2) / rate
+    rotation = 8.0 * np.sin(2 * np.pi * t / 40.0) + rng.normal(0, 0.3, n)
+    rotation_error = np.abs(rotation)
+
+    starts, ends = _contact_intervals(rng, duration)
+    contact_types = CONTACT_TYPES[rng.choice(3, len(starts), p=[0.7, 0.15, 0.15])]
+    slot = np.searchsorted(starts, t, side='right') - 1
+    in_contact = (slot >= 0) & (t < ends[np.maximum(slot, 0)])
+    force = np.where(in_contact, np.abs(rng.normal(1.5, 0.5, n)), 0.0)
+    force_dir = rng.normal(size=(n, 3))
+    force_dir /= np.linalg.norm(force_dir, axis=1, keepdims=True)
+    haptic_force = force_dir * force[:, None]
+
+    contact_type = np.where(in_contact, contact_types[np.maximum(slot, 0)], '')
+    contact_duration = np.where(in_contact, t - starts[np.maximum(slot, 0)], 0.0)
+    phase = np.where(~in_contact, 'initialization',
+                     np.where(rotation_error < 5.0, 'stable_contact', 'correction'))
+
+    session = pd.DataFrame({
+        'TaskTime': t,
+        'BoxRotation': rotation,
+        'RotationError': rotation_error,
+        'BoxPosX': rng.normal(0, 0.001, n),
+        'BoxPosY': np.full(n, 0.05),
+        'BoxPosZ': (robot1_x + robot2_x) / 2,
+        'BoxAngVelX': rng.normal(0, 0.01, n),
+        'BoxAngVelY': np.gradient(np.radians(rotation), t) if n > 1 else np.zeros(n),
+        'BoxAngVelZ': rng.normal(0, 0.01, n),
+        'Robot1PosX': robot1_x,
+        'Robot1PosY': np.zeros(n),
+        'Robot1PosZ': np.full(n, -0.1),
+        'Robot2PosX': robot2_x,
+        'Robot2PosY': np.zeros(n),
+        'Robot2PosZ': np.full(n, 0.1),
+        'Robot1Speed': speed1,
+        'Robot2Speed': speed2,
+        'RobotDistanceDiff': np.hypot(robot1_x - robot2_x, 0.2),
+        'HapticPosX': 0.05 * np.sin(t / 3.0),
+        'HapticPosY': 0.1 + 0.02 * np.cos(t / 5.0),
+        'HapticPosZ': 0.05 * np.sin(t / 7.0),
+        'HapticForceX': haptic_force[:, 0],
+        'HapticForceY': haptic_force[:, 1],
+        'HapticForceZ': haptic_force[:, 2],
+        'ForceMagnitude': force,
+        'IsInContact': in_contact.astype(int),
+        'ContactType': contact_type,
+        'ContactDuration': contact_duration,
+        'Phase': phase,
+        'CumulativeError': np.cumsum(rotation_error) / np.arange(1, n + 1),
+        'StabilityMetric': (rotation_error / 180.0 + force / 5.0) / 2.0,
+    })[EXPERIMENT_SESSION_COLUMNS]
+
+    contact_slot = np.where(in_contact, slot, -1)
+    counts = np.bincount(contact_slot[in_contact], minlength=len(starts))
+    sums = np.bincount(contact_slot[in_contact], weights=force[in_contact], minlength=len(starts))
+    maxima = np.zeros(len(starts))
+    np.maximum.at(maxima, contact_slot[in_contact], force[in_contact])
+    contacts = pd.DataFrame({
+        'ContactID': np.arange(len(starts)),
+        'ObjectType': contact_types,
+        'StartTime': starts,
+        'EndTime': ends,
+        'Duration': ends - starts,
+        'MaxForce': maxima,
+        'AverageForce': np.divide(sums, counts, out=np.zeros(len(starts)), where=counts > 0),
+        'ContactPointX': rng.normal(0, 0.05, len(starts)),
+        'ContactPointY': np.full(len(starts), 0.05),
+        'ContactPointZ': rng.normal(0, 0.05, len(starts)),
+    })[CONTACT_DATA_COLUMNS]
+
+    # Performance monitor samples every 0.05 s on the realtime clock
+    pt = np.arange(0.0, duration, 0.05)
+    perf_moving = (pt % 30.0) < 20.0
+    spikes = rng.random(len(pt)) < 0.002
+    performance = pd.DataFrame({
+        'Timestamp': 12.5 + pt,
+        'MessagesSent': np.cumsum(perf_moving),
+        'MessagesReceived': np.cumsum(perf_moving) * 3,
+        'MessageRate': np.where(perf_moving, 0.65, 0.0),
+        'AverageLatency': 0.147 + rng.normal(0, 0.01, len(pt)) + spikes * rng.exponential(0.3, len(pt)),
+        'StabilityScore': 0.97 + rng.normal(0, 0.005, len(pt)),
+        'PacketLoss': np.zeros(len(pt)),
+        'ConnectionDrops': np.zeros(len(pt)),
+    })[SYSTEM_PERFORMANCE_COLUMNS]
+    return session, contacts, performance
+
+
+def session_summary_text(session, contacts):
+    """Trailer in the format of ExperimentDataCollector.WriteSessionSummary"""
+    total_time = float(session['TaskTime'].iloc[-1]) if len(session) else 0.0
+    rotation_error = session['RotationError']
+    contact_time = float(contacts['Duration'].sum())
+    lines = [
+        '',
+        'Session Summary',
+        f'Total Task Time: {total_time:.2f} seconds',
+        f'Average Rotation Error: {rotation_error.mean():.2f} degrees',
+        f'Maximum Rotation Deviation: {rotation_error.max():.2f} degrees',
+        f'Stability Violations: {int((rotation_error > 5).sum())}',
+        f'Total Contact Time: {contact_time:.2f} seconds',
+        f'Contact Percentage: {contact_time / max(total_time, 1e-9) * 100:.2f}%',
+        '',
+        'Contact Statistics:',
+    ]
+    for object_type, count in contacts['ObjectType'].value_counts(sort=False).items():
+        lines.append(f'{object_type}: {count} contacts')
+    return '\r\n'.join(lines) + '\r\n'
+
+
+def write_synthetic_session(output_dir, duration, rate=50.0, seed=0, session_id=None):
+    """Write the three CSVs for one synthetic session and return their paths"""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    session_id = session_id or f'bench_{int(duration)}s_{seed}'
+    session, contacts, performance = synthetic_session(duration, rate, seed)
+
+    paths = {
+        'experiment_session': output_dir / f'experiment_session_{session_id}.csv',
+        'contact_data': output_dir / f'contact_data_{session_id}.csv',
+        'system_performance': output_dir / f'system_performance_{session_id}.csv',
+    }
+    session.to_csv(paths['experiment_session'], index=False, float_format='%.7g',
+                   lineterminator='\r\n')
+    with open(paths['experiment_session'], 'a', newline='') as f:
+        f.write(session_summary_text(session, contacts))
+    contacts.to_csv(paths['contact_data'], index=False, float_format='%.7g',
+                    lineterminator='\r\n')
+    performance.to_csv(paths['system_performance'], index=False, float_format='%.6g',
+                       lineterminator='\r\n')
+    return paths
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, if the platform reports it"""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss) / 2 ** 20
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10
+
+
+class StageTimer:
+    """Collects wall time and peak RSS for named benchmark stages"""
+
+    def __init__(self):
+        self.stages = {}
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = {
+                'seconds': time.perf_counter() - start,
+                'peak_rss_mb': peak_rss_mb(),
+            }
+
+
+def benchmark_session(paths, output_dir, dpi=100):
+    """Time every stage of both analysis pipelines for one synthetic session"""
+    from experiment_plotter import ExperimentPlotter
+    import latency_statechanges_plot as latency
+
+    timer = StageTimer()
+    quiet = contextlib.redirect_stdout(io.StringIO())
+    csv_file = paths['experiment_session']
+
+    with quiet:
+        with timer.stage('load_csv'):
+            plotter = ExperimentPlotter(csv_file, use_cache=False)
+        with timer.stage('load_cache_build'):
+            ExperimentPlotter(csv_file, cache_dir=Path(output_dir) / 'cache')
+        with timer.stage('load_cache_hit'):
+            plotter = ExperimentPlotter(csv_file, cache_dir=Path(output_dir) / 'cache')
+        with timer.stage('detect_events'):
+            plotter.detect_events()
+            plotter.detect_movements()
+
+        plotter.dpi = dpi
+        for name, method in plotter.PLOTS.items():
+            with timer.stage(f'{method}'):
+                fig = getattr(plotter, method)()
+            with timer.stage(f'savefig_{name}'):
+                fig.savefig(Path(output_dir) / f'{name}.png', dpi=dpi,
+                            bbox_inches='tight', pad_inches=0.5)
+            plt.close(fig)
+
+        with timer.stage('latency_load'):
+            df = latency.load_and_process_data(paths['system_performance'], use_cache=False)
+        with timer.stage('latency_detect_robot_movements'):
+            latency.detect_robot_movements(df)
+        with timer.stage('latency_create_plot'):
+            latency.create_latency_plot(df, output_dir)
+
+    return {
+        'rows': int(len(plotter.data)),
+        'file_bytes': Path(csv_file).stat().st_size,
+        'stages': timer.stages,
+        'total_seconds': sum(stage['seconds'] for stage in timer.stages.values()),
+    }
+
+
+def environment_info():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'matplotlib': matplotlib.__version__,
+    }
+
+
+def compare_results(current, baseline):
+    """Print per-stage time ratios against a previous benchmark JSON"""
+    previous = {(r['duration'], r['rate']): r for r in baseline['results']}
+    for result in current['results']:
+        old = previous.get((result['duration'], result['rate']))
+        if old is None:
+            continue
+        print(f"\n{result['duration']:.0f}s @ {result['rate']:.0f} Hz vs baseline:")
+        for name, stage in result['stages'].items():
+            old_stage = old['stages'].get(name)
+            if old_stage and old_stage['seconds'] > 0:
+                ratio = stage['seconds'] / old_stage['seconds']
+                flag = '  <-- slower' if ratio > 1.2 else ''
+                print(f"  {name:<40} {old_stage['seconds']:8.3f}s -> {stage['seconds']:8.3f}s "
+                      f"({ratio:5.2f}x){flag}")
+
+
+def main(argv=None):
+    """Command line entry point for the analysis pipeline benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark the experiment analysis pipeline')
+    parser.add_argument('--durations', nargs='+', type=float, default=[60, 600, 3600],
+                        help='synthetic session lengths in seconds')
+    parser.add_argument('--rate', type=float, default=50.0, help='sampling rate in Hz')
+    parser.add_argument('--dpi', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workdir', help='where to write synthetic data and plots')
+    parser.add_argument('-o', '--output', default='benchmark_results.json')
+    parser.add_argument('--compare', help='previous results JSON to compare against')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(args.workdir or tmp)
+        results = []
+        for duration in args.durations:
+            session_dir = workdir / f'{int(duration)}s'
+            paths = write_synthetic_session(session_dir, duration, args.rate, args.seed)
+            print(f'Benchmarking {duration:.0f}s session at {args.rate:.0f} Hz...')
+            result = benchmark_session(paths, session_dir, dpi=args.dpi)
+            result.update({'duration': duration, 'rate': args.rate})
+            results.append(result)
+            for name, stage in result['stages'].items():
+                rss = stage['peak_rss_mb']
+                rss_text = f'{rss:8.1f} MB' if rss is not None else ''
+                print(f"  {name:<40} {stage['seconds']:8.3f}s {rss_text}")
+
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'environment': environment_info(),
+        'dpi': args.dpi,
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'\nSaved {args.output}')
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            compare_results(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
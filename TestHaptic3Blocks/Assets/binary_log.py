@@ -0,0 +1,284 @@
+import argparse
+import json
+import os
+import struct
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from session_reader import SCHEMAS, read_log_csv, schema_dtypes
+
+# File layout (all little-endian):
+#   header   magic 'HLOG', version u16, flags u16, metadata length u32,
+#            record size u32, record count u64
+#   metadata JSON {"kind", "columns", "categories"}, space-padded to 8 bytes
+#   records  record_count x len(columns) float32, row-major
+# Text columns are stored as float32 category codes into metadata categories.
+MAGIC = b'HLOG'
+VERSION = 1
+HEADER = struct.Struct('<4sHHIIQ')
+COUNT_OFFSET = 16
+FLAG_CLOSED = 1
+SUFFIX = '.hlog'
+RECORD_DTYPE = np.dtype('<f4')
+CHUNK_ROWS = 200_000
+
+# Values the recorders write into text columns (see
+# ExperimentDataCollector.UpdateExperimentPhase / CheckAndUpdateContacts)
+CATEGORIES = {
+    'ContactType': ['', 'box', 'robot1', 'robot2'],
+    'Phase': ['initialization', 'stable_contact', 'correction', 'release'],
+    'ObjectType': ['box', 'robot1', 'robot2'],
+}
+
+
+def log_kind(path):
+    """Log type (a key of SCHEMAS) from a file name, e.g. experiment_session"""
+    name = Path(path).name
+    for kind in SCHEMAS:
+        if name.startswith(kind + '_'):
+            return kind
+    return None
+
+
+def binary_path_for(csv_file):
+    return Path(csv_file).with_suffix(SUFFIX)
+
+
+def read_header(path):
+    """Header fields and metadata of a binary log as a dict"""
+    with open(path, 'rb') as f:
+        magic, version, flags, meta_len, record_size, count = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a binary session log')
+        if version != VERSION:
+            raise ValueError(f'Unsupported binary log version {version}')
+        meta = json.loads(f.read(meta_len).decode('utf-8'))
+    meta.update({'flags': flags, 'record_size': record_size, 'record_count': count,
+                 'data_offset': HEADER.size + meta_len})
+    return meta
+
+
+class BinaryLogWriter:
+    """Append fixed-size float32 records to a binary session log.
+
+    The record count in the header is rewritten on every flush, after the
+    records themselves, so a reader never sees a count ahead of the data.
+    """
+
+    def __init__(self, path, kind, columns=None, flush_every=50):
+        self.path = Path(path)
+        self.columns = list(columns) if columns is not None else list(SCHEMAS[kind])
+        schema = SCHEMAS[kind]
+        self.categories = {col: CATEGORIES.get(col, []) for col in self.columns
+                           if schema.get(col) == 'category'}
+        self.flush_every = flush_every
+        self.count = 0
+        self._pending = 0
+
+        meta = json.dumps({'kind': kind, 'columns': self.columns,
+                           'categories': self.categories}).encode('utf-8')
+        meta += b' ' * (-(HEADER.size + len(meta)) % 8)
+        self.record_size = len(self.columns) * RECORD_DTYPE.itemsize
+        self._file = open(self.path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, VERSION, 0, len(meta), self.record_size, 0))
+        self._file.write(meta)
+        self._file.flush()
+
+    def append(self, records):
+        """Append a (n, len(columns)) array of records"""
+        records = np.ascontiguousarray(records, dtype=RECORD_DTYPE)
+        if records.ndim != 2 or records.shape[1] != len(self.columns):
+            raise ValueError(f'Expected records with {len(self.columns)} columns')
+        self._file.write(records.tobytes())
+        self.count += len(records)
+        self._pending += len(records)
+        if self._pending >= self.flush_every:
+            self.flush()
+
+    def append_frame(self, frame):
+        """Append the rows of a frame with (at least) the writer's columns.
+
+        Text values missing from the metadata categories are stored as -1
+        and read back as ''.
+        """
+        records = np.empty((len(frame), len(self.columns)), dtype=RECORD_DTYPE)
+        for i, col in enumerate(self.columns):
+            if col in self.categories:
+                codes = pd.Categorical(frame[col].astype(str), categories=self.categories[col]).codes
+                records[:, i] = codes
+            else:
+                records[:, i] = frame[col].to_numpy(dtype=np.float32)
+        self.append(records)
+
+    def flush(self, flags=0):
+        self._file.flush()
+        self._file.seek(COUNT_OFFSET)
+        self._file.write(struct.pack('<Q', self.count))
+        if flags:
+            self._file.seek(6)
+            self._file.write(struct.pack('<H', flags))
+        self._file.seek(0, os.SEEK_END)
+        self._file.flush()
+        self._pending = 0
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush(FLAG_CLOSED)
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class BinaryLog:
+    """Zero-copy reader for a binary session log.
+
+    Records are memory-mapped, so opening a session costs the same however
+    long it is. refresh() picks up records appended by a live writer and
+    poll() returns them as frames, like SessionTail does for CSV files.
+    """
+
+    def __init__(self, path, float_dtype='float32'):
+        self.path = Path(path)
+        header = read_header(self.path)
+        self.kind = header['kind']
+        self.columns = header['columns']
+        self.categories = header['categories']
+        self.data_offset = header['data_offset']
+        self.record_size = header['record_size']
+        self.dtypes = schema_dtypes(self.kind, float_dtype)
+        self.count = 0
+        self.closed = False
+        self.offset = 0
+        self._records = None
+        self.refresh()
+
+    def refresh(self):
+        """Re-read the writer's record count; returns the number of new records"""
+        with open(self.path, 'rb') as f:
+            f.seek(6)
+            flags, = struct.unpack('<H', f.read(2))
+            f.seek(COUNT_OFFSET)
+            count, = struct.unpack('<Q', f.read(8))
+            complete = (os.fstat(f.fileno()).st_size - self.data_offset) // self.record_size
+        count = min(count, complete)
+        self.closed = bool(flags & FLAG_CLOSED)
+        added = count - self.count
+        if added or self._records is None:
+            self.count = count
+            self._records = self._map()
+        return added
+
+    def _map(self):
+        shape = (self.count, len(self.columns))
+        if self.count == 0:
+            return np.empty(shape, dtype=RECORD_DTYPE)
+        return np.memmap(self.path, dtype=RECORD_DTYPE, mode='r',
+                         offset=self.data_offset, shape=shape)
+
+    @property
+    def records(self):
+        """All records as a read-only (count, columns) float32 map"""
+        return self._records
+
+    def column(self, name):
+        """One column of every record, as a strided view of the map"""
+        return self._records[:, self.columns.index(name)]
+
+    def frame(self, columns=None, start=0, stop=None):
+        """Records [start, stop) as a DataFrame typed like the CSV reader's.
+
+        float32 columns are views of the map; time columns are widened to
+        float64 and text columns decoded into categoricals.
+        """
+        records = self._records[start:stop]
+        data = {}
+        for col in (columns if columns is not None else self.columns):
+            values = records[:, self.columns.index(col)]
+            dtype = self.dtypes.get(col, RECORD_DTYPE)
+            if col in self.categories:
+                categories = self.categories[col]
+                codes = values.astype(np.int16)
+                invalid = (codes < 0) | (codes >= len(categories))
+                codes[invalid] = categories.index('') if '' in categories else -1
+                data[col] = pd.Categorical.from_codes(codes, categories)
+            elif dtype == RECORD_DTYPE:
+                data[col] = values
+            else:
+                data[col] = values.astype(dtype)
+        return pd.DataFrame(data, copy=False)
+
+    @property
+    def finished(self):
+        return self.closed and self.offset >= self.count
+
+    def poll(self):
+        """Return the records appended since the last poll"""
+        self.refresh()
+        chunk = self.frame(start=self.offset, stop=self.count)
+        self.offset = self.count
+        return chunk
+
+
+def read_binary_log(path, columns=None, float_dtype='float32'):
+    """Read a binary session log into a DataFrame"""
+    return BinaryLog(path, float_dtype).frame(columns)
+
+
+def csv_to_binary(csv_file, output=None, kind=None, chunksize=CHUNK_ROWS):
+    """Convert a session CSV (data rows only) to a binary log, chunk by chunk"""
+    kind = kind or log_kind(csv_file)
+    if kind is None:
+        raise ValueError(f'Cannot tell the log type of {csv_file}')
+    output = Path(output) if output is not None else binary_path_for(csv_file)
+    writer = None
+    try:
+        for chunk in read_log_csv(csv_file, kind, chunksize=chunksize):
+            if writer is None:
+                columns = [col for col in SCHEMAS[kind] if col in chunk.columns]
+                writer = BinaryLogWriter(output, kind, columns, flush_every=chunksize)
+            writer.append_frame(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return output
+
+
+def main(argv=None):
+    """Command line entry point for converting session CSVs to binary logs."""
+    parser = argparse.ArgumentParser(
+        description='Convert session CSV files to memory-mapped binary logs')
+    parser.add_argument('csv_files', nargs='+')
+    parser.add_argument('-o', '--output-dir', help='directory for the logs '
+                        '(default: next to each CSV)')
+    args = parser.parse_args(argv)
+
+    for csv_file in args.csv_files:
+        output = None
+        if args.output_dir:
+            Path(args.output_dir).mkdir(parents=True, exist_ok=True)
+            output = Path(args.output_dir) / binary_path_for(csv_file).name
+        start = time.perf_counter()
+        try:
+            output = csv_to_binary(csv_file, output)
+        except Exception as e:
+            print(f'Error converting {csv_file}: {e}')
+            continue
+        elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        log = BinaryLog(output)
+        load = time.perf_counter() - start
+        print(f'{csv_file} -> {output}: {log.count} records, '
+              f'{os.path.getsize(csv_file) / 1024:.0f} KB -> {os.path.getsize(output) / 1024:.0f} KB '
+              f'in {elapsed:.2f}s (map {load * 1000:.1f} ms)')
+
+
+if __name__ == "__main__":
+    main()
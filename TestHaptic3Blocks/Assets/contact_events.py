@@ -0,0 +1,176 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from session_reader import read_log_csv
+
+# Contact types as written by ExperimentDataCollector.CheckAndUpdateContacts,
+# mapped to the interaction phases used by compute_phases
+CONTACT_PHASES = {'box': 'Box Contact', 'robot1': 'Robot Contact', 'robot2': 'Robot Contact'}
+
+
+def contact_file_for(session_csv):
+    """contact_data_<id>.csv written next to experiment_session_<id>.csv (or .hlog).
+
+    None when the name does not follow the experiment_session_<id> pattern.
+    """
+    session_csv = Path(session_csv)
+    if not session_csv.name.startswith('experiment_session_'):
+        return None
+    name = session_csv.name.replace('experiment_session_', 'contact_data_', 1)
+    return session_csv.with_name(name).with_suffix('.csv')
+
+
+def read_contact_csv(csv_file, float_dtype='float32'):
+    """Read a contact_data CSV into a frame sorted by StartTime"""
+    contacts = read_log_csv(csv_file, 'contact_data', float_dtype=float_dtype)
+    return contacts.sort_values('StartTime', kind='stable').reset_index(drop=True)
+
+
+class ContactIntervals:
+    """Interval index over contact [StartTime, EndTime) spans.
+
+    Contacts are written one at a time, so the spans do not overlap and a
+    binary search over the sorted starts answers every lookup: joining the
+    50 Hz series costs O(n log k) for n samples and k contacts, and
+    per-contact reductions only touch the samples inside each span.
+    """
+
+    def __init__(self, contacts):
+        self.contacts = contacts
+        self.starts = contacts['StartTime'].to_numpy(dtype=np.float64)
+        self.ends = contacts['EndTime'].to_numpy(dtype=np.float64)
+        if len(self.starts) and np.any(np.diff(self.starts) < 0):
+            raise ValueError('Contacts must be sorted by StartTime')
+
+    @classmethod
+    def from_csv(cls, csv_file):
+        return cls(read_contact_csv(csv_file))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def asof(self, times):
+        """Index of the last contact started at or before each time, or -1"""
+        return np.searchsorted(self.starts, np.asarray(times, dtype=np.float64), side='right') - 1
+
+    def locate(self, times):
+        """Index of the contact spanning each time, or -1 between contacts"""
+        times = np.asarray(times, dtype=np.float64)
+        idx = self.asof(times)
+        inside = idx >= 0
+        inside[inside] = times[inside] < self.ends[idx[inside]]
+        return np.where(inside, idx, -1)
+
+    def join(self, frame, columns=('ContactID', 'ObjectType'), time_column='TaskTime',
+             how='interval'):
+        """Attach contact columns to the samples of `frame`.
+
+        how='interval' fills only samples inside a contact span;
+        how='asof' carries the last started contact forward, like
+        pd.merge_asof on StartTime.
+        """
+        times = frame[time_column].to_numpy()
+        idx = self.locate(times) if how == 'interval' else self.asof(times)
+        matched = idx >= 0
+        joined = frame.copy()
+        for column in columns:
+            values = self.contacts[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                codes = np.where(matched, values.cat.codes.to_numpy()[np.maximum(idx, 0)], -1)
+                joined[column] = pd.Categorical.from_codes(codes, values.cat.categories)
+            else:
+                source = values.to_numpy(dtype=np.float64)
+                joined[column] = np.where(matched, source[np.maximum(idx, 0)], np.nan)
+        return joined
+
+    def sample_bounds(self, times):
+        """[lo, hi) sample index range of each contact in a sorted time array"""
+        times = np.asarray(times, dtype=np.float64)
+        return (np.searchsorted(times, self.starts, side='left'),
+                np.searchsorted(times, self.ends, side='left'))
+
+    def reduce(self, times, values, how='mean'):
+        """Per-contact sum/mean/max/min of a sample series (NaN when empty)"""
+        lo, hi = self.sample_bounds(times)
+        values = np.asarray(values, dtype=np.float64)
+        counts = hi - lo
+        result = np.full(len(lo), np.nan)
+        nonempty = counts > 0
+        if not nonempty.any() or len(values) == 0:
+            return result
+        # reduceat over [lo, hi) pairs; the padding keeps the last hi in range
+        padded = np.append(values, 0.0)
+        bounds = np.column_stack([lo[nonempty], hi[nonempty]]).ravel()
+        if how in ('sum', 'mean'):
+            reduced = np.add.reduceat(padded, bounds)[::2]
+            if how == 'mean':
+                reduced = reduced / counts[nonempty]
+        elif how == 'max':
+            reduced = np.maximum.reduceat(padded, bounds)[::2]
+        elif how == 'min':
+            reduced = np.minimum.reduceat(padded, bounds)[::2]
+        else:
+            raise ValueError(f'Unknown reduction: {how}')
+        result[nonempty] = reduced
+        return result
+
+    def phases(self, t0=None, t1=None):
+        """Interaction phases as (starts, ends, phases), like compute_phases.
+
+        Each contact becomes a 'Box Contact' or 'Robot Contact' segment and
+        the gaps between contacts (and before/after, down to t0 and up to
+        t1) become 'No Contact' segments.
+        """
+        types = self.contacts['ObjectType'].astype(str).to_numpy()
+        contact_phase = np.array([CONTACT_PHASES.get(t, 'Robot Contact') for t in types],
+                                 dtype=object)
+        t0 = self.starts[0] if t0 is None and len(self) else t0
+        t1 = self.ends[-1] if t1 is None and len(self) else t1
+        if not len(self):
+            if t0 is None:
+                return np.empty(0), np.empty(0), np.empty(0, dtype=object)
+            return np.array([t0]), np.array([t1]), np.array(['No Contact'], dtype=object)
+
+        gap_starts = np.concatenate(([t0], self.ends))
+        gap_ends = np.concatenate((self.starts, [t1]))
+        starts = np.empty(2 * len(self) + 1)
+        ends = np.empty_like(starts)
+        phases = np.empty(len(starts), dtype=object)
+        starts[0::2], ends[0::2], phases[0::2] = gap_starts, gap_ends, 'No Contact'
+        starts[1::2], ends[1::2], phases[1::2] = self.starts, self.ends, contact_phase
+        keep = ends > starts
+        return starts[keep], ends[keep], phases[keep]
+
+
+def contact_metrics(intervals, session=None):
+    """Per-contact metrics table built from the contact rows.
+
+    Forces and durations come straight from the contact table. With the
+    session frame, each contact also gets its sample count, peak and mean
+    |BoxRotation| and the rotation change over the contact, reduced over
+    only the samples inside each span.
+    """
+    contacts = intervals.contacts
+    metrics = contacts[['ContactID', 'ObjectType', 'StartTime', 'EndTime', 'Duration',
+                        'MaxForce', 'AverageForce']].copy()
+    if session is not None:
+        times = session['TaskTime'].to_numpy()
+        rotation = session['BoxRotation'].to_numpy(dtype=np.float64)
+        lo, hi = intervals.sample_bounds(times)
+        metrics['Samples'] = hi - lo
+        metrics['PeakRotationError'] = intervals.reduce(times, np.abs(rotation), 'max')
+        metrics['MeanRotationError'] = intervals.reduce(times, np.abs(rotation), 'mean')
+        first = np.where(hi > lo, rotation[np.minimum(lo, len(rotation) - 1)], np.nan)
+        last = np.where(hi > lo, rotation[np.maximum(hi - 1, 0)], np.nan)
+        metrics['RotationChange'] = last - first
+    return metrics
+
+
+def contact_statistics(contacts):
+    """Contacts per object type, as in the "Contact Statistics" trailer"""
+    return (contacts.groupby('ObjectType', observed=True)
+            .agg(Contacts=('ContactID', 'size'), TotalDuration=('Duration', 'sum'),
+                 MeanMaxForce=('MaxForce', 'mean'), MeanAverageForce=('AverageForce', 'mean'))
+            .reset_index())
@@ -0,0 +1,235 @@
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+from binary_log import SUFFIX as BINARY_SUFFIX, read_binary_log
+from contact_events import contact_file_for, read_contact_csv
+from decimation import decimate
+from session_reader import read_log_csv, read_session_summary
+from session_stats import find_sources, session_id
+
+FEED_VERSION = 3
+MANIFEST_FILE = 'manifest.json'
+INDEX_FILE = 'index.json'
+DATA_SUFFIX = '.f32'
+# Full-resolution timestamps, shared by every signal of a session
+TIME_FILE = f'time{DATA_SUFFIX}'
+# Points per signal in the overview block: a few screen widths
+OVERVIEW_POINTS = 4000
+# Samples per full-resolution chunk
+CHUNK_POINTS = 65536
+
+# Signals exported per log kind: time column first
+FEED_SIGNALS = {
+    'experiment_session': ['TaskTime', 'BoxRotation', 'RotationError', 'ForceMagnitude',
+                           'Robot1Speed', 'Robot2Speed', 'RobotDistanceDiff',
+                           'HapticPosX', 'HapticPosY', 'HapticPosZ',
+                           'HapticForceX', 'HapticForceY', 'HapticForceZ',
+                           'IsInContact', 'CumulativeError', 'StabilityMetric'],
+    'system_performance': ['Timestamp', 'MessageRate', 'AverageLatency', 'StabilityScore',
+                           'PacketLoss', 'ConnectionDrops'],
+}
+
+
+def _read_signals(kind, path):
+    columns = FEED_SIGNALS[kind]
+    if Path(path).suffix == BINARY_SUFFIX:
+        return read_binary_log(path, columns)
+    return read_log_csv(path, kind, columns=columns)
+
+
+def _write_block(f, *arrays):
+    """Append equally long arrays as consecutive float32 runs; returns the block entry"""
+    offset = f.tell()
+    for array in arrays:
+        f.write(np.ascontiguousarray(array, dtype='<f4').tobytes())
+    return {'offset': offset, 'count': len(arrays[0])}
+
+
+def _contacts(path, t0):
+    """Contact intervals of a session, in seconds since `t0` like the signals"""
+    contact_file = contact_file_for(path)
+    if contact_file is None or not contact_file.exists():
+        return []
+    contacts = read_contact_csv(contact_file, 'float32')
+    return [{'start': float(start) - t0, 'end': float(end) - t0, 'object': str(kind)}
+            for start, end, kind in zip(contacts['StartTime'], contacts['EndTime'],
+                                        contacts['ObjectType'])]
+
+
+def _options(overview_points, chunk_points, full_resolution):
+    """Export options recorded in the manifest; a feed built with others is stale"""
+    return {'overview_points': overview_points, 'chunk_points': chunk_points,
+            'full_resolution': full_resolution}
+
+
+def export_session(kind, path, output_dir, overview_points=OVERVIEW_POINTS,
+                   chunk_points=CHUNK_POINTS, full_resolution=False):
+    """Write one session's feed: a .f32 file per signal and a manifest.
+
+    All data is float32 little-endian. Times, contact start/end included,
+    are seconds since the manifest's `t0`, so float32 keeps sub-millisecond
+    resolution for multi-hour sessions. Each signal file starts with its
+    `overview` block: at most `overview_points` min/max-decimated
+    samples, stored as `count` times followed by `count` values (every
+    signal keeps its own extremes, so the overview times differ per
+    signal). With `full_resolution` the raw values follow in `chunks` of `chunk_points`; their times are stored
+    once per session in time.f32, in chunks with the same index and count,
+    each listing its time range. A viewer can then fetch only what a zoom
+    window needs (HTTP range requests on the offsets). The manifest is
+    written last and marks the feed complete.
+    """
+    frame = _read_signals(kind, path)
+    time_column, *signals = [c for c in FEED_SIGNALS[kind] if c in frame.columns]
+    times = frame[time_column].to_numpy(dtype=np.float64)
+    t0 = float(times[0]) if len(times) else 0.0
+    relative = times - t0
+    starts = np.arange(0, len(times), chunk_points)
+
+    session_dir = Path(output_dir) / f'{kind}_{session_id(path)}'
+    session_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = session_dir / MANIFEST_FILE
+    manifest_path.unlink(missing_ok=True)
+    stops = np.minimum(starts + chunk_points, len(times))
+
+    time_chunks = []
+    (session_dir / TIME_FILE).unlink(missing_ok=True)
+    if full_resolution:
+        with open(session_dir / TIME_FILE, 'wb') as f:
+            for start, stop in zip(starts, stops):
+                chunk = _write_block(f, relative[start:stop])
+                chunk.update(t_start=float(relative[start]), t_end=float(relative[stop - 1]))
+                time_chunks.append(chunk)
+
+    entries = {}
+    for signal in signals:
+        values = frame[signal].to_numpy(dtype=np.float32)
+        file_name = f'{signal}{DATA_SUFFIX}'
+        with open(session_dir / file_name, 'wb') as f:
+            # decimate() stays within max_points
+            overview = _write_block(f, *decimate(relative, values, max_points=overview_points))
+            chunks = []
+            if full_resolution:
+                chunks = [_write_block(f, values[start:stop])
+                          for start, stop in zip(starts, stops)]
+        entries[signal] = {
+            'file': file_name,
+            'min': float(values.min()) if len(values) else None,
+            'max': float(values.max()) if len(values) else None,
+            'overview': overview,
+            'chunks': chunks,
+        }
+
+    stat = Path(path).stat()
+    manifest = {
+        'version': FEED_VERSION,
+        'kind': kind,
+        'session': session_id(path),
+        'source': Path(path).name,
+        'size': stat.st_size,
+        'mtime': stat.st_mtime,
+        'dtype': 'float32',
+        'byte_order': 'little',
+        'options': _options(overview_points, chunk_points, full_resolution),
+        'overview_layout': ['time', 'value'],
+        't0': t0,
+        'duration': float(relative[-1]) if len(relative) else 0.0,
+        'samples': len(times),
+        'time': {'file': TIME_FILE if full_resolution else None, 'chunks': time_chunks},
+        'signals': entries,
+    }
+    if kind == 'experiment_session':
+        manifest['contacts'] = _contacts(path, t0)
+        if Path(path).suffix != BINARY_SUFFIX:
+            manifest['summary'] = read_session_summary(path)
+    tmp_path = manifest_path.with_suffix('.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, manifest_path)
+    return manifest_path
+
+
+def is_up_to_date(kind, path, output_dir, overview_points=OVERVIEW_POINTS,
+                  chunk_points=CHUNK_POINTS, full_resolution=False):
+    """True when the session's manifest was written from the current file
+    with the same export options"""
+    manifest_path = Path(output_dir) / f'{kind}_{session_id(path)}' / MANIFEST_FILE
+    try:
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False
+    stat = Path(path).stat()
+    return (manifest.get('version') == FEED_VERSION and manifest.get('size') == stat.st_size
+            and manifest.get('mtime') == stat.st_mtime
+            and manifest.get('options') == _options(overview_points, chunk_points,
+                                                    full_resolution))
+
+
+def write_index(output_dir):
+    """index.json listing every session feed under `output_dir`"""
+    output_dir = Path(output_dir)
+    sessions = []
+    for manifest_path in sorted(output_dir.glob(f'*/{MANIFEST_FILE}')):
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+        sessions.append({
+            'kind': manifest['kind'],
+            'session': manifest['session'],
+            'manifest': manifest_path.relative_to(output_dir).as_posix(),
+            'duration': manifest['duration'],
+            'signals': list(manifest['signals']),
+        })
+    index_path = output_dir / INDEX_FILE
+    with open(index_path, 'w') as f:
+        json.dump({'version': FEED_VERSION, 'sessions': sessions}, f, indent=1)
+    return index_path
+
+
+def main(argv=None):
+    """Command line entry point for the dashboard data feed."""
+    parser = argparse.ArgumentParser(
+        description='Export decimated float32 session data for a browser dashboard')
+    parser.add_argument('inputs', nargs='+',
+                        help='session CSV files, glob patterns or directories')
+    parser.add_argument('-o', '--output-dir', default='dashboard_data')
+    parser.add_argument('--overview-points', type=int, default=OVERVIEW_POINTS,
+                        help='points per signal in the overview block')
+    parser.add_argument('--full-resolution', action='store_true',
+                        help='also write the raw samples in chunks for zooming')
+    parser.add_argument('--chunk-points', type=int, default=CHUNK_POINTS)
+    parser.add_argument('--force', action='store_true',
+                        help='re-export feeds that are already up to date')
+    args = parser.parse_args(argv)
+
+    sources = find_sources(args.inputs)
+    if not sources:
+        print('No session files found')
+        return 1
+
+    start = time.perf_counter()
+    exported = skipped = failed = 0
+    for kind, path in sources:
+        if not args.force and is_up_to_date(kind, path, args.output_dir, args.overview_points,
+                                            args.chunk_points, args.full_resolution):
+            skipped += 1
+            continue
+        try:
+            export_session(kind, path, args.output_dir, args.overview_points,
+                           args.chunk_points, args.full_resolution)
+            exported += 1
+        except Exception as e:
+            print(f'Error exporting {path}: {e}')
+            failed += 1
+    index_path = write_index(args.output_dir)
+    print(f'{exported} exported, {skipped} up to date, {failed} failed in '
+          f'{time.perf_counter() - start:.2f}s -> {index_path}')
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
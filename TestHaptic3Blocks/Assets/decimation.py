@@ -0,0 +1,85 @@
+import numpy as np
+
+
+def pixel_width(ax, dpi):
+    """Approximate width of `ax` in output pixels when saved at `dpi`"""
+    fig = ax.figure
+    return max(int(fig.get_figwidth() * ax.get_position().width * dpi), 1)
+
+
+def minmax_indices(n, series, n_bins):
+    """Indices of the first, last, min and max sample of each bin.
+
+    The samples 0..n-1 are split into `n_bins` equal index bins and every
+    series in `series` contributes its extremes, so peaks such as force
+    spikes always survive. Returns sorted unique indices.
+    """
+    if n <= 2 * n_bins:
+        return np.arange(n)
+    bin_size = int(np.ceil(n / n_bins))
+    pad = (-n) % bin_size
+    starts = np.arange(0, n, bin_size)
+    picks = [starts, np.minimum(starts + bin_size - 1, n - 1)]
+    for values in series:
+        values = np.asarray(values, dtype=np.float64)
+        nan = np.isnan(values)
+        low = np.where(nan, np.inf, values)
+        high = np.where(nan, -np.inf, values)
+        if pad:
+            low = np.concatenate([low, np.full(pad, np.inf)])
+            high = np.concatenate([high, np.full(pad, -np.inf)])
+        picks.append(starts + low.reshape(-1, bin_size).argmin(axis=1))
+        picks.append(starts + high.reshape(-1, bin_size).argmax(axis=1))
+    return np.unique(np.minimum(np.concatenate(picks), n - 1))
+
+
+def lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Buckets selection of `n_out` sample indices"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.nan_to_num(np.asarray(y, dtype=np.float64))
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # Bucket averages, with the last point acting as the final bucket
+    avg_x = np.append(np.add.reduceat(x[:n - 1], edges[:-1]) / np.diff(edges), x[-1])
+    avg_y = np.append(np.add.reduceat(y[:n - 1], edges[:-1]) / np.diff(edges), y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        area = np.abs((x[a] - avg_x[i + 1]) * (y[start:end] - y[a])
+                      - (x[a] - x[start:end]) * (avg_y[i + 1] - y[a]))
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def decimation_indices(x, series, max_points, method='minmax'):
+    """Indices to keep so the series fit in roughly `max_points` samples"""
+    n = len(x)
+    if max_points is None or n <= max_points:
+        return np.arange(n)
+    if method == 'lttb':
+        # Each series picks its own points: split the budget between them
+        per_series = max(max_points // max(len(series), 1), 3)
+        return np.unique(np.concatenate([lttb_indices(x, values, per_series)
+                                         for values in series]))
+    if method != 'minmax':
+        raise ValueError(f'Unknown decimation method: {method}')
+    # A bin keeps its first and last sample plus a min and max per series
+    return minmax_indices(n, series, max(max_points // (2 + 2 * len(series)), 1))
+
+
+def decimate(x, *series, max_points=None, method='minmax'):
+    """Downsample series that share `x`; returns (x, *series) as arrays"""
+    x = np.asarray(x)
+    arrays = [np.asarray(values) for values in series]
+    idx = decimation_indices(x, arrays, max_points, method)
+    if len(idx) == len(x):
+        return (x, *arrays)
+    return (x[idx], *[values[idx] for values in arrays])
@@ -0,0 +1,177 @@
+import numpy as np
+
+# One row per detected interval; end is the first sample back below `off`,
+# or the last sample for intervals that had not closed yet
+EVENT_DTYPE = np.dtype([
+    ('start', 'f8'),
+    ('end', 'f8'),
+    ('start_index', 'i8'),
+    ('end_index', 'i8'),
+    ('peak', 'f8'),
+    ('closed', '?'),
+])
+
+
+def first_crossing(times, values, threshold, absolute=False):
+    """Time of the first sample above `threshold`, or None"""
+    values = np.asarray(values)
+    if absolute:
+        values = np.abs(values)
+    above = values > threshold
+    idx = int(np.argmax(above)) if len(above) else 0
+    if len(above) == 0 or not above[idx]:
+        return None
+    return float(np.asarray(times)[idx])
+
+
+def hysteresis_state(values, on, off=None, initial=False):
+    """Boolean on/off state with separate switch-on and switch-off thresholds.
+
+    The state turns on when a value rises above `on` and turns off when it
+    falls to or below `off` (defaults to `on`). Samples in between, and
+    NaNs, keep the previous state.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if off is None:
+        off = on
+    marks = np.zeros(len(values), dtype=np.int8)
+    marks[values <= off] = -1
+    marks[values > on] = 1
+
+    positions = np.where(marks != 0, np.arange(len(values)), -1)
+    last_decided = np.maximum.accumulate(positions) if len(values) else positions
+    state = marks[np.maximum(last_decided, 0)] == 1
+    state[last_decided < 0] = initial
+    return state
+
+
+def _intervals(times, values, state, initial):
+    """Rise/fall indices and per-interval peaks for a state array"""
+    steps = np.diff(np.concatenate(([initial], state)).astype(np.int8))
+    rises = np.flatnonzero(steps == 1)
+    falls = np.flatnonzero(steps == -1)
+    if initial:
+        # Interval already running before the first sample
+        rises = np.concatenate(([-1], rises))
+    ends = np.append(falls, len(state)) if len(rises) > len(falls) else falls
+
+    bounds = np.column_stack([np.maximum(rises, 0), ends]).ravel()
+    padded = np.append(np.asarray(values, dtype=np.float64), -np.inf)
+    if len(bounds):
+        # fmax skips NaN samples; a slice of only NaNs stays NaN
+        peaks = np.fmax.reduceat(padded, bounds)[::2]
+    else:
+        peaks = np.empty(0)
+    return rises, ends, peaks
+
+
+def detect_intervals(times, values, on, off=None, min_duration=0.0, include_open=False):
+    """Detect intervals where `values` is on, in a single vectorized pass.
+
+    Returns an EVENT_DTYPE array. Intervals shorter than `min_duration`
+    are dropped. An interval still on at the last sample is only reported
+    with `include_open`, ending at the last timestamp.
+    """
+    times = np.asarray(times, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    state = hysteresis_state(values, on, off)
+    rises, ends, peaks = _intervals(times, values, state, False)
+
+    closed = ends < len(times)
+    if not include_open:
+        rises, ends, peaks = rises[closed], ends[closed], peaks[closed]
+
+    events = np.empty(len(rises), dtype=EVENT_DTYPE)
+    events['start_index'] = rises
+    events['end_index'] = np.minimum(ends, len(times) - 1)
+    events['start'] = times[rises] if len(rises) else []
+    events['end'] = times[events['end_index']] if len(rises) else []
+    events['peak'] = peaks
+    events['closed'] = ends < len(times)
+    return events[events['end'] - events['start'] >= min_duration]
+
+
+def rising_edges(state):
+    """Indices where a boolean state switches on (ignores the first sample)"""
+    return np.flatnonzero(np.diff(np.asarray(state, dtype=np.int8)) > 0) + 1
+
+
+def falling_edges(state):
+    """Indices where a boolean state switches off"""
+    return np.flatnonzero(np.diff(np.asarray(state, dtype=np.int8)) < 0) + 1
+
+
+class HysteresisDetector:
+    """Streaming counterpart of detect_intervals.
+
+    Feed samples with push() or whole chunks with push_many(); both return
+    the intervals that closed during that call. Chunks are processed with
+    the same vectorized code as the batch detector, carrying the open
+    interval across calls, so results match detect_intervals exactly.
+    """
+
+    def __init__(self, on, off=None, min_duration=0.0):
+        self.on = on
+        self.off = on if off is None else off
+        self.min_duration = min_duration
+        self.state = False
+        self.samples = 0
+        self.last_time = None
+        self.open_start = None
+        self.open_start_index = None
+        self.open_peak = -np.inf
+
+    def push(self, time, value):
+        return self.push_many([time], [value])
+
+    def push_many(self, times, values):
+        times = np.asarray(times, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        if len(times) == 0:
+            return np.empty(0, dtype=EVENT_DTYPE)
+
+        state = hysteresis_state(values, self.on, self.off, initial=self.state)
+        rises, ends, peaks = _intervals(times, values, state, self.state)
+
+        starts = times[np.maximum(rises, 0)]
+        start_index = rises + self.samples
+        if self.state and len(rises):
+            # First interval began in an earlier chunk
+            starts[0] = self.open_start
+            start_index[0] = self.open_start_index
+            peaks[0] = np.fmax(peaks[0], self.open_peak)
+
+        closed = ends < len(times)
+        events = np.empty(int(closed.sum()), dtype=EVENT_DTYPE)
+        events['start'] = starts[closed]
+        events['end'] = times[ends[closed]]
+        events['start_index'] = start_index[closed]
+        events['end_index'] = ends[closed] + self.samples
+        events['peak'] = peaks[closed]
+        events['closed'] = True
+
+        if len(rises) and not closed[-1]:
+            self.open_start = starts[-1]
+            self.open_start_index = start_index[-1]
+            self.open_peak = peaks[-1]
+        else:
+            self.open_start = None
+            self.open_start_index = None
+            self.open_peak = -np.inf
+        self.state = bool(state[-1])
+        self.samples += len(times)
+        self.last_time = times[-1]
+        return events[events['end'] - events['start'] >= self.min_duration]
+
+    def flush(self):
+        """Close a still-open interval at the last sample seen"""
+        events = np.empty(0, dtype=EVENT_DTYPE)
+        if self.open_start is not None:
+            events = np.array([(self.open_start, self.last_time, self.open_start_index,
+                                self.samples - 1, self.open_peak, False)], dtype=EVENT_DTYPE)
+            events = events[events['end'] - events['start'] >= self.min_duration]
+        self.state = False
+        self.open_start = None
+        self.open_start_index = None
+        self.open_peak = -np.inf
+        return events
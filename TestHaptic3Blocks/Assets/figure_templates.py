@@ -0,0 +1,563 @@
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+
+def apply_plot_style():
+    """Set up global plot style with larger, more visible elements"""
+    plt.style.use('default')
+    plt.rcParams['figure.figsize'] = [16, 12]
+    plt.rcParams['font.size'] = 14          # Base font size
+    plt.rcParams['axes.labelsize'] = 16     # Axis labels
+    plt.rcParams['axes.titlesize'] = 18     # Subplot titles
+    plt.rcParams['figure.titlesize'] = 20   # Figure title
+    plt.rcParams['xtick.labelsize'] = 14    # X-axis tick labels
+    plt.rcParams['ytick.labelsize'] = 14    # Y-axis tick labels
+    plt.rcParams['legend.fontsize'] = 14    # Legend text
+    plt.rcParams['axes.grid'] = True        # Show grid
+    plt.rcParams['grid.alpha'] = 0.3        # Grid transparency
+    plt.rcParams['lines.linewidth'] = 2.5   # Line thickness
+    plt.rcParams['axes.linewidth'] = 2      # Axis line thickness
+    plt.rcParams['grid.linewidth'] = 1.5    # Grid line thickness
+
+
+def _autoscale(ax, *collections):
+    """Refit the data limits of `ax` to its lines and patches plus `collections`"""
+    ax.relim()
+    for collection in collections:
+        limits = collection.get_datalim(ax.transData).get_points()
+        if np.isfinite(limits).all():
+            ax.update_datalim(limits)
+    ax.autoscale_view()
+
+
+def _set_points(collection, x, y):
+    collection.set_offsets(np.column_stack([np.asarray(x, dtype=np.float64),
+                                            np.asarray(y, dtype=np.float64)]))
+
+
+def _legend_band(ax, **kwargs):
+    """Empty fill_between whose only job is to give the legend an entry"""
+    return ax.fill_between([], [], [], **kwargs)
+
+
+class FigureTemplate:
+    """A figure whose layout is built once and whose data is swapped per session.
+
+    build() creates the figure, axes, labels, legends and the long-lived
+    artists. update() pushes a session's data into them with set_data /
+    set_offsets; artists that depend on the data shape (fill_between bands,
+    histograms, event markers) are registered with transient() and replaced
+    on every render. Templates with a layout() start every render from the
+    subplot parameters the figure had when it was built and lay it out
+    again after the update, so a reused template draws each session exactly
+    as a fresh one would.
+
+    COLUMNS lists the session columns update() reads, directly or through
+    plotter.features, so a caller that renders only some figures can load
+    only what they need.
+    """
+
+    COLUMNS = []
+    USES_EVENTS = False
+
+    def __init__(self):
+        self._transient = []
+        # The style only matters while the artists are created
+        apply_plot_style()
+        self.fig = self.build()
+        params = self.fig.subplotpars
+        self._subplot_params = {name: getattr(params, name) for name in
+                                ('left', 'bottom', 'right', 'top', 'wspace', 'hspace')}
+
+    def build(self):
+        raise NotImplementedError
+
+    def update(self, plotter):
+        raise NotImplementedError
+
+    def layout(self):
+        pass
+
+    def transient(self, artist):
+        """Register an artist that is removed before the next session is drawn"""
+        self._transient.append(artist)
+        return artist
+
+    def render(self, plotter):
+        """Draw the data of `plotter` into the template and return the figure"""
+        profiler = plotter.profiler
+        for artist in self._transient:
+            artist.remove()
+        self._transient = []
+        # Margins depend on this session's tick labels, and decimation on
+        # the axes width: start from the built geometry, not the previous
+        # session's layout
+        relayout = type(self).layout is not FigureTemplate.layout
+        if relayout:
+            self.fig.subplots_adjust(**self._subplot_params)
+        with profiler.span(f'update:{type(self).__name__}'):
+            self.update(plotter)
+        if relayout:
+            with profiler.span(f'layout:{type(self).__name__}'):
+                self.layout()
+        return self.fig
+
+    def close(self):
+        plt.close(self.fig)
+
+
+class SystemLatencyTemplate(FigureTemplate):
+    COLUMNS = ['TaskTime', 'ForceMagnitude', 'IsInContact']
+
+    def build(self):
+        fig, (self.ax1, self.ax2) = plt.subplots(2, 1, figsize=(16, 12))
+        ax1, ax2 = self.ax1, self.ax2
+
+        # ROS-Unity Communication Time
+        self.update_rate, = ax1.plot([], [], 'b-', label='Update Rate')
+        ax1.set_ylabel('Update Interval (ms)', fontsize=16)
+        ax1.set_title('ROS-Unity Communication Performance', fontsize=18)
+        ax1.grid(True, alpha=0.3)
+        ax1.axhline(y=20, color='r', linestyle='--', label='Target (20ms)')
+        ax1.legend()
+
+        # Force Feedback Response Time
+        self.responses = ax2.scatter([], [], c='g', label='Force Response')
+        ax2.set_ylabel('Force Response (N)', fontsize=16)
+        ax2.set_xlabel('Time (s)', fontsize=16)
+        ax2.set_title('Haptic Response Performance', fontsize=18)
+        ax2.grid(True)
+        return fig
+
+    def update(self, plotter):
+        data = plotter.data
+        time_diff = plotter.features.update_intervals()
+        self.update_rate.set_data(*plotter.decimated(self.ax1, data['TaskTime'][1:],
+                                                     time_diff * 1000))
+        _autoscale(self.ax1)
+
+        response_events = plotter.features.response_events()
+        _set_points(self.responses, *plotter.decimated(
+            self.ax2, data['TaskTime'][1:][response_events],
+            data['ForceMagnitude'][1:][response_events]))
+        _autoscale(self.ax2, self.responses)
+
+
+class HapticQualityTemplate(FigureTemplate):
+    COLUMNS = ['TaskTime', 'ForceMagnitude', 'ContactDuration', 'IsInContact',
+               'HapticPosX', 'HapticPosY', 'HapticPosZ']
+
+    def build(self):
+        fig, ((self.ax1, self.ax2), (self.ax3, self.ax4)) = plt.subplots(2, 2, figsize=(16, 12))
+        ax1, ax2, ax3, ax4 = self.ax1, self.ax2, self.ax3, self.ax4
+
+        # Force resolution histogram
+        ax1.set_xlabel('Force Magnitude (N)', fontsize=14)
+        ax1.set_ylabel('Frequency', fontsize=14)
+        ax1.set_title('Force Resolution Distribution', fontsize=16)
+
+        # Force stability over time
+        self.stability, = ax2.plot([], [])
+        ax2.set_xlabel('Time (s)', fontsize=14)
+        ax2.set_ylabel('Force Stability (N)', fontsize=14)
+        ax2.set_title('Force Feedback Stability', fontsize=16)
+
+        # Position Tracking Accuracy
+        self.positions = [ax3.plot([], [], label=axis)[0] for axis in ('X', 'Y', 'Z')]
+        ax3.set_xlabel('Time (s)', fontsize=14)
+        ax3.set_ylabel('Position (m)', fontsize=14)
+        ax3.set_title('Haptic Position Tracking', fontsize=16)
+        ax3.legend()
+
+        # Contact Detection Performance
+        ax4.set_xlabel('Contact Duration (s)', fontsize=14)
+        ax4.set_ylabel('Frequency', fontsize=14)
+        ax4.set_title('Contact Detection Performance', fontsize=16)
+
+        fig.suptitle('Haptic Interaction Quality Metrics', fontsize=20)
+        return fig
+
+    def update(self, plotter):
+        data = plotter.data
+        contact_mask = plotter.features.contact_mask()
+        if contact_mask.any():
+            contact_forces = data['ForceMagnitude'][contact_mask]
+            # Histograms take the first colour of the cycle, as on a fresh axes
+            self.transient(self.ax1.hist(contact_forces, bins=50, alpha=0.7, color='C0')[2])
+
+            force_stability = plotter.features.rolling_std('ForceMagnitude', window=10,
+                                                           contact_only=True)
+            self.stability.set_data(*plotter.decimated(
+                self.ax2, data['TaskTime'][contact_mask], force_stability))
+
+            contact_durations = data['ContactDuration'][contact_mask]
+            self.transient(self.ax4.hist(contact_durations, bins=30, alpha=0.7, color='C0')[2])
+        else:
+            self.stability.set_data([], [])
+
+        t, *positions = plotter.decimated(self.ax3, data['TaskTime'], data['HapticPosX'],
+                                          data['HapticPosY'], data['HapticPosZ'])
+        for line, values in zip(self.positions, positions):
+            line.set_data(t, values)
+
+        for ax in (self.ax1, self.ax2, self.ax3, self.ax4):
+            _autoscale(ax)
+
+
+class SystemStabilityTemplate(FigureTemplate):
+    COLUMNS = ['TaskTime', 'BoxRotation', 'Robot1Speed', 'Robot2Speed', 'IsInContact']
+
+    def build(self):
+        fig, (self.ax1, self.ax2, self.ax3) = plt.subplots(3, 1, figsize=(16, 12))
+        ax1, ax2, ax3 = self.ax1, self.ax2, self.ax3
+
+        # Box Control Stability
+        self.rotation, = ax1.plot([], [], 'b-')
+        ax1.set_ylabel('Box Rotation (°)', fontsize=14)
+        ax1.set_title('Object Control Stability', fontsize=16)
+        ax1.grid(True)
+
+        # Robot Movement Smoothness
+        self.jerk1, = ax2.plot([], [], 'r-', label='Robot 1', alpha=0.7)
+        self.jerk2, = ax2.plot([], [], 'g-', label='Robot 2', alpha=0.7)
+        ax2.set_ylabel('Movement Smoothness\n(Jerk)', fontsize=14)
+        ax2.legend()
+        ax2.grid(True)
+
+        # System State Coherence
+        self.contact_states = ax3.scatter([], [], c='g', label='Contact States', alpha=0.5)
+        ax3.set_ylabel('System State\nCoherence', fontsize=14)
+        ax3.set_xlabel('Time (s)', fontsize=14)
+        ax3.grid(True)
+
+        fig.suptitle('System Integration Stability Analysis', fontsize=20)
+        return fig
+
+    def update(self, plotter):
+        data = plotter.data
+        t, rotation = plotter.decimated(self.ax1, data['TaskTime'], data['BoxRotation'])
+        self.rotation.set_data(t, rotation)
+        band = self.transient(self.ax1.fill_between(t, rotation - 2, rotation + 2,
+                                                    color='blue', alpha=0.2))
+        _autoscale(self.ax1, band)
+
+        # Jerk (rate of acceleration change)
+        robot1_jerk = plotter.features.jerk('Robot1Speed')
+        robot2_jerk = plotter.features.jerk('Robot2Speed')
+        t, jerk1, jerk2 = plotter.decimated(self.ax2, data['TaskTime'][2:],
+                                            abs(robot1_jerk), abs(robot2_jerk))
+        self.jerk1.set_data(t, jerk1)
+        self.jerk2.set_data(t, jerk2)
+        _autoscale(self.ax2)
+
+        contact_times, = plotter.decimated(self.ax3, data['TaskTime'][plotter.features.contact_mask()])
+        _set_points(self.contact_states, contact_times, np.ones(len(contact_times)))
+        _autoscale(self.ax3, self.contact_states)
+
+
+class TimelineTemplate(FigureTemplate):
+    # Fixed annotations drawn on the three signal panels
+    MARKERS = [(2.5, 'Robots begin\n moving'),
+               (7.5, 'Initial box contact'),
+               (32.5, 'Robots stop\n moving')]
+
+    COLUMNS = ['TaskTime', 'BoxRotation', 'ForceMagnitude', 'IsInContact',
+               'Robot1Speed', 'Robot2Speed']
+
+    def build(self):
+        fig = plt.figure(figsize=(24, 20))
+        gs = plt.GridSpec(4, 1, height_ratios=[1.5, 1.5, 1.5, 0.8], hspace=0.8)
+
+        # Box Rotation plot
+        self.ax1 = ax1 = fig.add_subplot(gs[0])
+        self.rotation, = ax1.plot([], [], 'b-', linewidth=3, label='Actual Rotation')
+        confidence = _legend_band(ax1, color='blue', alpha=0.2, label='95% Confidence')
+        ax1.axhline(y=0, color='g', linestyle='--', linewidth=2, label='Target (0°)')
+        ax1.axhspan(-2, 2, color='g', alpha=0.1, label='Acceptable Range')
+        ax1.set_ylabel('Box Rotation (°)', fontsize=18, labelpad=15)
+        ax1.tick_params(axis='both', which='major', labelsize=14)
+        ax1.grid(True, alpha=0.3)
+        ax1.legend(loc='center left', fontsize=14, framealpha=0.9,
+                   bbox_to_anchor=(1.05, 0.3))
+        confidence.remove()
+
+        # Robot Speeds plot
+        self.ax2 = ax2 = fig.add_subplot(gs[1])
+        self.speed1, = ax2.plot([], [], 'b-', linewidth=3, label='Robot 1')
+        self.speed2, = ax2.plot([], [], 'g-', linewidth=3, label='Robot 2')
+        ax2.set_ylabel('Speed (m/s)', fontsize=18, labelpad=15)
+        ax2.tick_params(axis='both', which='major', labelsize=14)
+        ax2.grid(True, alpha=0.3)
+        ax2.legend(loc='center left', fontsize=14, framealpha=0.9,
+                   bbox_to_anchor=(1.05, 0.3))
+
+        # Force plot
+        self.ax3 = ax3 = fig.add_subplot(gs[2])
+        self.force, = ax3.plot([], [], 'purple', linewidth=3, label='Force (N)')
+        ax3.set_ylabel('Force (N)', fontsize=18, labelpad=15, color='purple')
+        ax3.tick_params(axis='both', which='major', labelsize=14)
+        ax3.grid(True, alpha=0.3)
+        ax3.legend(loc='center left', fontsize=14, framealpha=0.9,
+                   bbox_to_anchor=(1.05, 0.3))
+
+        # Contact timeline as a gantt-chart style visualization
+        self.ax4 = ax4 = fig.add_subplot(gs[3])
+        self.colors = {'contact': '#27ae60', 'no_contact': '#e74c3c'}
+        ax4.grid(True, axis='x', alpha=0.3)
+        bands = [_legend_band(ax4, color=self.colors['contact'], alpha=0.8,
+                              label='Contact Active'),
+                 _legend_band(ax4, color=self.colors['no_contact'], alpha=0.4,
+                              label='No Contact')]
+        ax4.set_ylim(0, 1)
+        ax4.set_yticks([])
+        ax4.set_xlabel('Time (seconds)', fontsize=18, labelpad=15)
+        ax4.tick_params(axis='x', which='major', labelsize=14)
+        ax4.text(-0.05, 0.5, 'Contact\nState', fontsize=14,
+                 verticalalignment='center', horizontalalignment='right',
+                 transform=ax4.transAxes)
+        ax4.legend(loc='center left', bbox_to_anchor=(1.05, 0.3),
+                   fontsize=14, framealpha=0.9)
+        for band in bands:
+            band.remove()
+        return fig
+
+    def update(self, plotter):
+        data = plotter.data
+        time_data = data['TaskTime']
+        ax1, ax2, ax3, ax4 = self.ax1, self.ax2, self.ax3, self.ax4
+
+        rotation_data = data['BoxRotation']
+        features = plotter.features
+        rotation_std = features.rolling_std('BoxRotation').fillna(0.5)
+        t, rotation, rotation_low, rotation_high = plotter.decimated(
+            ax1, time_data, rotation_data,
+            rotation_data - 2*rotation_std, rotation_data + 2*rotation_std)
+        self.rotation.set_data(t, rotation)
+        band = self.transient(ax1.fill_between(t, rotation_low, rotation_high,
+                                               color='blue', alpha=0.2))
+        _autoscale(ax1, band)
+
+        robot1_speed_smooth = features.smoothed('Robot1Speed')
+        robot2_speed_smooth = features.smoothed('Robot2Speed')
+        speed_std1 = features.rolling_std('Robot1Speed').fillna(0)
+        speed_std2 = features.rolling_std('Robot2Speed').fillna(0)
+        t, speed1, speed2, speed1_low, speed1_high, speed2_low, speed2_high = plotter.decimated(
+            ax2, time_data, robot1_speed_smooth, robot2_speed_smooth,
+            robot1_speed_smooth - speed_std1, robot1_speed_smooth + speed_std1,
+            robot2_speed_smooth - speed_std2, robot2_speed_smooth + speed_std2)
+        self.speed1.set_data(t, speed1)
+        self.speed2.set_data(t, speed2)
+        bands = [self.transient(ax2.fill_between(t, speed1_low, speed1_high,
+                                                 color='blue', alpha=0.2)),
+                 self.transient(ax2.fill_between(t, speed2_low, speed2_high,
+                                                 color='green', alpha=0.2))]
+        _autoscale(ax2, *bands)
+
+        self.force.set_data(*plotter.decimated(ax3, time_data, data['ForceMagnitude']))
+        _autoscale(ax3)
+
+        t, contact = plotter.decimated(ax4, time_data, data['IsInContact'].astype(bool).to_numpy())
+        bands = [self.transient(ax4.fill_between(t, 0.2, 0.8, where=contact,
+                                                 color=self.colors['contact'], alpha=0.8)),
+                 self.transient(ax4.fill_between(t, 0.2, 0.8, where=~contact,
+                                                 color=self.colors['no_contact'], alpha=0.4))]
+        _autoscale(ax4, *bands)
+        major_ticks = np.linspace(time_data.min(), time_data.max(), 10)
+        ax4.set_xticks(major_ticks)
+        ax4.set_xticklabels([f'{t:.1f}s' for t in major_ticks])
+
+        # Event markers to the left of the dotted line
+        for ax in (ax1, ax2, ax3):
+            ymin, ymax = ax.get_ylim()
+            # Slightly above the bottom of the graph: 5% of the y-axis range
+            text_y_pos = ymin + (ymax - ymin) * 0.05
+            for x, label in self.MARKERS:
+                self.transient(ax.axvline(x=x, color='red', linestyle=':', alpha=0.5))
+                self.transient(ax.text(x - 0.2, text_y_pos, label,
+                                       horizontalalignment='right', verticalalignment='bottom'))
+
+    def layout(self):
+        self.fig.tight_layout()
+        # More padding on the right for legends and a lower top margin
+        self.fig.subplots_adjust(right=0.85, top=0.92)
+        self.fig.suptitle('Experiment Timeline', fontsize=24, y=0.95)
+
+
+class RobotInteractionTemplate(FigureTemplate):
+    COLUMNS = ['TaskTime', 'Robot1PosX', 'Robot2PosX', 'RobotDistanceDiff']
+    USES_EVENTS = True
+
+    def build(self):
+        fig, (self.ax1, self.ax2) = plt.subplots(2, 1, figsize=(16, 12))
+        fig.subplots_adjust(hspace=0.3)
+        ax1, ax2 = self.ax1, self.ax2
+
+        # Robot positions
+        self.robot1, = ax1.plot([], [], color='red', linewidth=2.5, label='Robot 1')
+        self.robot2, = ax1.plot([], [], color='blue', linewidth=2.5, label='Robot 2')
+        ax1.set_ylabel('X Position (m)', fontsize=16)
+        ax1.grid(True, alpha=0.3)
+        ax1.legend(loc='center right', fontsize=14,
+                   bbox_to_anchor=(1.15, 0.5),
+                   framealpha=0.9)
+        ax1.set_title('Robot Positions', pad=20, fontsize=18)
+
+        # Robot distance
+        self.distance, = ax2.plot([], [], color='green', linewidth=2.5)
+        ax2.set_xlabel('Time (s)', fontsize=16)
+        ax2.set_ylabel('Distance (m)', fontsize=16)
+        ax2.grid(True, alpha=0.3)
+        ax2.set_title('Distance Between Robots', pad=20, fontsize=18)
+
+        fig.suptitle('Robot Interaction Analysis', fontsize=20, y=0.95)
+        return fig
+
+    def update(self, plotter):
+        data = plotter.data
+        t, robot1_x, robot2_x = plotter.decimated(
+            self.ax1, data['TaskTime'], data['Robot1PosX'], data['Robot2PosX'])
+        self.robot1.set_data(t, robot1_x)
+        self.robot2.set_data(t, robot2_x)
+        self.distance.set_data(*plotter.decimated(self.ax2, data['TaskTime'],
+                                                  data['RobotDistanceDiff']))
+        _autoscale(self.ax1)
+        _autoscale(self.ax2)
+
+        # Event markers with staggered text positions
+        for i, (event, time) in enumerate(plotter.events.items()):
+            for ax in (self.ax1, self.ax2):
+                self.transient(ax.axvline(x=time, color='black', linestyle='--',
+                                          alpha=0.5, linewidth=2))
+                ymin, ymax = ax.get_ylim()
+                text_y = ymax - (i + 1) * (ymax - ymin) * 0.15
+                self.transient(ax.text(time + 0.5, text_y, event,
+                                       fontsize=14,
+                                       bbox=dict(facecolor='white',
+                                                 edgecolor='black',
+                                                 alpha=0.8,
+                                                 pad=5)))
+
+
+class HapticAnalysisTemplate(FigureTemplate):
+    COLUMNS = ['TaskTime', 'HapticForceX', 'HapticForceY', 'HapticForceZ',
+               'ForceMagnitude', 'BoxRotation', 'IsInContact']
+
+    def build(self):
+        fig = plt.figure(figsize=(16, 12))
+        gs = plt.GridSpec(2, 2, figure=fig)
+        self.ax1 = ax1 = fig.add_subplot(gs[0, 0])
+        self.ax2 = ax2 = fig.add_subplot(gs[0, 1])
+        self.ax3 = ax3 = fig.add_subplot(gs[1, 0])
+        self.ax4 = ax4 = fig.add_subplot(gs[1, 1])
+
+        # Force components during contact
+        self.forces = [ax1.plot([], [], color=color, linewidth=2.5, label=axis)[0]
+                       for axis, color in (('X', 'red'), ('Y', 'green'), ('Z', 'blue'))]
+        ax1.set_ylabel('Force (N)', fontsize=16)
+        ax1.grid(True, alpha=0.3)
+        ax1.legend(loc='upper right', fontsize=14, framealpha=0.9)
+        ax1.set_title('Force Components During Contact', pad=20, fontsize=18)
+
+        # Force distribution histogram
+        ax2.set_xlabel('Force Magnitude (N)', fontsize=16)
+        ax2.set_ylabel('Count', fontsize=16)
+        ax2.grid(True, alpha=0.3)
+        ax2.set_title('Force Distribution', pad=20, fontsize=18)
+
+        # Force vs Rotation with time-based coloring
+        self.force_rotation = ax3.scatter([], [], c=[], cmap='viridis', s=100, alpha=0.6)
+        cbar = plt.colorbar(self.force_rotation, ax=ax3)
+        cbar.set_label('Time (s)', fontsize=14, labelpad=15)
+        cbar.ax.tick_params(labelsize=12)
+        ax3.set_xlabel('Force Magnitude (N)', fontsize=16)
+        ax3.set_ylabel('Box Rotation (°)', fontsize=16)
+        ax3.grid(True, alpha=0.3)
+        ax3.set_title('Force-Rotation Relationship', pad=20, fontsize=18)
+
+        # Cumulative contact duration
+        self.cumulative, = ax4.plot([], [], color='black', linewidth=2.5)
+        ax4.set_xlabel('Time (s)', fontsize=16)
+        ax4.set_ylabel('Contact Duration (s)', fontsize=16)
+        ax4.grid(True, alpha=0.3)
+        ax4.set_title('Cumulative Contact Time', pad=20, fontsize=18)
+        self.title = None
+        return fig
+
+    def update(self, plotter):
+        data = plotter.data
+        try:
+            contact_mask = plotter.features.contact_mask()
+            contact_data = data[contact_mask]
+            t, *forces = plotter.decimated(
+                self.ax1, contact_data['TaskTime'], contact_data['HapticForceX'],
+                contact_data['HapticForceY'], contact_data['HapticForceZ'])
+            for line, values in zip(self.forces, forces):
+                line.set_data(t, values)
+
+            force_data = contact_data['ForceMagnitude']
+            if not force_data.empty:
+                bins = np.linspace(0, force_data.max(), 30)
+                self.transient(self.ax2.hist(force_data, bins=bins, color='blue', alpha=0.7,
+                                             edgecolor='black', linewidth=1.5)[2])
+
+            times, forces, rotations = plotter.decimated(
+                self.ax3, pd.to_numeric(contact_data['TaskTime']),
+                contact_data['ForceMagnitude'], contact_data['BoxRotation'])
+            _set_points(self.force_rotation, forces, rotations)
+            self.force_rotation.set_array(np.asarray(times))
+            if len(times):
+                self.force_rotation.autoscale()
+
+            times = pd.to_numeric(data['TaskTime'])
+            cumulative_contact = plotter.features.cumulative_contact()
+            self.cumulative.set_data(*plotter.decimated(self.ax4, times, cumulative_contact))
+        except Exception as e:
+            print(f"Error in haptic analysis plot: {e}")
+
+        _autoscale(self.ax1)
+        _autoscale(self.ax2)
+        _autoscale(self.ax3, self.force_rotation)
+        _autoscale(self.ax4)
+
+    def layout(self):
+        # The title goes above the laid-out axes: keep an earlier render's
+        # title out of tight_layout
+        if self.title is not None:
+            self.title.set_in_layout(False)
+        self.fig.tight_layout()
+        self.title = self.fig.suptitle('Haptic Interaction Analysis', fontsize=20, y=1.02)
+        self.title.set_in_layout(True)
+
+
+# Output name -> template class, matching ExperimentPlotter.PLOTS
+TEMPLATES = {
+    'system_latency': SystemLatencyTemplate,
+    'haptic_quality': HapticQualityTemplate,
+    'system_stability': SystemStabilityTemplate,
+    'timeline': TimelineTemplate,
+    'robot_interaction': RobotInteractionTemplate,
+    'haptic_analysis': HapticAnalysisTemplate,
+}
+
+
+class FigureTemplates:
+    """One lazily built template per figure name, reused for every session.
+
+    Building the figures (subplots, grid specs, labels, legends, colour
+    bars, tight_layout) dominates the per-figure cost when many short
+    sessions are rendered; with templates it is paid once per process.
+    """
+
+    def __init__(self):
+        self.templates = {}
+
+    def get(self, name):
+        if name not in self.templates:
+            self.templates[name] = TEMPLATES[name]()
+        return self.templates[name]
+
+    def close(self):
+        for template in self.templates.values():
+            template.close()
+        self.templates = {}
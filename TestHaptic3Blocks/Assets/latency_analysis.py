@@ -0,0 +1,289 @@
+import argparse
+import math
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from event_detection import detect_intervals
+from latency_statechanges_plot import detect_robot_movements, load_and_process_data
+from session_stats import find_sources, session_id
+
+QUANTILES = (0.5, 0.95, 0.99)
+SUMMARY_COLUMNS = ['session', 'samples', 'duration', 'mean', 'p50', 'p95', 'p99', 'max',
+                   'jitter', 'worst_window_p99', 'spikes', 'spikes_moving',
+                   'spike_rate_moving', 'spike_rate_idle', 'path']
+
+
+def _sorted(times, values):
+    """Drop NaNs and make the time axis non-decreasing"""
+    times = np.asarray(times, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    keep = ~(np.isnan(times) | np.isnan(values))
+    times, values = times[keep], values[keep]
+    if len(times) > 1 and np.any(np.diff(times) < 0):
+        order = np.argsort(times, kind='stable')
+        times, values = times[order], values[order]
+    return times, values
+
+
+def _prefix(values):
+    return np.concatenate(([0.0], np.cumsum(values)))
+
+
+def windowed_latency(times, latency, window=1.0, step=0.5, qs=QUANTILES,
+                     relative_accuracy=0.01):
+    """Latency statistics over sliding time windows (end - window, end].
+
+    Windows end every `step` seconds. Count, mean, std and jitter (mean
+    absolute change between consecutive samples) come from prefix sums.
+    Quantiles use the logarithmic buckets of sketches.QuantileSketch: a
+    bucket histogram slides along the series, each sample is added and
+    removed once, so the whole pass is O(n) plus O(buckets) per window and
+    every quantile is within `relative_accuracy` of a sample value.
+    """
+    times, latency = _sorted(times, latency)
+    columns = ['time', 'count', 'mean', 'std', 'jitter'] + [f'p{q * 100:g}' for q in qs]
+    if len(times) == 0:
+        return pd.DataFrame(columns=columns)
+
+    ends = np.arange(times[0] + window, times[-1] + step / 2, step)
+    if len(ends) == 0:
+        ends = times[-1:]
+    hi = np.searchsorted(times, ends, side='right')
+    lo = np.searchsorted(times, ends - window, side='right')
+    count = hi - lo
+
+    # Centered sums keep the variance well conditioned on long series
+    center = latency.mean()
+    s1 = _prefix(latency - center)
+    s2 = _prefix((latency - center) ** 2)
+    d1 = _prefix(np.abs(np.diff(latency)))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sum1 = s1[hi] - s1[lo]
+        mean = sum1 / count
+        var = (s2[hi] - s2[lo] - sum1 * mean) / (count - 1)
+        jitter = (d1[np.maximum(hi - 1, lo)] - d1[lo]) / (count - 1)
+    std = np.sqrt(np.where(count > 1, np.maximum(var, 0.0), np.nan))
+    jitter = np.where(count > 1, jitter, np.nan)
+
+    gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+    keys = np.ceil(np.log(np.maximum(latency, 1e-9)) / math.log(gamma)).astype(np.int64)
+    low_key = keys.min()
+    buckets = keys - low_key
+    n_buckets = int(buckets.max()) + 1
+    bucket_values = 2 * gamma ** (np.arange(n_buckets) + low_key) / (gamma + 1)
+    bucket_values[buckets[latency <= 1e-9]] = 0.0
+
+    qs = np.asarray(qs, dtype=np.float64)
+    quantiles = np.full((len(ends), len(qs)), np.nan)
+    counts = np.zeros(n_buckets, dtype=np.int64)
+    added = removed = 0
+    for i, (start, stop) in enumerate(zip(lo, hi)):
+        if stop > added:
+            counts += np.bincount(buckets[added:stop], minlength=n_buckets)
+            added = stop
+        if start > removed:
+            counts -= np.bincount(buckets[removed:start], minlength=n_buckets)
+            removed = start
+        if stop > start:
+            ranks = qs * (stop - start - 1)
+            idx = np.searchsorted(np.cumsum(counts), ranks, side='right')
+            quantiles[i] = bucket_values[np.minimum(idx, n_buckets - 1)]
+
+    frame = pd.DataFrame({'time': ends, 'count': count, 'mean': mean + center,
+                          'std': std, 'jitter': jitter})
+    for j, column in enumerate(columns[5:]):
+        frame[column] = quantiles[:, j]
+    return frame
+
+
+def detect_spikes(times, latency, baseline_window=5.0, threshold=3.0, off=None,
+                  min_excess=0.0, min_duration=0.0):
+    """Latency spikes against a trailing baseline.
+
+    Each sample is scored against the mean and std of the samples in the
+    `baseline_window` seconds before it (prefix sums, O(n)). A spike starts
+    when the score exceeds `threshold` and latency is at least `min_excess`
+    seconds above the baseline, and ends once the score drops to `off`
+    (defaults to `threshold`).
+    """
+    times, latency = _sorted(times, latency)
+    columns = ['start', 'end', 'duration', 'peak_latency', 'peak_score', 'baseline']
+    if len(times) < 3:
+        return pd.DataFrame(columns=columns)
+
+    lo = np.searchsorted(times, times - baseline_window, side='left')
+    hi = np.arange(len(times))
+    count = hi - lo
+    center = latency.mean()
+    s1 = _prefix(latency - center)
+    s2 = _prefix((latency - center) ** 2)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        sum1 = s1[hi] - s1[lo]
+        baseline = sum1 / count
+        var = (s2[hi] - s2[lo] - sum1 * baseline) / (count - 1)
+        excess = latency - center - baseline
+        score = excess / np.sqrt(np.maximum(var, 1e-18))
+    score[count < 2] = np.nan
+    score[excess < min_excess] = np.minimum(score[excess < min_excess], 0.0)
+
+    events = detect_intervals(times, score, on=threshold, off=off,
+                              min_duration=min_duration, include_open=True)
+    if len(events) == 0:
+        return pd.DataFrame(columns=columns)
+    bounds = np.column_stack([events['start_index'],
+                              np.maximum(events['end_index'], events['start_index'] + 1)]).ravel()
+    padded = np.append(latency, -np.inf)
+    return pd.DataFrame({
+        'start': events['start'],
+        'end': events['end'],
+        'duration': events['end'] - events['start'],
+        'peak_latency': np.maximum.reduceat(padded, bounds)[::2],
+        'peak_score': events['peak'],
+        'baseline': baseline[events['start_index']] + center,
+    })
+
+
+def correlate_spikes(spikes, movements, tolerance=0.5):
+    """Match spikes to robot movement intervals from MessageRate.
+
+    `movements` is a list of (start, end, label) as returned by
+    detect_robot_movements. Adds the index of the movement a spike starts
+    in (within `tolerance` seconds, -1 for none) and the lag since the most
+    recent movement onset.
+    """
+    spikes = spikes.copy()
+    starts = np.array([m[0] for m in movements], dtype=np.float64)
+    ends = np.array([m[1] for m in movements], dtype=np.float64)
+    spike_starts = spikes['start'].to_numpy(dtype=np.float64)
+    if len(starts) == 0:
+        spikes['movement'] = -1
+        spikes['onset_lag'] = np.nan
+        return spikes
+
+    idx = np.searchsorted(starts, spike_starts + tolerance, side='right') - 1
+    valid = idx >= 0
+    near = valid.copy()
+    near[valid] = spike_starts[valid] <= ends[idx[valid]] + tolerance
+    spikes['movement'] = np.where(near, idx, -1)
+    onset = np.searchsorted(starts, spike_starts, side='right') - 1
+    spikes['onset_lag'] = np.where(onset >= 0, spike_starts - starts[np.maximum(onset, 0)], np.nan)
+    return spikes
+
+
+def analyze_file(path, window=1.0, step=0.5, baseline_window=5.0, threshold=3.0,
+                 tolerance=0.5, use_cache=True):
+    """Windowed statistics, spikes and a one-row summary for one log.
+
+    Returns (summary, windows, spikes).
+    """
+    df = load_and_process_data(path, use_cache=use_cache)
+    times = df['Timestamp'].to_numpy(dtype=np.float64)
+    latency = df['AverageLatency'].to_numpy(dtype=np.float64)
+
+    windows = windowed_latency(times, latency, window, step)
+    movements = detect_robot_movements(df)
+    spikes = correlate_spikes(detect_spikes(times, latency, baseline_window, threshold),
+                              movements, tolerance)
+
+    times, latency = _sorted(times, latency)
+    duration = float(times[-1] - times[0]) if len(times) else 0.0
+    moving_time = sum(end - start for start, end, _ in movements)
+    idle_time = max(duration - moving_time, 0.0)
+    spikes_moving = int((spikes['movement'] >= 0).sum())
+    p50, p95, p99 = (np.percentile(latency, [50, 95, 99]) if len(latency)
+                     else (np.nan, np.nan, np.nan))
+    summary = {
+        'session': session_id(path),
+        'samples': len(latency),
+        'duration': duration,
+        'mean': float(latency.mean()) if len(latency) else np.nan,
+        'p50': p50,
+        'p95': p95,
+        'p99': p99,
+        'max': float(latency.max()) if len(latency) else np.nan,
+        'jitter': float(np.abs(np.diff(latency)).mean()) if len(latency) > 1 else np.nan,
+        'worst_window_p99': float(windows['p99'].max()) if len(windows) else np.nan,
+        'spikes': len(spikes),
+        'spikes_moving': spikes_moving,
+        'spike_rate_moving': spikes_moving / moving_time * 60 if moving_time else np.nan,
+        'spike_rate_idle': (len(spikes) - spikes_moving) / idle_time * 60 if idle_time else np.nan,
+        'path': str(path),
+    }
+    return summary, windows, spikes
+
+
+def compare_to_baseline(table, baseline=None):
+    """Percent change of p50/p95/p99 against a baseline session.
+
+    Sessions are ordered by id (their recording timestamp); the baseline
+    defaults to the first one, so the columns show drift across builds.
+    """
+    table = table.sort_values('session').reset_index(drop=True)
+    if table.empty:
+        return table
+    reference = table[table['session'] == baseline] if baseline else table.iloc[:1]
+    if reference.empty:
+        raise ValueError(f'Baseline session {baseline} not among the inputs')
+    for column in ('p50', 'p95', 'p99'):
+        table[f'{column}_change_%'] = (table[column] / reference[column].iloc[0] - 1) * 100
+    return table
+
+
+def main(argv=None):
+    """Command line entry point for latency analysis across many logs."""
+    parser = argparse.ArgumentParser(
+        description='Latency percentiles, jitter and spikes of system_performance logs')
+    parser.add_argument('inputs', nargs='+',
+                        help='system_performance CSV files, glob patterns or directories')
+    parser.add_argument('-o', '--output', default='latency_summary.csv')
+    parser.add_argument('--windows-dir',
+                        help='also write per-file windowed statistics and spikes here')
+    parser.add_argument('--window', type=float, default=1.0, help='window length (s)')
+    parser.add_argument('--step', type=float, default=0.5, help='window step (s)')
+    parser.add_argument('--baseline-window', type=float, default=5.0,
+                        help='trailing window spikes are scored against (s)')
+    parser.add_argument('--threshold', type=float, default=3.0,
+                        help='spike threshold in standard deviations')
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help='max distance between a spike and a movement (s)')
+    parser.add_argument('--baseline', help='session id the others are compared to '
+                        '(default: the earliest)')
+    parser.add_argument('--no-cache', action='store_true', help='bypass the parse cache')
+    args = parser.parse_args(argv)
+
+    paths = [path for kind, path in find_sources(args.inputs) if kind == 'system_performance']
+    if not paths:
+        print('No system_performance files found')
+        return 1
+
+    start = time.perf_counter()
+    rows = []
+    for path in paths:
+        try:
+            summary, windows, spikes = analyze_file(
+                path, args.window, args.step, args.baseline_window, args.threshold,
+                args.tolerance, use_cache=not args.no_cache)
+        except Exception as e:
+            print(f'Error analyzing {path}: {e}')
+            continue
+        rows.append(summary)
+        if args.windows_dir:
+            out = Path(args.windows_dir)
+            out.mkdir(parents=True, exist_ok=True)
+            windows.to_csv(out / f'latency_windows_{summary["session"]}.csv', index=False)
+            spikes.to_csv(out / f'latency_spikes_{summary["session"]}.csv', index=False)
+
+    table = compare_to_baseline(pd.DataFrame(rows, columns=SUMMARY_COLUMNS), args.baseline)
+    table.to_csv(args.output, index=False)
+    print(f'Analyzed {len(rows)} files in {time.perf_counter() - start:.2f}s -> {args.output}')
+    shown = ['session', 'samples', 'p50', 'p95', 'p99', 'jitter', 'spikes', 'spikes_moving',
+             'p95_change_%', 'p99_change_%']
+    print(table[[c for c in shown if c in table.columns]].to_string(index=False))
+    return 0 if len(rows) == len(paths) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,63 +1,102 @@
+import argparse
+from pathlib import Path
+
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
-from pathlib import Path
 from scipy.signal import savgol_filter
 import matplotlib.patches as mpatches
+from decimation import decimate, pixel_width
+from event_detection import detect_intervals
+from figure_export import DEFAULT_PROFILES, PROFILES, FigureExporter
+from profiling import NULL_PROFILER, add_profile_arguments, profiler_from_args
+from session_cache import load_cached
+from session_reader import read_log_csv
+from sketches import sketch_chunks
+
+def read_performance_file(filepath):
+    """Parse a system performance CSV into typed columns."""
+    return read_log_csv(filepath, 'system_performance')
 
-def load_and_process_data(filepath):
+def load_and_process_data(filepath, use_cache=True, cache_dir=None):
     """Load and process the system performance CSV data."""
-    df = pd.read_csv(filepath)
-    
-    numeric_columns = ['Timestamp', 'AverageLatency', 'MessageRate']
-    for col in numeric_columns:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
+    if use_cache:
+        df = load_cached(filepath, read_performance_file, 'system_performance', cache_dir)
+    else:
+        df = read_performance_file(filepath)
     
     df['Timestamp'] = df['Timestamp'] - df['Timestamp'].min()
     return df
 
+def latency_percentiles(source, chunksize=100_000):
+    """Latency distribution of a performance log or an already loaded frame.
+
+    A path is read in chunks, so memory stays constant however long the log
+    is; a DataFrame is sketched as is. Returns the DistributionSketch
+    summary (count, mean, std, min, max, p50, p95, p99).
+    """
+    if isinstance(source, pd.DataFrame):
+        chunks = [source]
+    else:
+        chunks = read_log_csv(source, 'system_performance', columns=['AverageLatency'],
+                              chunksize=chunksize)
+    return sketch_chunks(chunks, ['AverageLatency'])['AverageLatency'].summary()
+
 def smooth_data(data, window=11, poly=3):
-    """Apply Savitzky-Golay filter to smooth the data."""
-    try:
-        return savgol_filter(data, window, poly)
-    except:
+    """Apply Savitzky-Golay filter to smooth the data.
+
+    The window shrinks to the longest odd length the series allows; series
+    too short for a degree-`poly` fit are returned unsmoothed.
+    """
+    data = np.asarray(data)
+    window = min(window, len(data) if len(data) % 2 else len(data) - 1)
+    if window <= poly:
         return data
+    return savgol_filter(data, window, poly)
 
-def detect_robot_movements(df, threshold=0.1):
+def detect_robot_movements(df, threshold=0.1, min_duration=0.1):
     """Detect robot movement events based on message rate."""
-    events = []
     message_rate = df['MessageRate'].values
     timestamps = df['Timestamp'].values
     
-    in_movement = False
-    movement_start = 0
-    min_duration = 0.1
+    intervals = detect_intervals(timestamps[1:], message_rate[1:],
+                                 on=threshold, min_duration=min_duration)
     
-    for i in range(1, len(message_rate)):
-        if not in_movement and message_rate[i] > threshold:
-            movement_start = timestamps[i]
-            in_movement = True
-        elif in_movement and message_rate[i] <= threshold:
-            if timestamps[i] - movement_start >= min_duration:
-                event_type = "Initialize\n Robots\nMoving" if len(events) % 2 == 0 else "Robots\n Stopped"
-                events.append((movement_start, timestamps[i], event_type))
-                in_movement = False
+    events = []
+    for start, end in zip(intervals['start'], intervals['end']):
+        event_type = "Initialize\n Robots\nMoving" if len(events) % 2 == 0 else "Robots\n Stopped"
+        events.append((start, end, event_type))
     
     return events
 
-def create_latency_plot(df, output_dir='experiment_plots'):
-    """Create compact plot showing latency and robot movements."""
-    Path(output_dir).mkdir(parents=True, exist_ok=True)
-    
+def create_latency_plot(df, output_dir='experiment_plots', decimate_series=True,
+                        profiles=DEFAULT_PROFILES, profiler=NULL_PROFILER):
+    """Create compact plot showing latency and robot movements.
+    
+    With decimate_series the latency curve is reduced to the output pixel
+    width (keeping per-pixel minima and maxima) before drawing. The figure
+    is written once per export profile; returns the export records.
+    """
+    with profiler.figure('latency_analysis'):
+        return _create_latency_plot(df, output_dir, decimate_series, profiles, profiler)
+
+def _create_latency_plot(df, output_dir, decimate_series, profiles, profiler):
     plt.style.use('seaborn-v0_8-darkgrid')
     fig, ax = plt.subplots(figsize=(10, 5))
     
     # Detect events
-    events = detect_robot_movements(df)
+    with profiler.span('detect_robot_movements'):
+        events = detect_robot_movements(df)
     
     # # Smooth Plot latency
-    latency_smooth = smooth_data(df['AverageLatency'])
-    l1 = ax.plot(df['Timestamp'], latency_smooth, 
+    with profiler.span('smooth_data'):
+        latency_smooth = smooth_data(df['AverageLatency'])
+    timestamps = df['Timestamp']
+    if decimate_series:
+        with profiler.span('decimate'):
+            timestamps, latency_smooth = decimate(timestamps, latency_smooth,
+                                                  max_points=2 * pixel_width(ax, 300))
+    l1 = ax.plot(timestamps, latency_smooth, 
                  color='#e74c3c', label='Response Time', 
                  linewidth=3, alpha=0.8)
     
@@ -67,7 +106,7 @@ def create_latency_plot(df, output_dir='experiment_plots'):
     #              linewidth=3, alpha=0.8)
     
     # Calculate maximum height for text positioning
-    max_height = max(latency_smooth)
+    max_height = np.max(latency_smooth)
     text_height = max_height * 1.2
     
     # Add event markers
@@ -129,18 +168,37 @@ def create_latency_plot(df, output_dir='experiment_plots'):
     # Set y-axis limits to fit text boxes
     ax.set_ylim(0, text_height * 1.3)
     
-    plt.tight_layout()
-    plt.savefig(f'{output_dir}/latency_analysis.png',
-                dpi=300, bbox_inches='tight',
-                facecolor='white', edgecolor='none')
-    plt.close()
+    with profiler.span('tight_layout'):
+        plt.tight_layout()
+    with FigureExporter(profiles, pad_inches=0.1, profiler=profiler,
+                        facecolor='white', edgecolor='none') as exporter:
+        exporter.export(fig, output_dir, 'latency_analysis')
+    return exporter.records
 
-def main():
+def main(argv=None):
     """Main function to run the analysis."""
-    filepath = r"ExperimentData\system_performance__20241109_225117.csv"
-    
-    df = load_and_process_data(filepath)
-    create_latency_plot(df)
+    parser = argparse.ArgumentParser(description='Plot latency against robot movements')
+    parser.add_argument('csv_file', nargs='?',
+                        default=str(Path('ExperimentData') / 'system_performance__20241109_225117.csv'))
+    parser.add_argument('-o', '--output-dir', default='experiment_plots')
+    parser.add_argument('--profiles', nargs='+', choices=list(PROFILES),
+                        default=list(DEFAULT_PROFILES))
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+    profiler = profiler_from_args(args)
+
+    with profiler.span('load', file=args.csv_file):
+        df = load_and_process_data(args.csv_file)
+    create_latency_plot(df, args.output_dir, profiles=args.profiles, profiler=profiler)
+
+    with profiler.span('latency_percentiles'):
+        stats = latency_percentiles(df)
+    print(f"Latency p50/p95/p99: {stats['p50']:.3f}/{stats['p95']:.3f}/{stats['p99']:.3f}s")
+
+    trace = profiler.write(args.output_dir)
+    if trace is not None:
+        profiler.print_report()
+        print(f"Profile trace: {trace}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
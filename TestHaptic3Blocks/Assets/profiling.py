@@ -0,0 +1,142 @@
+import contextlib
+import cProfile
+import json
+import os
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+TRACE_FILE = 'profile_trace.json'
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+class Profiler:
+    """Timed spans, with optional cProfile and tracemalloc capture per figure.
+
+    Spans are kept as Chrome trace events ("X" complete events, one row per
+    thread), so write() produces a file chrome://tracing or Perfetto opens
+    directly. A disabled profiler hands out one shared no-op context, so the
+    instrumented code costs one attribute lookup and call per span.
+    """
+
+    def __init__(self, enabled=True, cprofile=False, memory=False):
+        self.enabled = enabled
+        self.cprofile = enabled and cprofile
+        self.memory = enabled and memory
+        self.events = []
+        self.profiles = {}
+        self._origin = time.perf_counter()
+        self._started_tracemalloc = False
+
+    def span(self, name, **args):
+        """Context manager timing one stage"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(name, args)
+
+    @contextlib.contextmanager
+    def _span(self, name, args):
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            end = time.perf_counter()
+            self.events.append({
+                'name': name,
+                'ph': 'X',
+                'ts': (start - self._origin) * 1e6,
+                'dur': (end - start) * 1e6,
+                'pid': os.getpid(),
+                'tid': threading.get_ident(),
+                'args': args,
+            })
+
+    def figure(self, name):
+        """Span around one figure, with cProfile/tracemalloc capture if enabled"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._figure(name)
+
+    @contextlib.contextmanager
+    def _figure(self, name):
+        profile = cProfile.Profile() if self.cprofile else None
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        with self.span(f'figure:{name}') as args:
+            if profile is not None:
+                profile.enable()
+            try:
+                yield args
+            finally:
+                if profile is not None:
+                    profile.disable()
+                    self.profiles[name] = profile
+                if self.memory:
+                    current, peak = tracemalloc.get_traced_memory()
+                    args['peak_alloc_mb'] = (peak - before) / 2 ** 20
+                    args['retained_mb'] = (current - before) / 2 ** 20
+
+    def totals(self):
+        """Total seconds per span name"""
+        totals = {}
+        for event in self.events:
+            totals[event['name']] = totals.get(event['name'], 0.0) + event['dur'] / 1e6
+        return totals
+
+    def write(self, output_dir, filename=TRACE_FILE):
+        """Write the Chrome trace and any cProfile stats next to the outputs.
+
+        Returns the trace path, or None when profiling is off.
+        """
+        if not self.enabled:
+            return None
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        for name, profile in self.profiles.items():
+            profile.dump_stats(output_dir / f'profile_{name}.prof')
+        path = output_dir / filename
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms',
+                       'otherData': {'totals_s': self.totals()}}, f)
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        return path
+
+    def print_report(self):
+        if not self.enabled or not self.events:
+            return
+        print(f"\n{'stage':<40} {'calls':>6} {'total ms':>10}")
+        counts = {}
+        for event in self.events:
+            counts[event['name']] = counts.get(event['name'], 0) + 1
+        for name, total in sorted(self.totals().items(), key=lambda item: -item[1]):
+            print(f"{name:<40} {counts[name]:>6} {total * 1000:10.1f}")
+
+
+# Shared disabled profiler, the default everywhere instrumentation exists
+NULL_PROFILER = Profiler(enabled=False)
+
+
+def add_profile_arguments(parser):
+    """--profile / --cprofile / --tracemalloc flags for a command line tool"""
+    group = parser.add_argument_group('profiling')
+    group.add_argument('--profile', action='store_true',
+                       help=f'time every stage and write {TRACE_FILE} (Chrome trace) '
+                       'next to the outputs')
+    group.add_argument('--cprofile', action='store_true',
+                       help='with --profile, also write cProfile stats per figure')
+    group.add_argument('--tracemalloc', action='store_true',
+                       help='with --profile, record peak allocations per figure')
+
+
+def profiler_from_args(args):
+    if not args.profile:
+        return NULL_PROFILER
+    return Profiler(cprofile=args.cprofile, memory=args.tracemalloc)
@@ -0,0 +1,265 @@
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from session_reader import READER_VERSION
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+CACHE_DIR_NAME = '.session_cache'
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+INDEX_FILE = 'index.json'
+LOCK_FILE = 'index.lock'
+# Touched on every hit; its mtime is the entry's last use for eviction
+STAMP_FILE = 'last_used'
+
+
+def file_digest(path, block_size=1 << 20):
+    """Content hash of a file, read in fixed-size blocks"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class SessionCache:
+    """Columnar on-disk cache for parsed session CSVs.
+
+    Each entry is a directory with one .npy file per column, so a later load
+    memory-maps the arrays instead of parsing text. Entries are keyed by the
+    source path and validated against its mtime, size and content hash, and
+    against READER_VERSION so a reader change never serves stale frames.
+    Least recently used entries are evicted once the cache grows past
+    `max_bytes`.
+
+    Several processes share one cache (batch_report warms and renders
+    sessions in parallel): every change to index.json happens under an
+    exclusive lock on a sidecar file, and a cache hit only touches the
+    entry's stamp file instead of rewriting the index.
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.index_path = self.cache_dir / INDEX_FILE
+
+    def load(self, csv_file, reader, kind):
+        """Return the DataFrame for `csv_file`, parsing it with `reader` on a miss"""
+        csv_file = Path(csv_file)
+        key = f'{kind}:{csv_file.resolve()}'
+        stat = csv_file.stat()
+        index = self._read_index()
+        record = index.get(key)
+
+        if record is not None and self._is_valid(record, csv_file, stat):
+            frame = self._read_entry(record['entry'])
+            if frame is not None:
+                self._touch(record['entry'])
+                if record['mtime'] != stat.st_mtime:
+                    # Touched but unchanged: store the new mtime so later
+                    # hits skip hashing
+                    with self._locked():
+                        index = self._read_index()
+                        if index.get(key, {}).get('entry') == record['entry']:
+                            index[key]['mtime'] = stat.st_mtime
+                            self._write_index(index)
+                return frame
+
+        digest = file_digest(csv_file)
+        frame = reader(csv_file)
+        if frame is None or frame.empty:
+            return frame
+
+        entry = f'{kind}_v{READER_VERSION}_{digest}'
+        # Parse and write outside the lock; only publishing the entry and
+        # updating the index are serialized
+        tmp_dir = self._build_entry(entry, frame)
+        with self._locked():
+            nbytes = self._publish_entry(entry, tmp_dir)
+            index = self._read_index()
+            stale = index.pop(key, None)
+            if stale is not None and stale['entry'] != entry:
+                self._drop_unreferenced(index, stale['entry'])
+            index[key] = {
+                'entry': entry,
+                'mtime': stat.st_mtime,
+                'size': stat.st_size,
+                'hash': digest,
+                'reader_version': READER_VERSION,
+                'nbytes': nbytes,
+                'last_used': time.time(),
+            }
+            self._evict(index, keep=key)
+            self._write_index(index)
+        cached = self._read_entry(entry)
+        # Another process may evict the entry right away; the parsed frame is still good
+        return frame if cached is None else cached
+
+    def clear(self):
+        """Remove every cached entry"""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def _is_valid(self, record, csv_file, stat):
+        if record.get('reader_version') != READER_VERSION or record['size'] != stat.st_size:
+            return False
+        if record['mtime'] == stat.st_mtime:
+            return True
+        # Touched but possibly unchanged: only the content hash can tell
+        return record['hash'] == file_digest(csv_file)
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """Exclusive inter-process lock around an index read-modify-write"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.cache_dir / LOCK_FILE, 'a+b') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                while True:
+                    try:
+                        # LK_LOCK gives up after about 10 s of retries
+                        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _touch(self, entry):
+        try:
+            (self.cache_dir / entry / STAMP_FILE).touch()
+        except OSError:
+            pass
+
+    def _last_used(self, record):
+        try:
+            return (self.cache_dir / record['entry'] / STAMP_FILE).stat().st_mtime
+        except OSError:
+            return record['last_used']
+
+    def _read_index(self):
+        try:
+            with open(self.index_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self, index):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_name(f'{INDEX_FILE}.{uuid.uuid4().hex}')
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self.index_path)
+
+    def _build_entry(self, entry, frame):
+        """Write `frame` into a scratch directory; None if the entry exists"""
+        if (self.cache_dir / entry / 'meta.json').exists():
+            return None
+
+        # Build in a scratch directory so concurrent readers never see half an entry
+        tmp_dir = self.cache_dir / f'.{entry}.{uuid.uuid4().hex}'
+        tmp_dir.mkdir(parents=True)
+        meta = {'columns': [], 'categories': {}}
+        for i, col in enumerate(frame.columns):
+            values = frame[col]
+            if isinstance(values.dtype, pd.CategoricalDtype) or not pd.api.types.is_numeric_dtype(values):
+                categorical = values.astype('category')
+                meta['categories'][col] = [str(c) for c in categorical.cat.categories]
+                array = categorical.cat.codes.to_numpy()
+            else:
+                array = values.to_numpy()
+            np.save(tmp_dir / f'{i}.npy', array, allow_pickle=False)
+            meta['columns'].append(col)
+        with open(tmp_dir / 'meta.json', 'w') as f:
+            json.dump(meta, f)
+        (tmp_dir / STAMP_FILE).touch()
+        return tmp_dir
+
+    def _publish_entry(self, entry, tmp_dir):
+        """Move a built entry into place (call with the lock held)"""
+        entry_dir = self.cache_dir / entry
+        if tmp_dir is not None:
+            try:
+                os.replace(tmp_dir, entry_dir)
+            except OSError:
+                # Another process finished the same entry first
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        return self._entry_size(entry_dir)
+
+    def _read_entry(self, entry):
+        entry_dir = self.cache_dir / entry
+        try:
+            with open(entry_dir / 'meta.json', 'r') as f:
+                meta = json.load(f)
+            columns = {}
+            for i, col in enumerate(meta['columns']):
+                array = np.load(entry_dir / f'{i}.npy', mmap_mode='r')
+                if col in meta['categories']:
+                    columns[col] = pd.Categorical.from_codes(array, meta['categories'][col])
+                else:
+                    columns[col] = array
+        except (OSError, ValueError, KeyError):
+            return None
+        return pd.DataFrame(columns, copy=False)
+
+    def _entry_size(self, entry_dir):
+        return sum(p.stat().st_size for p in entry_dir.iterdir())
+
+    def _evict(self, index, keep):
+        # Entries are published under the lock, so an unreferenced entry
+        # directory is left over from an older, unlocked version of the cache
+        referenced = {record['entry'] for record in index.values()}
+        for path in self.cache_dir.iterdir():
+            if path.is_dir() and not path.name.startswith('.') and path.name not in referenced:
+                shutil.rmtree(path, ignore_errors=True)
+
+        sizes = {record['entry']: record['nbytes'] for record in index.values()}
+        total = sum(sizes.values())
+        for key in sorted(index, key=lambda k: self._last_used(index[k])):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            entry = index.pop(key)['entry']
+            if self._drop_unreferenced(index, entry):
+                total -= sizes[entry]
+
+    def _drop_unreferenced(self, index, entry):
+        if any(record['entry'] == entry for record in index.values()):
+            return False
+        shutil.rmtree(self.cache_dir / entry, ignore_errors=True)
+        return True
+
+
+_caches = {}
+
+
+def load_cached(csv_file, reader, kind, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+    """Load `csv_file` through the session cache next to it (or in `cache_dir`)"""
+    if cache_dir is None:
+        cache_dir = Path(csv_file).parent / CACHE_DIR_NAME
+    cache_dir = Path(cache_dir)
+    cache = _caches.get(cache_dir)
+    if cache is None:
+        cache = _caches[cache_dir] = SessionCache(cache_dir, max_bytes)
+    return cache.load(csv_file, reader, kind)
@@ -0,0 +1,302 @@
+import argparse
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from session_reader import read_log_csv
+from session_stats import (CHUNK_ROWS, ROTATION_THRESHOLD, SOURCES, TABLE_COLUMNS,
+                           SessionStats, find_sources, session_id)
+
+CATALOG_FILE = 'session_catalog.db'
+# Bump when the tables or the stored metrics change; older catalogs are rebuilt
+SCHEMA_VERSION = 1
+
+TIME_COLUMNS = {
+    'experiment_session': 'TaskTime',
+    'system_performance': 'Timestamp',
+}
+
+# Headline metrics stored as columns of `files`: column -> (metric, statistic)
+HEADLINE = {
+    'mean_rotation_error': ('rotation_error', 'mean'),
+    'max_rotation_error': ('rotation_error', 'max'),
+    'stability_violations': ('stability_violation', 'sum'),
+    'contact_percentage': ('contact_percentage', 'mean'),
+    'mean_contact_force': ('contact_force', 'mean'),
+    'mean_latency': ('latency', 'mean'),
+    'p95_latency': ('latency', 'p95'),
+    'max_latency': ('latency', 'max'),
+    'mean_message_rate': ('message_rate', 'mean'),
+}
+
+FILE_COLUMNS = ['path', 'kind', 'session', 'started_at', 'size', 'mtime', 'scanned_at',
+                'samples', 'duration', *HEADLINE]
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    session TEXT NOT NULL,
+    started_at TEXT,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    scanned_at REAL NOT NULL,
+    samples INTEGER,
+    duration REAL,
+    {', '.join(f'{column} REAL' for column in HEADLINE)}
+);
+CREATE INDEX IF NOT EXISTS files_started_at ON files (started_at);
+CREATE INDEX IF NOT EXISTS files_session ON files (session);
+CREATE TABLE IF NOT EXISTS metrics (
+    path TEXT NOT NULL REFERENCES files (path) ON DELETE CASCADE,
+    metric TEXT NOT NULL,
+    {', '.join(f'"{column}" REAL' for column in TABLE_COLUMNS[3:])},
+    PRIMARY KEY (path, metric)
+);
+"""
+
+
+def started_at(session):
+    """'20241109_224136' -> '2024-11-09 22:41:36' (None if not a timestamp)"""
+    try:
+        return datetime.strptime(session, '%Y%m%d_%H%M%S').isoformat(sep=' ')
+    except ValueError:
+        return None
+
+
+def _until_condition(until):
+    """An inclusive upper bound on started_at; a bare date includes that whole day"""
+    try:
+        day = datetime.strptime(until, '%Y-%m-%d')
+    except ValueError:
+        return 'started_at <= ?', until
+    return 'started_at < ?', (day + timedelta(days=1)).strftime('%Y-%m-%d')
+
+
+def scan_file(kind, path, rotation_threshold=ROTATION_THRESHOLD):
+    """Catalog row and metric rows of one log, read chunk by chunk"""
+    stats = SessionStats(rotation_threshold)
+    time_column = TIME_COLUMNS[kind]
+    first = last = np.nan
+    samples = 0
+    for chunk in read_log_csv(path, kind, columns=[time_column, *SOURCES[kind]['columns']],
+                              chunksize=CHUNK_ROWS):
+        stats.update(kind, chunk)
+        times = chunk[time_column].to_numpy()
+        if len(times):
+            first = times[0] if samples == 0 else first
+            last = times[-1]
+        samples += len(times)
+
+    metrics = {row[2]: dict(zip(TABLE_COLUMNS, row)) for row in stats.rows(None, kind)}
+    row = {
+        'samples': samples,
+        'duration': float(last - first) if samples else None,
+    }
+    for column, (metric, statistic) in HEADLINE.items():
+        value = metrics.get(metric, {}).get(statistic)
+        row[column] = None if value is None or np.isnan(value) else float(value)
+    metric_rows = [[metric, *(values[c] for c in TABLE_COLUMNS[3:])]
+                   for metric, values in metrics.items()]
+    return row, metric_rows
+
+
+class SessionCatalog:
+    """SQLite index of session logs with metadata and summary metrics.
+
+    scan() only reads files whose size or mtime changed since the last scan
+    and drops files that disappeared, so rescanning a large ExperimentData
+    folder costs one stat() per file. query() filters on indexed columns and
+    answers without touching any log.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.db_path)
+        self.connection.execute('PRAGMA foreign_keys = ON')
+        if self.connection.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+            self.connection.executescript('DROP TABLE IF EXISTS metrics; DROP TABLE IF EXISTS files;')
+            self.connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        self.connection.executescript(SCHEMA)
+
+    @classmethod
+    def for_directory(cls, data_dir):
+        """The catalog kept inside a data directory"""
+        return cls(Path(data_dir) / CATALOG_FILE)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def scan(self, inputs, workers=None, rotation_threshold=ROTATION_THRESHOLD, prune=True):
+        """Index new and changed logs among `inputs`.
+
+        Returns (added_or_updated, unchanged, removed) counts. With `prune`,
+        catalog entries under the scanned directories whose file is gone are
+        removed.
+        """
+        known = {path: (size, mtime) for path, size, mtime in
+                 self.connection.execute('SELECT path, size, mtime FROM files')}
+        sources = find_sources(inputs)
+        pending = []
+        for kind, path in sources:
+            stat = path.stat()
+            key = str(path.resolve())
+            if known.get(key) != (stat.st_size, stat.st_mtime):
+                pending.append((kind, path, key, stat))
+
+        rows = []
+        if pending:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(scan_file, kind, path, rotation_threshold)
+                           for kind, path, _, _ in pending]
+                for (kind, path, key, stat), future in zip(pending, futures):
+                    try:
+                        rows.append((kind, path, key, stat, *future.result()))
+                    except Exception as e:
+                        print(f'Error reading {path}: {e}')
+
+        scanned_at = time.time()
+        with self.connection:
+            for kind, path, key, stat, row, metric_rows in rows:
+                session = session_id(path)
+                row.update(path=key, kind=kind, session=session, started_at=started_at(session),
+                           size=stat.st_size, mtime=stat.st_mtime, scanned_at=scanned_at)
+                self.connection.execute('DELETE FROM files WHERE path = ?', (key,))
+                self.connection.execute(
+                    f"INSERT INTO files ({', '.join(FILE_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(FILE_COLUMNS))})",
+                    [row[column] for column in FILE_COLUMNS])
+                self.connection.executemany(
+                    f"INSERT INTO metrics VALUES ({', '.join('?' * (len(TABLE_COLUMNS) - 1))})",
+                    [[key, *metric_row] for metric_row in metric_rows])
+
+            removed = 0
+            if prune:
+                present = {str(path.resolve()) for _, path in sources}
+                roots = [str(Path(item).resolve()) for item in inputs if Path(item).is_dir()]
+                gone = [path for path in known if path not in present
+                        and any(Path(path).parent == Path(root) for root in roots)]
+                self.connection.executemany('DELETE FROM files WHERE path = ?',
+                                            [(path,) for path in gone])
+                removed = len(gone)
+        return len(rows), len(sources) - len(pending), removed
+
+    def query(self, kind=None, since=None, until=None, min_duration=None, max_duration=None,
+              min_contact=None, max_contact=None, max_latency=None, where=None, params=()):
+        """Catalog rows matching every given filter, newest first.
+
+        `since`/`until` are inclusive bounds on the session start
+        ('2024-11-09' or '2024-11-09 22:00:00'; a date alone as `until`
+        covers that whole day); `max_latency` bounds the mean latency. Extra
+        SQL conditions on the `files` columns can be passed as `where` with
+        `params`.
+        """
+        conditions = []
+        values = []
+        until_condition, until = _until_condition(until) if until is not None else ('', None)
+        for condition, value in [('kind = ?', kind), ('started_at >= ?', since),
+                                 (until_condition, until), ('duration >= ?', min_duration),
+                                 ('duration <= ?', max_duration),
+                                 ('contact_percentage >= ?', min_contact),
+                                 ('contact_percentage <= ?', max_contact),
+                                 ('mean_latency <= ?', max_latency)]:
+            if value is not None:
+                conditions.append(condition)
+                values.append(value)
+        if where:
+            conditions.append(f'({where})')
+            values.extend(params)
+        sql = 'SELECT * FROM files'
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        sql += ' ORDER BY started_at DESC, path'
+        return pd.read_sql_query(sql, self.connection, params=values)
+
+    def paths(self, **filters):
+        """Paths of the matching logs, ready for plotting or aggregation"""
+        return [Path(path) for path in self.query(**filters)['path']]
+
+    def metrics(self, paths=None):
+        """Tidy per-metric statistics (as in session_stats) of the given logs"""
+        sql = 'SELECT files.session, files.kind AS source, metrics.* FROM metrics ' \
+              'JOIN files USING (path)'
+        values = []
+        if paths is not None:
+            values = [str(Path(path).resolve()) for path in paths]
+            sql += f" WHERE path IN ({', '.join('?' * len(values))})"
+        return pd.read_sql_query(sql, self.connection, params=values)
+
+
+def main(argv=None):
+    """Command line entry point for the session catalog."""
+    parser = argparse.ArgumentParser(description='Index and query experiment session logs')
+    parser.add_argument('--catalog', help=f'catalog file (default: <data dir>/{CATALOG_FILE})')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    scan = commands.add_parser('scan', help='index new and changed logs')
+    scan.add_argument('inputs', nargs='*', default=['ExperimentData'],
+                      help='data directories, files or glob patterns')
+    scan.add_argument('-j', '--workers', type=int, default=os.cpu_count(),
+                      help='number of worker processes (default: all cores)')
+    scan.add_argument('--rotation-threshold', type=float, default=ROTATION_THRESHOLD,
+                      help='rotation error counted as a stability violation (degrees)')
+
+    query = commands.add_parser('query', help='list indexed sessions')
+    query.add_argument('data_dir', nargs='?', default='ExperimentData')
+    query.add_argument('--kind', choices=list(SOURCES))
+    query.add_argument('--since', help="earliest session start, e.g. '2024-11-09'")
+    query.add_argument('--until', help="latest session start; a date alone includes that day")
+    query.add_argument('--min-duration', type=float, help='seconds')
+    query.add_argument('--max-duration', type=float, help='seconds')
+    query.add_argument('--min-contact', type=float, help='contact percentage')
+    query.add_argument('--max-contact', type=float, help='contact percentage')
+    query.add_argument('--max-latency', type=float, help='mean latency (ms)')
+    query.add_argument('--where', help='extra SQL condition on the catalog columns')
+    query.add_argument('--paths', action='store_true', help='print only the file paths')
+    query.add_argument('-o', '--output', help='write the matching rows to a CSV file')
+    args = parser.parse_args(argv)
+
+    if args.command == 'scan':
+        data_dir = next((item for item in args.inputs if Path(item).is_dir()), '.')
+        catalog_path = args.catalog or Path(data_dir) / CATALOG_FILE
+        start = time.perf_counter()
+        with SessionCatalog(catalog_path) as catalog:
+            updated, unchanged, removed = catalog.scan(args.inputs, args.workers,
+                                                       args.rotation_threshold)
+        print(f'{updated} indexed, {unchanged} unchanged, {removed} removed in '
+              f'{time.perf_counter() - start:.2f}s -> {catalog_path}')
+        return 0
+
+    catalog_path = Path(args.catalog or Path(args.data_dir) / CATALOG_FILE)
+    if not catalog_path.exists():
+        print(f'No catalog at {catalog_path}; run "scan" first')
+        return 1
+    with SessionCatalog(catalog_path) as catalog:
+        rows = catalog.query(kind=args.kind, since=args.since, until=args.until,
+                             min_duration=args.min_duration, max_duration=args.max_duration,
+                             min_contact=args.min_contact, max_contact=args.max_contact,
+                             max_latency=args.max_latency, where=args.where)
+    if args.output:
+        rows.to_csv(args.output, index=False)
+    if args.paths:
+        print('\n'.join(rows['path']))
+    else:
+        print(rows.drop(columns=['path', 'mtime', 'scanned_at']).to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
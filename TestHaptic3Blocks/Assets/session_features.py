@@ -0,0 +1,94 @@
+import functools
+import inspect
+
+import numpy as np
+
+from time_alignment import sample_durations
+
+
+def feature(method):
+    """Memoize a SessionFeatures method per parameter set.
+
+    Arguments are bound against the signature with defaults applied, so
+    smoothed('Robot1Speed') and smoothed('Robot1Speed', window=5) share one
+    cache entry.
+    """
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def cached(self, *args, **kwargs):
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        key = (method.__name__,) + tuple(bound.arguments.items())[1:]
+        if key not in self._cache:
+            self._cache[key] = method(self, *args, **kwargs)
+        return self._cache[key]
+
+    return cached
+
+
+class SessionFeatures:
+    """Derived signals of one session, each computed once per parameter set.
+
+    Plots, movement detection and export code all read their derived
+    series from here, so a smoothed speed or an update interval is computed
+    a single time per session and every consumer sees the same numbers.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self._cache = {}
+
+    def clear(self):
+        self._cache = {}
+
+    @feature
+    def update_intervals(self):
+        """Seconds between consecutive samples (length n - 1)"""
+        return np.diff(self.data['TaskTime'].to_numpy(dtype=np.float64))
+
+    @feature
+    def contact_mask(self):
+        return self.data['IsInContact'] == 1
+
+    @feature
+    def smoothed(self, column, window=5, center=True):
+        """Rolling mean of `column`"""
+        return self.data[column].rolling(window=window, center=center).mean()
+
+    @feature
+    def rolling_std(self, column, window=5, contact_only=False):
+        """Rolling standard deviation, optionally over the contact samples only"""
+        values = self.data[column]
+        if contact_only:
+            values = values[self.contact_mask()]
+        return values.rolling(window=window).std()
+
+    @feature
+    def jerk(self, column):
+        """Second difference of a speed column over the squared sample interval"""
+        return np.diff(self.data[column], 2) / self.update_intervals()[:-1] ** 2
+
+    @feature
+    def movement_speed(self, window=5):
+        """Faster of the two smoothed robot speeds, NaN-free"""
+        return np.nan_to_num(np.fmax(self.smoothed('Robot1Speed', window).to_numpy(),
+                                     self.smoothed('Robot2Speed', window).to_numpy()))
+
+    @feature
+    def response_events(self):
+        """Samples (from the second on) where force or contact state changed"""
+        force_changes = np.diff(self.data['ForceMagnitude']) != 0
+        contact_changes = np.diff(self.data['IsInContact']) != 0
+        return force_changes | contact_changes
+
+    @feature
+    def sample_durations(self):
+        """Seconds each sample stands for; holds for irregular sampling"""
+        return sample_durations(self.data['TaskTime'].to_numpy())
+
+    @feature
+    def cumulative_contact(self):
+        """Contact time accumulated up to each sample, in seconds"""
+        return np.cumsum(self.data['IsInContact'].to_numpy(dtype=np.float64)
+                         * self.sample_durations())
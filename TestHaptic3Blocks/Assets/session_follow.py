@@ -0,0 +1,257 @@
+import argparse
+import io
+import os
+import re
+import time
+from pathlib import Path
+
+import matplotlib
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from binary_log import SUFFIX as BINARY_SUFFIX, BinaryLog
+from experiment_plotter import update_events
+from session_reader import SUMMARY_MARKER, clean_frame, experiment_session_dtypes
+from sketches import DistributionSketch
+
+# A blank line ends the data rows (WriteSessionSummary starts with "\n")
+BLANK_LINE = re.compile(rb'\n[ \t\r]*\n')
+
+
+class SessionTail:
+    """Incrementally parse rows appended to a session CSV.
+
+    Each poll() reads only the bytes written since the previous call and
+    returns them as a DataFrame. A trailing partial line is left for the
+    next poll. Once the summary trailer appears the tail is finished.
+    """
+
+    def __init__(self, csv_file, float_dtype='float32'):
+        self.csv_file = csv_file
+        self.offset = 0
+        self.columns = None
+        self.finished = False
+        self.dtypes = experiment_session_dtypes(float_dtype)
+
+    def poll(self):
+        """Return the complete rows appended since the last poll"""
+        if self.finished:
+            return self._empty()
+        try:
+            size = os.path.getsize(self.csv_file)
+        except OSError:
+            return self._empty()
+        if size < self.offset:
+            # File was truncated or rewritten: start over
+            self.offset = 0
+            self.columns = None
+        if size == self.offset:
+            return self._empty()
+
+        with open(self.csv_file, 'rb') as f:
+            f.seek(self.offset)
+            chunk = f.read(size - self.offset)
+
+        if self.columns is None:
+            header_end = chunk.find(b'\n')
+            if header_end < 0:
+                return self._empty()
+            self.columns = chunk[:header_end].decode('utf-8').strip().split(',')
+            self.offset += header_end + 1
+            chunk = chunk[header_end + 1:]
+
+        complete = chunk[:chunk.rfind(b'\n') + 1]
+        data_end = len(complete)
+        blank = BLANK_LINE.search(b'\n' + complete)
+        if blank is not None:
+            data_end = blank.start()
+            self.finished = True
+        marker = complete.find(SUMMARY_MARKER, 0, data_end)
+        if marker >= 0:
+            data_end = complete.rfind(b'\n', 0, marker) + 1
+            self.finished = True
+
+        self.offset += len(complete)
+        if data_end == 0:
+            return self._empty()
+        dtypes = {col: self.dtypes[col] for col in self.columns if col in self.dtypes}
+        frame = pd.read_csv(io.BytesIO(complete[:data_end]), header=None,
+                            names=self.columns, dtype=dtypes)
+        return clean_frame(frame, dtypes)
+
+    def _empty(self):
+        return pd.DataFrame(columns=self.columns or [])
+
+
+class RunningStats:
+    """Session metrics updated one chunk at a time (mirrors WriteSessionSummary)"""
+
+    def __init__(self, rotation_threshold=5.0):
+        self.rotation_threshold = rotation_threshold
+        self.samples = 0
+        self.rotation_error_sum = 0.0
+        self.max_rotation_error = 0.0
+        self.stability_violations = 0
+        self.contact_samples = 0
+        self.max_force = 0.0
+        self.task_time = 0.0
+        # Force while in contact, for percentiles in constant memory
+        self.contact_force = DistributionSketch()
+
+    def update(self, chunk):
+        if chunk.empty:
+            return
+        if 'RotationError' in chunk.columns:
+            rotation_error = chunk['RotationError'].to_numpy(dtype=np.float64)
+        else:
+            rotation_error = np.abs(chunk['BoxRotation'].to_numpy(dtype=np.float64))
+        self.samples += len(chunk)
+        self.rotation_error_sum += rotation_error.sum()
+        self.max_rotation_error = max(self.max_rotation_error, rotation_error.max())
+        self.stability_violations += int((rotation_error > self.rotation_threshold).sum())
+        in_contact = chunk['IsInContact'].to_numpy() == 1
+        self.contact_samples += int(in_contact.sum())
+        self.contact_force.update(chunk['ForceMagnitude'].to_numpy()[in_contact])
+        self.max_force = max(self.max_force, float(chunk['ForceMagnitude'].max()))
+        self.task_time = float(chunk['TaskTime'].iloc[-1])
+
+    @property
+    def average_rotation_error(self):
+        return self.rotation_error_sum / self.samples if self.samples else 0.0
+
+    @property
+    def contact_percentage(self):
+        return self.contact_samples / self.samples * 100 if self.samples else 0.0
+
+    def summary(self):
+        p50, p95 = self.contact_force.quantiles([0.5, 0.95])
+        return (f"t={self.task_time:.1f}s  avg err={self.average_rotation_error:.2f}°  "
+                f"max err={self.max_rotation_error:.2f}°  violations={self.stability_violations}  "
+                f"contact={self.contact_percentage:.1f}%  max force={self.max_force:.2f}N  "
+                f"force p50/p95={p50:.2f}/{p95:.2f}N")
+
+
+class LiveView:
+    """Lightweight two-panel figure showing the last `window` seconds"""
+
+    def __init__(self, window=60):
+        self.window = window
+        self.times = np.empty(0)
+        self.rotation_error = np.empty(0, dtype=np.float32)
+        self.force = np.empty(0, dtype=np.float32)
+        self.event_lines = {}
+
+        self.fig, (self.ax1, self.ax2) = plt.subplots(2, 1, figsize=(12, 7), sharex=True)
+        self.rotation_line, = self.ax1.plot([], [], 'b-', linewidth=2)
+        self.ax1.axhline(y=5, color='r', linestyle='--', linewidth=1.5, label='Threshold (5°)')
+        self.ax1.set_ylabel('Rotation Error (°)', fontsize=14)
+        self.ax1.legend(loc='upper left')
+        self.ax1.grid(True, alpha=0.3)
+        self.force_line, = self.ax2.plot([], [], color='purple', linewidth=2)
+        self.ax2.set_ylabel('Force (N)', fontsize=14)
+        self.ax2.set_xlabel('Time (s)', fontsize=14)
+        self.ax2.grid(True, alpha=0.3)
+
+    def append(self, chunk):
+        """Add new rows and drop everything older than the window"""
+        if chunk.empty:
+            return
+        if 'RotationError' in chunk.columns:
+            rotation_error = chunk['RotationError'].to_numpy()
+        else:
+            rotation_error = np.abs(chunk['BoxRotation'].to_numpy())
+        self.times = np.concatenate([self.times, chunk['TaskTime'].to_numpy()])
+        self.rotation_error = np.concatenate([self.rotation_error, rotation_error])
+        self.force = np.concatenate([self.force, chunk['ForceMagnitude'].to_numpy()])
+
+        keep = np.searchsorted(self.times, self.times[-1] - self.window)
+        self.times = self.times[keep:]
+        self.rotation_error = self.rotation_error[keep:]
+        self.force = self.force[keep:]
+
+    def refresh(self, events, stats):
+        self.rotation_line.set_data(self.times, self.rotation_error)
+        self.force_line.set_data(self.times, self.force)
+        for event, event_time in events.items():
+            if event not in self.event_lines:
+                self.event_lines[event] = [ax.axvline(x=event_time, color='black', linestyle='--',
+                                                      alpha=0.5, linewidth=1.5)
+                                           for ax in (self.ax1, self.ax2)]
+        if len(self.times):
+            end = max(self.times[-1], self.window)
+            self.ax1.set_xlim(end - self.window, end)
+        for ax in (self.ax1, self.ax2):
+            ax.relim()
+            ax.autoscale_view(scalex=False)
+        self.fig.suptitle(stats.summary(), fontsize=12)
+        self.fig.canvas.draw_idle()
+
+
+def _wait(seconds):
+    if seconds <= 0:
+        return
+    if matplotlib.get_backend().lower() == 'agg':
+        time.sleep(seconds)
+    else:
+        plt.pause(seconds)
+
+
+def follow_session(csv_file, fps=5, window=60, view=True, timeout=None):
+    """Follow a session CSV (or binary .hlog log) while it is recorded.
+
+    Parses only newly appended bytes on every frame (for a binary log, maps
+    the records the writer has published), keeps running stats and
+    detected events up to date and refreshes a live figure at `fps` frames
+    per second. Returns (events, stats) once the session summary is written,
+    `timeout` seconds have passed, or the user interrupts.
+    """
+    if Path(csv_file).suffix == BINARY_SUFFIX:
+        tail = BinaryLog(csv_file)
+    else:
+        tail = SessionTail(csv_file)
+    stats = RunningStats()
+    events = {}
+    live = LiveView(window) if view else None
+    frame_time = 1.0 / fps
+    start = time.monotonic()
+
+    try:
+        while True:
+            frame_start = time.monotonic()
+            chunk = tail.poll()
+            if not chunk.empty:
+                stats.update(chunk)
+                update_events(events, chunk)
+                if live is not None:
+                    live.append(chunk)
+            if live is not None:
+                live.refresh(events, stats)
+            if tail.finished:
+                break
+            if timeout is not None and frame_start - start >= timeout:
+                break
+            _wait(frame_time - (time.monotonic() - frame_start))
+    except KeyboardInterrupt:
+        pass
+
+    print(f"\nSession {'finished' if tail.finished else 'still recording'}: {stats.summary()}")
+    for event, event_time in events.items():
+        print(f"{event}: {event_time:.2f}s")
+    return events, stats
+
+
+def main(argv=None):
+    """Command line entry point for following a live session."""
+    parser = argparse.ArgumentParser(description='Follow a session CSV while it is recorded')
+    parser.add_argument('csv_file')
+    parser.add_argument('--fps', type=float, default=5, help='live figure refresh rate')
+    parser.add_argument('--window', type=float, default=60, help='seconds of data to show')
+    args = parser.parse_args(argv)
+
+    follow_session(args.csv_file, fps=args.fps, window=args.window)
+    plt.show()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+import io
+import os
+import re
+
+import pandas as pd
+
+# pyarrow parses CSV multithreaded and is the fastest engine pandas offers;
+# without it the C engine is used. Chunked reads always use the C engine.
+try:
+    import pyarrow  # noqa: F401
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    CSV_ENGINE = 'c'
+
+# Column layout written by ExperimentDataCollector.WriteHeaders
+EXPERIMENT_SESSION_COLUMNS = [
+    'TaskTime', 'BoxRotation', 'RotationError', 'BoxPosX', 'BoxPosY', 'BoxPosZ',
+    'BoxAngVelX', 'BoxAngVelY', 'BoxAngVelZ',
+    'Robot1PosX', 'Robot1PosY', 'Robot1PosZ', 'Robot2PosX', 'Robot2PosY', 'Robot2PosZ',
+    'Robot1Speed', 'Robot2Speed', 'RobotDistanceDiff',
+    'HapticPosX', 'HapticPosY', 'HapticPosZ',
+    'HapticForceX', 'HapticForceY', 'HapticForceZ', 'ForceMagnitude',
+    'IsInContact', 'ContactType', 'ContactDuration', 'Phase',
+    'CumulativeError', 'StabilityMetric'
+]
+EXPERIMENT_SESSION_TEXT_COLUMNS = ['ContactType', 'Phase']
+
+# Column layout of contact_data_<id>.csv (ExperimentDataCollector.WriteHeaders)
+CONTACT_DATA_COLUMNS = [
+    'ContactID', 'ObjectType', 'StartTime', 'EndTime', 'Duration', 'MaxForce', 'AverageForce',
+    'ContactPointX', 'ContactPointY', 'ContactPointZ'
+]
+
+# system_performance_<id>.csv written by TechnicalPerformanceDataCollector. That
+# collector is not part of this project; these are the columns the plots read
+# plus the ones behind summary_statistics.csv.
+SYSTEM_PERFORMANCE_COLUMNS = [
+    'Timestamp', 'MessagesSent', 'MessagesReceived', 'MessageRate', 'AverageLatency',
+    'StabilityScore', 'PacketLoss', 'ConnectionDrops'
+]
+
+# raspimouse_session_<id>.csv: one row per robot and sample (both robots share
+# the timestamp), followed by a "Session Summary:" block per robot
+RASPIMOUSE_SESSION_COLUMNS = [
+    'Timestamp', 'PosX', 'PosY', 'PosZ', 'RotX', 'RotY', 'RotZ', 'VelX', 'VelY', 'VelZ',
+    'Speed', 'AngularSpeed', 'DistanceFromStart', 'TotalDistance'
+]
+
+
+def _schema(columns, times=(), categories=(), integers=()):
+    """Column -> dtype; 'float' stands for the reader's float_dtype"""
+    schema = {}
+    for col in columns:
+        if col in times:
+            schema[col] = 'float64'
+        elif col in categories:
+            schema[col] = 'category'
+        elif col in integers:
+            schema[col] = 'int32'
+        else:
+            schema[col] = 'float'
+    return schema
+
+
+# Declared schema of every log the Unity side writes. Time columns stay
+# float64: float32 loses millisecond resolution after a few hours, which
+# would distort the update interval plots. Measurements are float32, the
+# Unity side records them as float anyway. Text columns are categorical.
+SCHEMAS = {
+    'experiment_session': _schema(EXPERIMENT_SESSION_COLUMNS, times=['TaskTime'],
+                                  categories=EXPERIMENT_SESSION_TEXT_COLUMNS),
+    'contact_data': _schema(CONTACT_DATA_COLUMNS, times=['StartTime', 'EndTime'],
+                            categories=['ObjectType'], integers=['ContactID']),
+    'system_performance': _schema(SYSTEM_PERFORMANCE_COLUMNS, times=['Timestamp'],
+                                  integers=['MessagesSent', 'MessagesReceived',
+                                            'ConnectionDrops']),
+    'raspimouse_session': _schema(RASPIMOUSE_SESSION_COLUMNS, times=['Timestamp']),
+}
+
+# Version of the frames the readers return. Part of every session cache
+# entry: bump it whenever a reader's columns or dtypes change so frames
+# cached by the old reader are parsed again.
+READER_VERSION = 2
+
+SUMMARY_MARKER = b'Session Summary'
+TAIL_BYTES = 64 * 1024
+
+# Text blocks WriteSessionSummary appends after the data rows
+TRAILER_SECTIONS = ('Session Summary', 'Contact Statistics')
+_SECTION_HEADER = re.compile(
+    rf"^({'|'.join(TRAILER_SECTIONS)}):?[ \t\r]*$", re.MULTILINE)
+_NUMBER = re.compile(r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?')
+
+
+def schema_dtypes(kind, float_dtype='float32'):
+    """Explicit dtypes for the columns of a `kind` log (see SCHEMAS)"""
+    return {col: float_dtype if dtype == 'float' else dtype
+            for col, dtype in SCHEMAS[kind].items()}
+
+
+def experiment_session_dtypes(float_dtype='float32'):
+    """Explicit dtypes for the experiment_session columns"""
+    return schema_dtypes('experiment_session', float_dtype)
+
+
+def _read_tail(csv_file, tail_bytes):
+    """(offset, file size, bytes) of the last `tail_bytes` of a file"""
+    with open(csv_file, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        start = max(0, size - tail_bytes)
+        f.seek(start)
+        return start, size, f.read()
+
+
+def locate_summary(csv_file, tail_bytes=TAIL_BYTES):
+    """Find where the data rows end by seeking from the end of the file.
+
+    Returns (data_end, summary_start) as byte offsets. summary_start is None
+    when the file has no "Session Summary" trailer yet (e.g. still being
+    recorded); data_end then stops after the last complete line.
+    """
+    start, size, tail = _read_tail(csv_file, tail_bytes)
+    idx = tail.find(SUMMARY_MARKER)
+    if idx < 0:
+        last_newline = tail.rfind(b'\n')
+        if last_newline < 0:
+            return (size if start > 0 else 0), None
+        return start + last_newline + 1, None
+
+    line_start = tail.rfind(b'\n', 0, idx) + 1
+    # Drop the blank line(s) WriteSessionSummary puts before the trailer
+    data = tail[:line_start].rstrip(b' \t\r\n')
+    return start + len(data), start + line_start
+
+
+def _typed(value):
+    """'12.50 seconds' -> 12.5, '3 contacts' -> 3, '(0.0, 0.0, 0.3)' -> (0.0, 0.0, 0.3)"""
+    value = value.strip()
+    if value.startswith('(') and value.endswith(')'):
+        return tuple(float(v) for v in _NUMBER.findall(value))
+    match = _NUMBER.match(value)
+    if match is None:
+        return value
+    number = match.group()
+    return float(number) if any(c in number for c in '.eE') else int(number)
+
+
+def parse_trailer(text):
+    """Typed fields of the trailer blocks in `text`, as (section, fields) pairs.
+
+    Units are dropped ("12.50 seconds" -> 12.5, "27.27%" -> 27.27).
+    "Session Summary" keys become snake_case ("Total Task Time" ->
+    total_task_time); "Contact Statistics" keys are object types and are
+    kept as written. Blocks appear in file order, so a log with one summary
+    per robot yields several "Session Summary" pairs.
+    """
+    parts = _SECTION_HEADER.split(text)
+    blocks = []
+    for section, body in zip(parts[1::2], parts[2::2]):
+        fields = {}
+        for line in body.splitlines():
+            key, sep, value = line.partition(':')
+            key = key.strip()
+            if not sep or not key:
+                continue
+            if section == 'Session Summary':
+                key = key.lower().replace(' ', '_')
+            fields[key] = _typed(value)
+        blocks.append((section, fields))
+    return blocks
+
+
+def read_trailer(csv_file, tail_bytes=TAIL_BYTES):
+    """Trailer blocks of a log, reading only its last `tail_bytes`.
+
+    Returns [] while the file has no trailer yet.
+    """
+    _, _, tail = _read_tail(csv_file, tail_bytes)
+    idx = tail.find(SUMMARY_MARKER)
+    if idx < 0:
+        return []
+    return parse_trailer(tail[idx:].decode('utf-8', errors='replace'))
+
+
+def read_session_summary(csv_file, tail_bytes=TAIL_BYTES):
+    """Headline numbers of an experiment session without parsing its rows.
+
+    Returns the "Session Summary" fields (total_task_time,
+    average_rotation_error, maximum_rotation_deviation,
+    stability_violations, total_contact_time, contact_percentage) plus
+    'contacts', the per-object contact counts; None without a trailer.
+    """
+    blocks = read_trailer(csv_file, tail_bytes)
+    if not blocks:
+        return None
+    summary = {'contacts': {}}
+    for section, fields in blocks:
+        if section == 'Contact Statistics':
+            summary['contacts'].update(fields)
+        else:
+            summary.update(fields)
+    return summary
+
+
+def read_summaries(csv_files, tail_bytes=TAIL_BYTES):
+    """One row of trailer fields per session file, contacts as contacts_<type>.
+
+    Only the tail of each file is read, so thousands of sessions take
+    about as long as opening them. Files without a trailer get a row of
+    NaN.
+    """
+    rows = []
+    for csv_file in csv_files:
+        summary = read_session_summary(csv_file, tail_bytes) or {'contacts': {}}
+        contacts = summary.pop('contacts')
+        summary.update({f'contacts_{kind}': count for kind, count in contacts.items()})
+        rows.append({'file': str(csv_file), **summary})
+    return pd.DataFrame(rows)
+
+
+class _DataRegion(io.RawIOBase):
+    """Raw file view that stops at a fixed byte offset"""
+
+    def __init__(self, f, end):
+        self._f = f
+        self._end = end
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        remaining = self._end - self._f.tell()
+        if remaining <= 0:
+            return 0
+        data = self._f.read(min(len(buffer), remaining))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def _open_region(csv_file, data_end):
+    f = open(csv_file, 'rb')
+    return f, io.BufferedReader(_DataRegion(f, data_end), buffer_size=1 << 20)
+
+
+def clean_frame(frame, dtypes):
+    """Coerce numeric columns and fill gaps like the original reader did"""
+    for col in frame.columns:
+        dtype = dtypes.get(col)
+        if dtype == 'category':
+            values = frame[col]
+            if not isinstance(values.dtype, pd.CategoricalDtype):
+                values = values.astype('category')
+            if values.hasnans:
+                if '' not in values.cat.categories:
+                    values = values.cat.add_categories('')
+                values = values.fillna('')
+            frame[col] = values
+            continue
+        if dtype is None or dtype == 'object':
+            if frame[col].dtype == object:
+                frame[col] = frame[col].fillna('')
+            continue
+        if frame[col].dtype != dtype:
+            frame[col] = pd.to_numeric(frame[col], errors='coerce')
+        if frame[col].hasnans:
+            frame[col] = frame[col].fillna(0)
+        frame[col] = frame[col].astype(dtype, copy=False)
+    return frame
+
+
+def _parse(csv_file, data_end, **kwargs):
+    f, region = _open_region(csv_file, data_end)
+    try:
+        return pd.read_csv(region, encoding='utf-8', **kwargs)
+    finally:
+        f.close()
+
+
+def _read_frame(csv_file, data_end, usecols, dtypes, engine=CSV_ENGINE):
+    # Only declared columns present in the file are typed; others are inferred
+    try:
+        frame = _parse(csv_file, data_end, usecols=usecols, dtype=dtypes, engine=engine)
+    except ValueError:
+        # Malformed numbers somewhere: fall back to per-column coercion
+        frame = _parse(csv_file, data_end, usecols=usecols)
+    return clean_frame(frame, dtypes)
+
+
+def _iter_chunks(csv_file, data_end, usecols, dtypes, chunksize):
+    f, region = _open_region(csv_file, data_end)
+    try:
+        with pd.read_csv(region, usecols=usecols, dtype=dtypes,
+                         chunksize=chunksize, encoding='utf-8') as reader:
+            for chunk in reader:
+                yield clean_frame(chunk, dtypes)
+    finally:
+        f.close()
+
+
+def read_log_csv(csv_file, kind, columns=None, float_dtype='float32', chunksize=None):
+    """Read the data rows of a `kind` log (a key of SCHEMAS).
+
+    Only the byte range before the "Session Summary" trailer is parsed, and it
+    is streamed straight from disk into pandas with the declared dtypes, so
+    there is no type inference or coercion pass. `columns` restricts parsing
+    to a subset of columns. With `chunksize` an iterator of DataFrames is
+    returned so memory stays bounded by the chunk size.
+    """
+    data_end, _ = locate_summary(csv_file)
+    dtypes = schema_dtypes(kind, float_dtype)
+    usecols = list(columns) if columns is not None else None
+    if data_end == 0:
+        empty = pd.DataFrame(columns=usecols or [])
+        return iter([empty]) if chunksize is not None else empty
+
+    if chunksize is not None:
+        return _iter_chunks(csv_file, data_end, usecols, dtypes, chunksize)
+    return _read_frame(csv_file, data_end, usecols, dtypes)
+
+
+def read_session_csv(csv_file, columns=None, float_dtype='float32', chunksize=None):
+    """Read the data rows of an experiment_session CSV (see read_log_csv)"""
+    return read_log_csv(csv_file, 'experiment_session', columns, float_dtype, chunksize)
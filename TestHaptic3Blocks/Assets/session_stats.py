@@ -0,0 +1,204 @@
+import argparse
+import glob
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from session_reader import read_log_csv
+from sketches import DistributionSketch, Moments
+
+# File kinds the engine understands: name pattern and the columns it needs
+SOURCES = {
+    'experiment_session': {
+        'pattern': 'experiment_session_*.csv',
+        'columns': ['BoxRotation', 'IsInContact', 'ForceMagnitude'],
+    },
+    'system_performance': {
+        'pattern': 'system_performance_*.csv',
+        'columns': ['AverageLatency', 'MessageRate'],
+    },
+}
+
+# Mirrors ExperimentDataCollector.rotationThreshold
+ROTATION_THRESHOLD = 5.0
+CHUNK_ROWS = 200_000
+QUANTILES = (0.5, 0.95, 0.99)
+
+# Metrics whose per-sample values get a quantile sketch (the rest are 0/1
+# indicators, where only the count, sum and mean are meaningful)
+SKETCHED = {'rotation_error', 'contact_force', 'latency', 'message_rate'}
+
+TABLE_COLUMNS = ['session', 'source', 'metric', 'count', 'sum', 'mean', 'std',
+                 'min', 'max', 'p50', 'p95', 'p99']
+
+
+def session_id(path):
+    """Session timestamp from a file name, e.g. 20241109_224136"""
+    stem = Path(path).stem
+    for kind in SOURCES:
+        if stem.startswith(kind):
+            return stem[len(kind):].lstrip('_')
+    return stem
+
+
+def source_kind(path):
+    name = Path(path).name
+    for kind, source in SOURCES.items():
+        if re.fullmatch(source['pattern'].replace('*', '.*'), name):
+            return kind
+    return None
+
+
+def find_sources(inputs):
+    """Expand directories and glob patterns into (kind, path) pairs"""
+    found = set()
+    for item in inputs:
+        path = Path(item)
+        candidates = path.iterdir() if path.is_dir() else map(Path, glob.glob(item))
+        for candidate in candidates:
+            kind = source_kind(candidate)
+            if kind is not None and candidate.is_file():
+                found.add((kind, candidate))
+    return sorted(found, key=lambda item: (item[0], str(item[1])))
+
+
+class SessionStats:
+    """Mergeable accumulators for the summary metrics of one or more files.
+
+    For experiment sessions:
+      rotation_error        |BoxRotation| per sample: the mean is the
+                            average rotation error, the max the maximum
+                            deviation
+      stability_violation   1 when the rotation error exceeds the threshold;
+                            the sum is the number of stability violations
+      contact_percentage    100 while in contact; the mean is the contact
+                            percentage
+      contact_force         ForceMagnitude of the samples in contact
+    For system performance logs:
+      latency, message_rate AverageLatency and MessageRate samples
+    """
+
+    def __init__(self, rotation_threshold=ROTATION_THRESHOLD):
+        self.rotation_threshold = rotation_threshold
+        self.metrics = {}
+
+    def add(self, metric, values):
+        if metric not in self.metrics:
+            self.metrics[metric] = DistributionSketch() if metric in SKETCHED else Moments()
+        self.metrics[metric].update(values)
+
+    def update(self, kind, chunk):
+        """Fold one chunk of a `kind` file into the accumulators"""
+        if kind == 'experiment_session':
+            rotation_error = np.abs(chunk['BoxRotation'].to_numpy(dtype=np.float64))
+            self.add('rotation_error', rotation_error)
+            self.add('stability_violation', rotation_error > self.rotation_threshold)
+            in_contact = chunk['IsInContact'].to_numpy() == 1
+            self.add('contact_percentage', in_contact * 100.0)
+            self.add('contact_force', chunk['ForceMagnitude'].to_numpy(dtype=np.float64)[in_contact])
+        else:
+            self.add('latency', chunk['AverageLatency'].to_numpy(dtype=np.float64))
+            self.add('message_rate', chunk['MessageRate'].to_numpy(dtype=np.float64))
+
+    def merge(self, other):
+        for metric, accumulator in other.metrics.items():
+            self.metrics.setdefault(metric, type(accumulator)()).merge(accumulator)
+        return self
+
+    def rows(self, session, source):
+        """One tidy table row per metric"""
+        rows = []
+        for metric, accumulator in self.metrics.items():
+            if isinstance(accumulator, DistributionSketch):
+                m = accumulator.moments
+                quantiles = accumulator.quantiles(QUANTILES)
+            else:
+                m = accumulator
+                quantiles = [np.nan] * len(QUANTILES)
+            rows.append([session, source, metric, m.count, m.total,
+                         m.mean if m.count else np.nan, m.std,
+                         m.min if m.count else np.nan, m.max if m.count else np.nan,
+                         *quantiles])
+        return rows
+
+
+def _read_chunks(kind, path, chunksize=CHUNK_ROWS):
+    yield from read_log_csv(path, kind, columns=SOURCES[kind]['columns'], chunksize=chunksize)
+
+
+def file_stats(kind, path, rotation_threshold=ROTATION_THRESHOLD):
+    """Metrics of one file, computed chunk by chunk in a single pass"""
+    stats = SessionStats(rotation_threshold)
+    for chunk in _read_chunks(kind, path):
+        stats.update(kind, chunk)
+    return kind, str(path), stats
+
+
+def aggregate(sources, workers=None, rotation_threshold=ROTATION_THRESHOLD):
+    """Compute per-file stats in parallel and merge them per source kind.
+
+    Returns (per_file, totals): a list of (kind, path, SessionStats) and a
+    dict kind -> merged SessionStats.
+    """
+    per_file = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(file_stats, kind, path, rotation_threshold)
+                   for kind, path in sources]
+        for (kind, path), future in zip(sources, futures):
+            try:
+                per_file.append(future.result())
+            except Exception as e:
+                print(f'Error reading {path}: {e}')
+
+    totals = {}
+    for kind, _, stats in per_file:
+        totals.setdefault(kind, SessionStats(rotation_threshold)).merge(stats)
+    return per_file, totals
+
+
+def summary_table(per_file, totals):
+    """Tidy table: one row per (session, source, metric); session 'ALL'
+    holds the pooled statistics over every file of that source"""
+    rows = []
+    for kind, path, stats in per_file:
+        rows.extend(stats.rows(session_id(path), kind))
+    for kind, stats in totals.items():
+        rows.extend(stats.rows('ALL', kind))
+    return pd.DataFrame(rows, columns=TABLE_COLUMNS)
+
+
+def main(argv=None):
+    """Command line entry point for cross-session statistics."""
+    parser = argparse.ArgumentParser(
+        description='Aggregate session metrics across many recordings')
+    parser.add_argument('inputs', nargs='+',
+                        help='session CSV files, glob patterns or directories')
+    parser.add_argument('-o', '--output', default='session_statistics.csv')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(),
+                        help='number of worker processes (default: all cores)')
+    parser.add_argument('--rotation-threshold', type=float, default=ROTATION_THRESHOLD,
+                        help='rotation error counted as a stability violation (degrees)')
+    args = parser.parse_args(argv)
+
+    sources = find_sources(args.inputs)
+    if not sources:
+        print('No session files found')
+        return 1
+
+    start = time.perf_counter()
+    per_file, totals = aggregate(sources, args.workers, args.rotation_threshold)
+    table = summary_table(per_file, totals)
+    table.to_csv(args.output, index=False)
+    print(f'Aggregated {len(per_file)} files in {time.perf_counter() - start:.2f}s '
+          f'-> {args.output}')
+    print(table[table['session'] == 'ALL'].to_string(index=False))
+    return 0 if len(per_file) == len(sources) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
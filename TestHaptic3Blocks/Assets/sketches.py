@@ -0,0 +1,244 @@
+import math
+
+import numpy as np
+
+
+class Moments:
+    """Count, sum, mean, M2, min and max of a stream; mergeable.
+
+    Chunks are reduced with NumPy and combined with the pairwise update of
+    Chan et al., so merging the Moments of two halves gives the same result
+    as one pass over the whole stream.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        chunk = Moments()
+        chunk.count = len(values)
+        chunk.total = float(values.sum())
+        chunk.mean = chunk.total / chunk.count
+        chunk.m2 = float(((values - chunk.mean) ** 2).sum())
+        chunk.min = float(values.min())
+        chunk.max = float(values.max())
+        return self.merge(chunk)
+
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.__dict__.update(other.__dict__)
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+class QuantileSketch:
+    """DDSketch: quantiles with bounded relative error in constant memory.
+
+    Values are counted in logarithmic buckets of ratio gamma = (1+a)/(1-a),
+    so every quantile estimate is within `relative_accuracy` of a true
+    sample value. Bucket counts simply add up, which makes sketches of
+    different chunks, files or processes mergeable.
+    """
+
+    # Magnitudes below this are counted as zero
+    MIN_VALUE = 1e-9
+
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.positive = {}
+        self.negative = {}
+        self.zero = 0
+        self.count = 0
+
+    def _add_keys(self, store, magnitudes):
+        keys = np.ceil(np.log(magnitudes) / self.log_gamma).astype(np.int64)
+        unique, counts = np.unique(keys, return_counts=True)
+        for key, count in zip(unique.tolist(), counts.tolist()):
+            store[key] = store.get(key, 0) + count
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        small = np.abs(values) < self.MIN_VALUE
+        self.zero += int(small.sum())
+        self._add_keys(self.positive, values[(values > 0) & ~small])
+        self._add_keys(self.negative, -values[(values < 0) & ~small])
+        self.count += len(values)
+        return self
+
+    def merge(self, other):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError('Cannot merge sketches with different accuracy')
+        for store, other_store in ((self.positive, other.positive),
+                                   (self.negative, other.negative)):
+            for key, count in other_store.items():
+                store[key] = store.get(key, 0) + count
+        self.zero += other.zero
+        self.count += other.count
+        return self
+
+    def _value(self, key):
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def quantiles(self, qs):
+        """Estimates for each q in `qs` (0..1); NaN when the sketch is empty"""
+        qs = np.atleast_1d(np.asarray(qs, dtype=np.float64))
+        if self.count == 0:
+            return np.full(len(qs), np.nan)
+        neg_keys = sorted(self.negative, reverse=True)
+        pos_keys = sorted(self.positive)
+        values = np.array([-self._value(k) for k in neg_keys] + [0.0]
+                          + [self._value(k) for k in pos_keys])
+        counts = np.array([self.negative[k] for k in neg_keys] + [self.zero]
+                          + [self.positive[k] for k in pos_keys])
+        ranks = qs * (self.count - 1)
+        idx = np.searchsorted(np.cumsum(counts), ranks, side='right')
+        return values[np.minimum(idx, len(values) - 1)]
+
+    def quantile(self, q):
+        return float(self.quantiles([q])[0])
+
+
+class FixedHistogram:
+    """Counts over fixed, equal-width bins between `low` and `high`.
+
+    Samples outside the range are kept in underflow/overflow counters; the
+    last bin includes `high`, as in np.histogram. Histograms with the same
+    bins merge by adding counts.
+    """
+
+    def __init__(self, low, high, bins=50):
+        if not high > low:
+            raise ValueError('Histogram range must satisfy high > low')
+        self.low = float(low)
+        self.high = float(high)
+        self.bins = int(bins)
+        self.counts = np.zeros(self.bins, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+
+    @property
+    def edges(self):
+        return np.linspace(self.low, self.high, self.bins + 1)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        below = values < self.low
+        above = values > self.high
+        self.underflow += int(below.sum())
+        self.overflow += int(above.sum())
+        inside = values[~below & ~above]
+        idx = ((inside - self.low) * (self.bins / (self.high - self.low))).astype(np.int64)
+        self.counts += np.bincount(np.minimum(idx, self.bins - 1), minlength=self.bins)
+        return self
+
+    def merge(self, other):
+        if (other.low, other.high, other.bins) != (self.low, self.high, self.bins):
+            raise ValueError('Cannot merge histograms with different bins')
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        return self
+
+    def plot(self, ax, **kwargs):
+        """Draw the counts like ax.hist would draw the raw samples"""
+        edges = self.edges
+        return ax.hist(edges[:-1], bins=edges, weights=self.counts, **kwargs)
+
+
+class DistributionSketch:
+    """Moments, quantiles and optionally a fixed-bin histogram of one signal.
+
+    Memory does not grow with the number of samples, so a sketch can be fed
+    chunk by chunk from a loader and merged across sessions.
+    """
+
+    def __init__(self, relative_accuracy=0.01, histogram=None):
+        self.moments = Moments()
+        self.quantile_sketch = QuantileSketch(relative_accuracy)
+        self.histogram = FixedHistogram(*histogram) if histogram else None
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self.moments.update(values)
+        self.quantile_sketch.update(values)
+        if self.histogram is not None:
+            self.histogram.update(values)
+        return self
+
+    def merge(self, other):
+        self.moments.merge(other.moments)
+        self.quantile_sketch.merge(other.quantile_sketch)
+        if self.histogram is not None and other.histogram is not None:
+            self.histogram.merge(other.histogram)
+        return self
+
+    @property
+    def count(self):
+        return self.moments.count
+
+    def quantiles(self, qs):
+        return self.quantile_sketch.quantiles(qs)
+
+    def summary(self, qs=(0.5, 0.95, 0.99)):
+        """count/mean/std/min/max plus p50, p95, ... as a dict"""
+        m = self.moments
+        empty = m.count == 0
+        result = {
+            'count': m.count,
+            'mean': np.nan if empty else m.mean,
+            'std': m.std,
+            'min': np.nan if empty else m.min,
+            'max': np.nan if empty else m.max,
+        }
+        for q, value in zip(qs, self.quantiles(qs)):
+            result[f'p{q * 100:g}'] = float(value)
+        return result
+
+
+def sketch_chunks(chunks, columns, where=None, **sketch_options):
+    """Feed DataFrame chunks from any loader into one sketch per column.
+
+    `chunks` is an iterable of frames, e.g. read_session_csv(..., chunksize=n)
+    or successive SessionTail.poll() results. `where` optionally maps a
+    chunk to a boolean row mask, e.g. only samples in contact.
+    """
+    sketches = {column: DistributionSketch(**sketch_options) for column in columns}
+    for chunk in chunks:
+        if where is not None:
+            chunk = chunk[np.asarray(where(chunk), dtype=bool)]
+        for column, sketch in sketches.items():
+            sketch.update(chunk[column].to_numpy(dtype=np.float64))
+    return sketches
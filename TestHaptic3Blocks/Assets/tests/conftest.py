@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The analysis scripts are flat modules next to this folder
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from decimation import decimate, decimation_indices
+
+
+@pytest.mark.parametrize('method', ['minmax', 'lttb'])
+@pytest.mark.parametrize('n_series', [1, 3, 7])
+@pytest.mark.parametrize('max_points', [10, 100, 2000])
+def test_decimation_stays_within_max_points(method, n_series, max_points):
+    rng = np.random.default_rng(n_series)
+    x = np.arange(100_003, dtype=np.float64)
+    series = [rng.normal(size=len(x)) for _ in range(n_series)]
+    idx = decimation_indices(x, series, max_points, method)
+    assert len(idx) <= max(max_points, 3 * n_series)
+    assert np.all(np.diff(idx) > 0)
+    assert idx[0] == 0 and idx[-1] == len(x) - 1
+
+
+def test_short_series_are_not_decimated():
+    x = np.arange(50)
+    out_x, out_y = decimate(x, x * 2, max_points=50)
+    np.testing.assert_array_equal(out_x, x)
+    np.testing.assert_array_equal(out_y, x * 2)
+
+
+def test_minmax_keeps_spikes_of_every_series():
+    x = np.arange(100_000, dtype=np.float64)
+    force = np.zeros(len(x))
+    force[12_345] = 50.0
+    rotation = np.zeros(len(x))
+    rotation[87_654] = -30.0
+    rotation[500] = np.nan
+    out_x, out_force, out_rotation = decimate(x, force, rotation, max_points=200)
+    assert len(out_x) <= 200
+    assert out_force.max() == 50.0
+    assert np.nanmin(out_rotation) == -30.0
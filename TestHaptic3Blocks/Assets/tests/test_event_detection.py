@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from event_detection import EVENT_DTYPE, HysteresisDetector, detect_intervals
+
+ON, OFF = 1.0, 0.5
+
+
+def _signal(rng, n=2000, nan_fraction=0.05):
+    """Noisy oscillation crossing both thresholds, with NaN dropouts"""
+    times = np.cumsum(rng.uniform(0.005, 0.02, n))
+    values = 0.75 + 0.6 * np.sin(np.linspace(0, 40, n)) + rng.normal(0, 0.2, n)
+    values[rng.random(n) < nan_fraction] = np.nan
+    return times, values
+
+
+def _stream(times, values, splits, min_duration=0.0):
+    detector = HysteresisDetector(ON, OFF, min_duration=min_duration)
+    events = [detector.push_many(times[a:b], values[a:b])
+              for a, b in zip(splits[:-1], splits[1:])]
+    events.append(detector.flush())
+    return np.concatenate(events).astype(EVENT_DTYPE)
+
+
+def _random_splits(rng, n):
+    cuts = np.sort(rng.choice(np.arange(1, n), size=rng.integers(1, 40), replace=False))
+    return np.concatenate(([0], cuts, [n]))
+
+
+def _assert_same(streamed, batch):
+    assert len(streamed) == len(batch)
+    for field in ('start', 'end', 'start_index', 'end_index', 'closed'):
+        np.testing.assert_array_equal(streamed[field], batch[field])
+    np.testing.assert_array_equal(streamed['peak'], batch['peak'])
+
+
+@pytest.mark.parametrize('seed', range(20))
+@pytest.mark.parametrize('min_duration', [0.0, 0.3])
+def test_streaming_matches_batch_for_random_chunkings(seed, min_duration):
+    rng = np.random.default_rng(seed)
+    times, values = _signal(rng)
+    batch = detect_intervals(times, values, ON, OFF, min_duration=min_duration,
+                             include_open=True)
+    assert len(batch) > 1
+    streamed = _stream(times, values, _random_splits(rng, len(times)), min_duration)
+    _assert_same(streamed, batch)
+
+
+def test_streaming_matches_batch_sample_by_sample():
+    times, values = _signal(np.random.default_rng(100), n=500)
+    batch = detect_intervals(times, values, ON, OFF, include_open=True)
+    _assert_same(_stream(times, values, np.arange(len(times) + 1)), batch)
+
+
+def test_interval_open_across_chunk_boundaries():
+    times = np.arange(12, dtype=np.float64)
+    values = np.array([0, 2, 3, np.nan, 9, 0.8, 4, 0.2, 0, 2, 1.5, 5])
+    batch = detect_intervals(times, values, ON, OFF, include_open=True)
+    # Cut inside the first interval (twice, around the NaN) and inside the
+    # last one, which is still open at the end
+    streamed = _stream(times, values, [0, 2, 4, 6, 10, 12])
+    _assert_same(streamed, batch)
+    assert streamed['start_index'].tolist() == [1, 9]
+    assert streamed['peak'].tolist() == [9, 5]
+    assert streamed['closed'].tolist() == [True, False]
+
+
+def test_nan_only_chunk_keeps_interval_open():
+    times = np.arange(8, dtype=np.float64)
+    values = np.array([0, 2, np.nan, np.nan, np.nan, 3, 0, 0])
+    streamed = _stream(times, values, [0, 2, 5, 8])
+    _assert_same(streamed, detect_intervals(times, values, ON, OFF, include_open=True))
+    assert streamed[['start_index', 'end_index']].tolist() == [(1, 6)]
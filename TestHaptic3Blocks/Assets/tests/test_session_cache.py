@@ -0,0 +1,97 @@
+import os
+
+import pandas as pd
+import pytest
+
+import session_cache
+from session_cache import SessionCache
+from session_reader import SYSTEM_PERFORMANCE_COLUMNS, read_log_csv
+
+
+def _write_log(path, latency):
+    rows = [f'{t * 0.1:.1f},{t},{t},10.0,{latency},0.9,0.0,0' for t in range(20)]
+    path.write_text('\n'.join([','.join(SYSTEM_PERFORMANCE_COLUMNS), *rows]) + '\n')
+    return path
+
+
+@pytest.fixture
+def counting_reader():
+    calls = []
+
+    def reader(csv_file):
+        calls.append(csv_file)
+        return read_log_csv(csv_file, 'system_performance')
+    reader.calls = calls
+    return reader
+
+
+def _load(cache, csv_file, reader):
+    return cache.load(csv_file, reader, 'system_performance')
+
+
+def test_hit_returns_the_parsed_frame(tmp_path, counting_reader):
+    log = _write_log(tmp_path / 'system_performance_1.csv', 0.05)
+    cache = SessionCache(tmp_path / 'cache')
+    first = _load(cache, log, counting_reader)
+    second = _load(cache, log, counting_reader)
+    assert len(counting_reader.calls) == 1
+    # Cached columns are memory-mapped; compare copies
+    expected = read_log_csv(log, 'system_performance')
+    pd.testing.assert_frame_equal(first.copy(deep=True), expected)
+    pd.testing.assert_frame_equal(second.copy(deep=True), expected)
+
+
+def test_hit_does_not_rewrite_the_index(tmp_path, counting_reader):
+    log = _write_log(tmp_path / 'system_performance_1.csv', 0.05)
+    cache = SessionCache(tmp_path / 'cache')
+    _load(cache, log, counting_reader)
+    before = cache.index_path.stat().st_mtime_ns
+    os.utime(cache.index_path, ns=(before - 10**9, before - 10**9))
+    _load(cache, log, counting_reader)
+    assert cache.index_path.stat().st_mtime_ns == before - 10**9
+
+
+def test_touched_but_unchanged_file_is_a_hit(tmp_path, counting_reader):
+    log = _write_log(tmp_path / 'system_performance_1.csv', 0.05)
+    cache = SessionCache(tmp_path / 'cache')
+    _load(cache, log, counting_reader)
+    stat = log.stat()
+    os.utime(log, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    _load(cache, log, counting_reader)
+    assert len(counting_reader.calls) == 1
+
+
+def test_changed_file_is_parsed_again(tmp_path, counting_reader):
+    log = _write_log(tmp_path / 'system_performance_1.csv', 0.05)
+    cache = SessionCache(tmp_path / 'cache')
+    _load(cache, log, counting_reader)
+    # Same size, different content
+    _write_log(log, 0.07)
+    frame = _load(cache, log, counting_reader)
+    assert len(counting_reader.calls) == 2
+    assert frame['AverageLatency'].iloc[0] == pytest.approx(0.07)
+    assert len(list((tmp_path / 'cache').glob('system_performance_*'))) == 1
+
+
+def test_reader_version_change_invalidates_entries(tmp_path, counting_reader, monkeypatch):
+    log = _write_log(tmp_path / 'system_performance_1.csv', 0.05)
+    cache = SessionCache(tmp_path / 'cache')
+    _load(cache, log, counting_reader)
+    monkeypatch.setattr(session_cache, 'READER_VERSION', session_cache.READER_VERSION + 1)
+    _load(cache, log, counting_reader)
+    assert len(counting_reader.calls) == 2
+    entries = [p.name for p in (tmp_path / 'cache').glob('system_performance_*')]
+    assert entries == [f'system_performance_v{session_cache.READER_VERSION}_'
+                       f'{session_cache.file_digest(log)}']
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path, counting_reader):
+    logs = [_write_log(tmp_path / f'system_performance_{i}.csv', 0.01 * (i + 1))
+            for i in range(3)]
+    cache = SessionCache(tmp_path / 'cache', max_bytes=0)
+    for log in logs:
+        _load(cache, log, counting_reader)
+    # Only the entry just written survives a zero budget
+    index = cache._read_index()
+    assert [record['hash'] for record in index.values()] == [session_cache.file_digest(logs[-1])]
+    assert len(list((tmp_path / 'cache').glob('system_performance_*'))) == 1
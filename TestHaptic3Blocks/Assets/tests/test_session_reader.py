@@ -0,0 +1,96 @@
+from pathlib import Path
+
+import pytest
+
+from session_reader import (EXPERIMENT_SESSION_COLUMNS, locate_summary, parse_trailer,
+                            read_log_csv, read_session_summary, read_summaries, read_trailer)
+
+EXPERIMENT_TRAILER = (
+    '\r\n'
+    'Session Summary\r\n'
+    'Total Task Time: 59.98 seconds\r\n'
+    'Average Rotation Error: 5.11 degrees\r\n'
+    'Maximum Rotation Deviation: 8.82 degrees\r\n'
+    'Stability Violations: 1711\r\n'
+    'Total Contact Time: 16.30 seconds\r\n'
+    'Contact Percentage: 27.17%\r\n'
+    '\r\n'
+    'Contact Statistics:\r\n'
+    'box: 7 contacts\r\n'
+    'robot2: 3 contacts\r\n'
+)
+
+RASPIMOUSE_TRAILER = (
+    '\n'
+    'Session Summary:\r\n'
+    'Duration: 9.9 seconds\r\n'
+    'Total Samples: 92\r\n'
+    'End Position: (-0.1, 0.0, 0.3)\r\n'
+    '\n'
+    'Session Summary:\r\n'
+    'Duration: 9.9 seconds\r\n'
+    'Total Samples: 92\r\n'
+    'End Position: (0.0, 0.0, 0.0)\r\n'
+)
+
+
+def _write_session(path, rows=500, trailer=EXPERIMENT_TRAILER):
+    line = ','.join(['0'] * 26 + ['', '0', 'initialization', '0', '0'])
+    data = [f'{i * 0.02:.2f}' + line[1:] for i in range(rows)]
+    text = '\r\n'.join([','.join(EXPERIMENT_SESSION_COLUMNS), *data]) + '\r\n' + trailer
+    Path(path).write_bytes(text.encode())
+    return path
+
+
+def test_parse_experiment_trailer():
+    blocks = parse_trailer(EXPERIMENT_TRAILER)
+    assert blocks == [
+        ('Session Summary', {'total_task_time': 59.98, 'average_rotation_error': 5.11,
+                             'maximum_rotation_deviation': 8.82, 'stability_violations': 1711,
+                             'total_contact_time': 16.3, 'contact_percentage': 27.17}),
+        ('Contact Statistics', {'box': 7, 'robot2': 3}),
+    ]
+    assert isinstance(blocks[0][1]['stability_violations'], int)
+
+
+def test_parse_one_summary_per_robot():
+    blocks = parse_trailer(RASPIMOUSE_TRAILER)
+    assert [section for section, _ in blocks] == ['Session Summary', 'Session Summary']
+    assert blocks[0][1] == {'duration': 9.9, 'total_samples': 92, 'end_position': (-0.1, 0.0, 0.3)}
+    assert blocks[1][1]['end_position'] == (0.0, 0.0, 0.0)
+
+
+@pytest.mark.parametrize('tail_bytes', [400, 64 * 1024])
+def test_read_session_summary_from_the_tail(tmp_path, tail_bytes):
+    session = _write_session(tmp_path / 'experiment_session_1.csv')
+    summary = read_session_summary(session, tail_bytes)
+    assert summary['total_task_time'] == 59.98
+    assert summary['contacts'] == {'box': 7, 'robot2': 3}
+
+
+def test_rows_stop_before_the_trailer(tmp_path):
+    session = _write_session(tmp_path / 'experiment_session_1.csv', rows=500)
+    data_end, summary_start = locate_summary(session)
+    raw = session.read_bytes()
+    assert raw[summary_start:].startswith(b'Session Summary')
+    assert raw[:data_end].endswith(b'0')
+    frame = read_log_csv(session, 'experiment_session')
+    assert len(frame) == 500
+    assert frame['TaskTime'].iloc[-1] == pytest.approx(9.98)
+
+
+def test_session_still_being_recorded(tmp_path):
+    session = _write_session(tmp_path / 'experiment_session_1.csv', rows=50, trailer='')
+    assert read_trailer(session) == []
+    assert read_session_summary(session) is None
+    assert locate_summary(session)[1] is None
+    assert len(read_log_csv(session, 'experiment_session')) == 50
+
+
+def test_read_summaries_flattens_contacts(tmp_path):
+    done = _write_session(tmp_path / 'experiment_session_1.csv')
+    running = _write_session(tmp_path / 'experiment_session_2.csv', trailer='')
+    table = read_summaries([done, running])
+    assert table.loc[0, 'contacts_box'] == 7
+    assert table.loc[0, 'contact_percentage'] == 27.17
+    assert table['total_task_time'].isna().tolist() == [False, True]
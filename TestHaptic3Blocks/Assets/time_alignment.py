@@ -0,0 +1,318 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from contact_events import ContactIntervals, contact_file_for
+from session_reader import read_log_csv
+
+CHUNK_ROWS = 200_000
+
+# 0/1 state columns: resampled by holding the previous value, never blended
+STATE_COLUMNS = ('IsInContact',)
+
+
+def timestamp_report(times, gap_factor=5.0):
+    """Duplicate, backward and gap counts of a timestamp column"""
+    times = np.asarray(times, dtype=np.float64)
+    steps = np.diff(times)
+    positive = steps[steps > 0]
+    median = float(np.median(positive)) if len(positive) else np.nan
+    return {
+        'samples': len(times),
+        'duplicates': int((steps == 0).sum()),
+        'backwards': int((steps < 0).sum()),
+        'monotonic': not bool((steps < 0).any()),
+        'median_interval': median,
+        'gaps': int((positive > gap_factor * median).sum()) if len(positive) else 0,
+    }
+
+
+def sort_by_time(frame, time_column):
+    """Stable sort by time, skipped when the column is already non-decreasing"""
+    times = frame[time_column].to_numpy()
+    if len(times) < 2 or not np.any(np.diff(times) < 0):
+        return frame
+    return frame.iloc[np.argsort(times, kind='stable')].reset_index(drop=True)
+
+
+def resolve_duplicates(frame, time_column, how='last'):
+    """Collapse rows sharing a timestamp: keep 'first'/'last', or 'mean' the
+    numeric columns (other columns keep their last value). The frame must be
+    sorted by time."""
+    times = frame[time_column].to_numpy()
+    if len(times) < 2 or not np.any(np.diff(times) == 0):
+        return frame
+    if how in ('first', 'last'):
+        keep = ~pd.Series(times).duplicated(keep=how).to_numpy()
+        return frame[keep].reset_index(drop=True)
+    if how != 'mean':
+        raise ValueError(f'Unknown duplicate handling: {how}')
+    groups = frame.groupby(time_column, sort=False, observed=True)
+    aggregations = {col: 'mean' if pd.api.types.is_float_dtype(frame[col]) else 'last'
+                    for col in frame.columns if col != time_column}
+    return groups.agg(aggregations).reset_index()[list(frame.columns)]
+
+
+def clean_stream(frame, time_column, duplicates='last'):
+    """Sort by time, resolve duplicate timestamps and drop rows without a time"""
+    frame = frame[frame[time_column].notna()]
+    return resolve_duplicates(sort_by_time(frame, time_column), time_column, duplicates)
+
+
+def sample_durations(times):
+    """Seconds each sample stands for: the interval to the next sample.
+
+    Unlike a mean interval this holds for irregular sampling. Duplicate or
+    backward timestamps get 0; the last sample gets the median interval.
+    """
+    times = np.asarray(times, dtype=np.float64)
+    if len(times) < 2:
+        return np.zeros(len(times))
+    steps = np.maximum(np.diff(times), 0.0)
+    positive = steps[steps > 0]
+    last = np.median(positive) if len(positive) else 0.0
+    return np.append(steps, last)
+
+
+def asof_indices(times, source_times, direction='backward', tolerance=None):
+    """Index into sorted `source_times` matched to each time, -1 for none.
+
+    Same semantics as pd.merge_asof: 'backward' takes the last source time
+    <= t, 'forward' the first >= t and 'nearest' the closer of the two.
+    """
+    times = np.asarray(times, dtype=np.float64)
+    source_times = np.asarray(source_times, dtype=np.float64)
+    n = len(source_times)
+    before = np.searchsorted(source_times, times, side='right') - 1
+    after = np.searchsorted(source_times, times, side='left')
+    after[after >= n] = -1
+    if direction == 'backward':
+        idx = before
+    elif direction == 'forward':
+        idx = after
+    elif direction == 'nearest':
+        with np.errstate(invalid='ignore'):
+            back_gap = np.where(before >= 0, times - source_times[np.maximum(before, 0)], np.inf)
+            fwd_gap = np.where(after >= 0, source_times[np.maximum(after, 0)] - times, np.inf)
+        idx = np.where(fwd_gap < back_gap, after, before)
+    else:
+        raise ValueError(f'Unknown direction: {direction}')
+    if tolerance is not None and n:
+        gap = np.abs(times - source_times[np.maximum(idx, 0)])
+        idx = np.where(gap <= tolerance, idx, -1)
+    return idx
+
+
+def take(values, idx):
+    """values[idx] with -1 giving NaN (missing category for categoricals)"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = np.where(idx >= 0, values.cat.codes.to_numpy()[np.maximum(idx, 0)], -1)
+        return pd.Categorical.from_codes(codes, values.cat.categories)
+    array = values.to_numpy()
+    if not len(array):
+        return np.full(len(idx), np.nan)
+    if array.dtype.kind not in 'fc':
+        array = array.astype(np.float64) if array.dtype.kind in 'iub' else array.astype(object)
+    result = array[np.maximum(idx, 0)]
+    result[idx < 0] = np.nan
+    return result
+
+
+def asof_join(left, right, left_on, right_on=None, columns=None, direction='backward',
+              tolerance=None, prefix=''):
+    """Attach the `right` row matched by time to every row of `left`.
+
+    Vectorized merge_asof: `right` is sorted and de-duplicated (last row per
+    timestamp wins) first, so its timestamps may be unordered or repeated;
+    `left` keeps its own order.
+    """
+    right_on = right_on or left_on
+    right = clean_stream(right, right_on)
+    idx = asof_indices(left[left_on].to_numpy(), right[right_on].to_numpy(),
+                       direction, tolerance)
+    joined = left.copy()
+    for col in (columns if columns is not None else
+                [c for c in right.columns if c != right_on]):
+        joined[prefix + col] = take(right[col], idx)
+    return joined
+
+
+def make_grid(start, stop, rate):
+    """Uniform grid from `start` to `stop` at `rate` Hz (index-based, no drift)"""
+    count = int(np.floor((stop - start) * rate + 1e-9)) + 1
+    return start + np.arange(max(count, 0)) / rate
+
+
+def resample_at(frame, time_column, times, columns=None, hold=STATE_COLUMNS):
+    """Values of a clean (sorted, unique-time) stream at arbitrary times.
+
+    Float columns are linearly interpolated and NaN outside the stream's
+    time range; columns in `hold` and non-float columns take the previous
+    sample's value.
+    """
+    times = np.asarray(times, dtype=np.float64)
+    source_times = frame[time_column].to_numpy(dtype=np.float64)
+    previous = asof_indices(times, source_times)
+    resampled = {time_column: times}
+    for col in (columns if columns is not None else
+                [c for c in frame.columns if c != time_column]):
+        values = frame[col]
+        if col in hold or not pd.api.types.is_float_dtype(values):
+            resampled[col] = take(values, previous)
+        elif len(source_times):
+            resampled[col] = np.interp(times, source_times, values.to_numpy(dtype=np.float64),
+                                       left=np.nan, right=np.nan).astype(values.dtype)
+        else:
+            resampled[col] = np.full(len(times), np.nan, dtype=values.dtype)
+    return pd.DataFrame(resampled)
+
+
+def resample(frame, time_column, rate, columns=None, hold=STATE_COLUMNS,
+             start=None, stop=None, duplicates='last'):
+    """Resample one stream onto a uniform `rate` Hz grid"""
+    frame = clean_stream(frame, time_column, duplicates)
+    times = frame[time_column].to_numpy(dtype=np.float64)
+    if len(times) == 0:
+        return frame.iloc[:0]
+    start = times[0] if start is None else start
+    stop = times[-1] if stop is None else stop
+    return resample_at(frame, time_column, make_grid(start, stop, rate), columns, hold)
+
+
+def resample_chunks(chunks, time_column, rate, columns=None, hold=STATE_COLUMNS,
+                    start=None, duplicates='last'):
+    """Resample a chunked stream onto a uniform grid, one output frame per chunk.
+
+    The last sample of each chunk is carried into the next, so grid points
+    between chunks are interpolated exactly as in a single pass. Rows older
+    than the previous chunk's last timestamp are dropped.
+    """
+    carry = None
+    next_index = 0
+    for chunk in chunks:
+        chunk = sort_by_time(chunk, time_column)
+        if carry is not None:
+            last_time = carry[time_column].iloc[-1]
+            chunk = pd.concat([carry, chunk[chunk[time_column] >= last_time]],
+                              ignore_index=True)
+        chunk = clean_stream(chunk, time_column, duplicates)
+        if chunk.empty:
+            continue
+        times = chunk[time_column].to_numpy(dtype=np.float64)
+        if start is None:
+            start = times[0]
+        last_index = int(np.floor((times[-1] - start) * rate + 1e-9))
+        grid = start + np.arange(next_index, last_index + 1) / rate
+        next_index = max(next_index, last_index + 1)
+        carry = chunk.iloc[-1:]
+        if len(grid):
+            yield resample_at(chunk, time_column, grid, columns, hold)
+
+
+def align(streams, rate, start=None, stop=None, hold=STATE_COLUMNS):
+    """Interpolate several streams onto one common grid.
+
+    `streams` maps a name to (frame, time_column), with times on a shared
+    clock. The grid spans the overlap of all streams unless `start`/`stop`
+    are given; columns are named '<stream>.<column>'.
+    """
+    cleaned = {name: clean_stream(frame, time_column)
+               for name, (frame, time_column) in streams.items()}
+    bounds = [(frame[streams[name][1]].iloc[0], frame[streams[name][1]].iloc[-1])
+              for name, frame in cleaned.items() if len(frame)]
+    if start is None:
+        start = max(b[0] for b in bounds) if bounds else 0.0
+    if stop is None:
+        stop = min(b[1] for b in bounds) if bounds else 0.0
+    grid = make_grid(start, stop, rate)
+    aligned = pd.DataFrame({'Time': grid})
+    for name, frame in cleaned.items():
+        time_column = streams[name][1]
+        resampled = resample_at(frame, time_column, grid, hold=hold)
+        for col in resampled.columns:
+            if col != time_column:
+                aligned[f'{name}.{col}'] = resampled[col]
+    return aligned
+
+
+def align_chunks(chunks, time_column, others, direction='backward', tolerance=None):
+    """As-of join small streams onto each chunk of a large one.
+
+    `others` maps a name to (frame, time_column) on the same clock as the
+    chunks; a ContactIntervals object instead joins contact columns by
+    interval. Columns are prefixed '<name>.'.
+    """
+    prepared = {}
+    for name, other in others.items():
+        if isinstance(other, ContactIntervals):
+            prepared[name] = other
+        else:
+            frame, other_time = other
+            prepared[name] = (clean_stream(frame, other_time), other_time)
+    for chunk in chunks:
+        times = chunk[time_column].to_numpy()
+        for name, other in prepared.items():
+            if isinstance(other, ContactIntervals):
+                idx = other.locate(times)
+                source = other.contacts
+            else:
+                source, other_time = other
+                idx = asof_indices(times, source[other_time].to_numpy(), direction, tolerance)
+            for col in source.columns:
+                chunk[f'{name}.{col}'] = take(source[col], idx)
+        yield chunk
+
+
+def main(argv=None):
+    """Command line entry point for aligning a session's streams."""
+    parser = argparse.ArgumentParser(
+        description='Align experiment, contact and performance streams on one time axis')
+    parser.add_argument('session_csv', help='experiment_session CSV')
+    parser.add_argument('--performance', help='system_performance CSV to join')
+    parser.add_argument('--performance-offset', type=float, default=0.0,
+                        help='seconds added to the performance clock after zeroing '
+                        'it at its first sample')
+    parser.add_argument('--no-contacts', action='store_true',
+                        help='do not join the sibling contact_data file')
+    parser.add_argument('--rate', type=float,
+                        help='resample the session onto a uniform grid (Hz)')
+    parser.add_argument('--tolerance', type=float, default=None,
+                        help='max time distance of an as-of match (s)')
+    parser.add_argument('--chunksize', type=int, default=CHUNK_ROWS)
+    parser.add_argument('-o', '--output', default='aligned_session.csv')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    chunks = read_log_csv(args.session_csv, 'experiment_session', chunksize=args.chunksize)
+    first = next(chunks)
+    report = timestamp_report(first['TaskTime'])
+    print(f"TaskTime: {report['duplicates']} duplicates, {report['backwards']} backward steps, "
+          f"median interval {report['median_interval'] * 1000:.1f} ms (first chunk)")
+    chunks = (chunk for part in ([first], chunks) for chunk in part)
+    if args.rate:
+        chunks = resample_chunks(chunks, 'TaskTime', args.rate)
+
+    others = {}
+    if args.performance:
+        performance = read_log_csv(args.performance, 'system_performance')
+        performance['Timestamp'] = (performance['Timestamp'] - performance['Timestamp'].min()
+                                    + args.performance_offset)
+        others['performance'] = (performance, 'Timestamp')
+    contact_file = contact_file_for(args.session_csv)
+    if not args.no_contacts and contact_file is not None and contact_file.exists():
+        others['contact'] = ContactIntervals.from_csv(contact_file)
+
+    rows = 0
+    header = True
+    for chunk in align_chunks(chunks, 'TaskTime', others, tolerance=args.tolerance):
+        chunk.to_csv(args.output, mode='w' if header else 'a', header=header, index=False)
+        header = False
+        rows += len(chunk)
+    print(f'Wrote {rows} aligned rows with {", ".join(others) or "no other streams"} '
+          f'in {time.perf_counter() - start:.2f}s -> {args.output}')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+import argparse
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from binary_log import SUFFIX as BINARY_SUFFIX, read_binary_log
+from decimation import pixel_width
+from figure_export import DEFAULT_PROFILES, PROFILES, FigureExporter
+from session_reader import read_log_csv
+
+PYRAMID_SUFFIX = '.pyramid'
+META_FILE = 'meta.json'
+FACTOR = 4
+# Coarsening stops once a level has at most this many bins
+MIN_BINS = 256
+STATS = ('min', 'max', 'mean')
+
+SIGNALS = [
+    'BoxRotation', 'ForceMagnitude', 'Robot1Speed', 'Robot2Speed',
+    'HapticPosX', 'HapticPosY', 'HapticPosZ',
+    'HapticForceX', 'HapticForceY', 'HapticForceZ',
+]
+
+
+def pyramid_path_for(session_file):
+    """experiment_session_X.csv -> experiment_session_X.pyramid (same folder)"""
+    session_file = Path(session_file)
+    return session_file.with_name(session_file.stem + PYRAMID_SUFFIX)
+
+
+def _source_stamp(session_file):
+    stat = Path(session_file).stat()
+    return {'size': stat.st_size, 'mtime': stat.st_mtime}
+
+
+def _coarsen(time, time_end, stats, counts, factor):
+    """Merge every `factor` consecutive bins of a level into one"""
+    starts = np.arange(0, len(time), factor)
+    new_counts = np.add.reduceat(counts, starts)
+    coarse = {}
+    for signal, (lo, hi, mean) in stats.items():
+        sums = np.add.reduceat(mean.astype(np.float64) * counts, starts)
+        coarse[signal] = (np.minimum.reduceat(lo, starts), np.maximum.reduceat(hi, starts),
+                          (sums / new_counts).astype(mean.dtype))
+    return time[starts], time_end[np.append(starts[1:], len(time)) - 1], coarse, new_counts
+
+
+def build_pyramid(session_file, signals=SIGNALS, factor=FACTOR, min_bins=MIN_BINS,
+                  output=None):
+    """Write the min/max/mean pyramid of a session next to it.
+
+    Level 0 is the raw signal; every level above merges `factor` bins of
+    the one below, so the whole pyramid is about 1 + 3 / (factor - 1)
+    times the raw size. Arrays are stored as .npy files and memory-mapped
+    on read. Returns the pyramid directory.
+    """
+    session_file = Path(session_file)
+    output = Path(output) if output is not None else pyramid_path_for(session_file)
+    columns = ['TaskTime', *signals]
+    if session_file.suffix == BINARY_SUFFIX:
+        frame = read_binary_log(session_file, columns)
+    else:
+        frame = read_log_csv(session_file, 'experiment_session', columns=columns)
+    signals = [s for s in signals if s in frame.columns]
+
+    # Build in a scratch directory so readers never see half a pyramid
+    tmp_dir = output.with_name(f'.{output.name}.{uuid.uuid4().hex}')
+    tmp_dir.mkdir(parents=True)
+    time = frame['TaskTime'].to_numpy(dtype=np.float64)
+    np.save(tmp_dir / 'L0_time.npy', time)
+    stats = {}
+    for signal in signals:
+        values = frame[signal].to_numpy()
+        np.save(tmp_dir / f'L0_{signal}.npy', values)
+        stats[signal] = (values, values, values)
+    levels = [{'bins': len(time), 'bin_samples': 1}]
+
+    time_end = time
+    counts = np.ones(len(time), dtype=np.int64)
+    while len(time) > min_bins:
+        time, time_end, stats, counts = _coarsen(time, time_end, stats, counts, factor)
+        level = len(levels)
+        np.save(tmp_dir / f'L{level}_time.npy', time)
+        np.save(tmp_dir / f'L{level}_time_end.npy', time_end)
+        for signal, arrays in stats.items():
+            for stat, array in zip(STATS, arrays):
+                np.save(tmp_dir / f'L{level}_{signal}_{stat}.npy', array)
+        levels.append({'bins': len(time), 'bin_samples': levels[-1]['bin_samples'] * factor})
+
+    meta = {'source': session_file.name, **_source_stamp(session_file),
+            'factor': factor, 'signals': signals, 'levels': levels}
+    with open(tmp_dir / META_FILE, 'w') as f:
+        json.dump(meta, f)
+    shutil.rmtree(output, ignore_errors=True)
+    os.replace(tmp_dir, output)
+    return output
+
+
+class TimePyramid:
+    """Read side of a session pyramid.
+
+    window() picks the finest level that still fits `max_points` bins in
+    [t0, t1] and slices only that range out of the memory-mapped arrays,
+    so any zoom costs about max_points samples of I/O whatever the
+    session length.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / META_FILE, 'r') as f:
+            self.meta = json.load(f)
+        self.signals = self.meta['signals']
+        self.levels = self.meta['levels']
+        self._arrays = {}
+
+    @classmethod
+    def for_session(cls, session_file, signals=SIGNALS, rebuild=False):
+        """Open the pyramid of a session, (re)building it when missing or stale"""
+        path = pyramid_path_for(session_file)
+        pyramid = None
+        if not rebuild and (path / META_FILE).exists():
+            pyramid = cls(path)
+            stamp = _source_stamp(session_file)
+            if (pyramid.meta['size'], pyramid.meta['mtime']) != (stamp['size'], stamp['mtime']) \
+                    or not set(signals) <= set(pyramid.signals):
+                pyramid = None
+        return pyramid or cls(build_pyramid(session_file, signals))
+
+    def _array(self, name):
+        if name not in self._arrays:
+            self._arrays[name] = np.load(self.path / f'{name}.npy', mmap_mode='r')
+        return self._arrays[name]
+
+    @property
+    def time_range(self):
+        time = self._array('L0_time')
+        return (float(time[0]), float(time[-1])) if len(time) else (0.0, 0.0)
+
+    def level_for(self, t0, t1, max_points):
+        """Finest level with at most `max_points` bins in [t0, t1]"""
+        start, end = self.time_range
+        span = max(min(t1, end) - max(t0, start), 0.0)
+        total = max(end - start, 1e-12)
+        for level, info in enumerate(self.levels):
+            if info['bins'] * span / total <= max_points:
+                return level
+        return len(self.levels) - 1
+
+    def window(self, signal, t0=None, t1=None, max_points=2000, level=None):
+        """(time, min, max, mean) of `signal` for the bins overlapping [t0, t1].
+
+        Above level 0 `time` is the bin centre, halfway between its first
+        and last sample.
+        """
+        if signal not in self.signals:
+            raise KeyError(f'{signal} is not in the pyramid of {self.meta["source"]}')
+        start, end = self.time_range
+        t0 = start if t0 is None else t0
+        t1 = end if t1 is None else t1
+        if level is None:
+            level = self.level_for(t0, t1, max_points)
+        time = self._array(f'L{level}_time')
+        # Include the bins straddling both edges so lines reach the axes limits
+        lo = max(np.searchsorted(time, t0, side='right') - 1, 0)
+        hi = min(np.searchsorted(time, t1, side='right') + 1, len(time))
+        if level == 0:
+            values = np.asarray(self._array(f'L0_{signal}')[lo:hi])
+            return np.asarray(time[lo:hi]), values, values, values
+        centre = (np.asarray(time[lo:hi]) + self._array(f'L{level}_time_end')[lo:hi]) / 2
+        return (centre,
+                *(np.asarray(self._array(f'L{level}_{signal}_{stat}')[lo:hi]) for stat in STATS))
+
+
+class PyramidPlotter:
+    """Windowed session plots drawn from a TimePyramid.
+
+    Every plot_*(t0, t1) method reads only the pyramid level and range that
+    fit the axes' pixel width and shades the min/max envelope behind the
+    mean, so spikes inside a bin stay visible at every zoom.
+    """
+
+    def __init__(self, session_file, dpi=100, rebuild=False):
+        self.pyramid = TimePyramid.for_session(session_file, rebuild=rebuild)
+        self.session_file = Path(session_file)
+        self.dpi = dpi
+
+    def draw(self, ax, signal, t0=None, t1=None, color=None, label=None):
+        t, lo, hi, mean = self.pyramid.window(signal, t0, t1,
+                                              max_points=pixel_width(ax, self.dpi))
+        line, = ax.plot(t, mean, color=color, label=label or signal, linewidth=1)
+        if not np.array_equal(lo, hi):
+            ax.fill_between(t, lo, hi, color=line.get_color(), alpha=0.25, linewidth=0)
+        if t0 is not None and t1 is not None:
+            ax.set_xlim(t0, t1)
+        return line
+
+    def plot_signals(self, groups, t0=None, t1=None, title=None):
+        """One axes per (ylabel, signals) group, sharing the time axis"""
+        fig, axes = plt.subplots(len(groups), 1, figsize=(14, 3 * len(groups)), sharex=True,
+                                 squeeze=False)
+        for ax, (ylabel, signals) in zip(axes[:, 0], groups):
+            for signal in signals:
+                self.draw(ax, signal, t0, t1)
+            ax.set_ylabel(ylabel)
+            ax.grid(True, alpha=0.3)
+            if len(signals) > 1:
+                ax.legend(loc='upper right')
+        axes[-1, 0].set_xlabel('Time (s)')
+        start, end = self.pyramid.time_range
+        window = f'{start if t0 is None else t0:.1f}–{end if t1 is None else t1:.1f} s'
+        fig.suptitle(f"{title or ''} {window}".strip())
+        fig.tight_layout()
+        return fig
+
+    def plot_rotation(self, t0=None, t1=None):
+        return self.plot_signals([('Box rotation (deg)', ['BoxRotation'])], t0, t1,
+                                 'Box rotation')
+
+    def plot_force(self, t0=None, t1=None):
+        return self.plot_signals([('Force magnitude', ['ForceMagnitude'])], t0, t1,
+                                 'Haptic force')
+
+    def plot_speeds(self, t0=None, t1=None):
+        return self.plot_signals([('Speed (m/s)', ['Robot1Speed', 'Robot2Speed'])], t0, t1,
+                                 'Robot speeds')
+
+    def plot_haptic(self, t0=None, t1=None):
+        return self.plot_signals([
+            ('Haptic position', ['HapticPosX', 'HapticPosY', 'HapticPosZ']),
+            ('Haptic force', ['HapticForceX', 'HapticForceY', 'HapticForceZ']),
+        ], t0, t1, 'Haptic device')
+
+    def plot_overview(self, t0=None, t1=None):
+        return self.plot_signals([
+            ('Box rotation (deg)', ['BoxRotation']),
+            ('Force magnitude', ['ForceMagnitude']),
+            ('Speed (m/s)', ['Robot1Speed', 'Robot2Speed']),
+        ], t0, t1, 'Session')
+
+
+PLOTS = {
+    'overview': 'plot_overview',
+    'rotation': 'plot_rotation',
+    'force': 'plot_force',
+    'speeds': 'plot_speeds',
+    'haptic': 'plot_haptic',
+}
+
+
+def main(argv=None):
+    """Command line entry point for pyramid building and windowed plots."""
+    parser = argparse.ArgumentParser(
+        description='Build min/max/mean time pyramids and plot session windows')
+    parser.add_argument('sessions', nargs='+', help='experiment_session CSV or .hlog files')
+    parser.add_argument('--t0', type=float, help='window start (s)')
+    parser.add_argument('--t1', type=float, help='window end (s)')
+    parser.add_argument('--plots', nargs='*', choices=list(PLOTS), default=[],
+                        help='figures to render for the window (default: build only)')
+    parser.add_argument('-o', '--output-dir', default='.')
+    parser.add_argument('--rebuild', action='store_true', help='rebuild existing pyramids')
+    parser.add_argument('--profiles', nargs='+', choices=list(PROFILES),
+                        default=list(DEFAULT_PROFILES))
+    args = parser.parse_args(argv)
+
+    dpi = max(PROFILES[p]['dpi'] for p in args.profiles)
+    for session in args.sessions:
+        plotter = PyramidPlotter(session, dpi=dpi, rebuild=args.rebuild)
+        levels = plotter.pyramid.levels
+        print(f'{plotter.pyramid.path}: {len(levels)} levels, '
+              f"{levels[0]['bins']} -> {levels[-1]['bins']} bins")
+        window = '' if args.t0 is None and args.t1 is None else f'_{args.t0}-{args.t1}'
+        with FigureExporter(args.profiles) as exporter:
+            for name in args.plots:
+                fig = getattr(plotter, PLOTS[name])(args.t0, args.t1)
+                exporter.export(fig, args.output_dir,
+                                f'{Path(session).stem}_{name}{window}')
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,344 @@
+import argparse
+import glob
+import time
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from decimation import decimate, pixel_width
+from figure_export import DEFAULT_PROFILES, PROFILES, FigureExporter
+from session_reader import read_log_csv, read_trailer
+
+PREFIX = 'raspimouse_session_'
+# Unity is Y-up: robots drive in the X/Z plane
+PLANE = ('PosX', 'PosZ')
+# Below this logged speed (m/s) a robot counts as stopped
+STOP_SPEED = 0.02
+QUANTILES = (0.5, 0.95)
+
+def robot_index(times):
+    """Position of each row among the rows sharing its timestamp.
+
+    The recorder writes one row per robot for every sample, always in the
+    same order, so this rank identifies the robot.
+    """
+    times = np.asarray(times)
+    if len(times) == 0:
+        return np.empty(0, dtype=np.int16)
+    new = np.empty(len(times), dtype=bool)
+    new[0] = True
+    new[1:] = times[1:] != times[:-1]
+    starts = np.flatnonzero(new)
+    return (np.arange(len(times)) - starts[np.cumsum(new) - 1]).astype(np.int16)
+
+
+def read_raspimouse_session(path):
+    """Data rows (with a Robot column) and the per-robot summaries of one log"""
+    frame = read_log_csv(path, 'raspimouse_session')
+    frame['Robot'] = robot_index(frame['Timestamp'].to_numpy())
+    footers = [fields for section, fields in read_trailer(path) if section == 'Session Summary']
+    return frame, footers
+
+
+def find_logs(inputs):
+    """Expand files, directories and glob patterns into raspimouse logs"""
+    found = set()
+    for item in inputs:
+        path = Path(item)
+        candidates = path.glob(f'{PREFIX}*.csv') if path.is_dir() else map(Path, glob.glob(item))
+        found.update(p for p in candidates if p.name.startswith(PREFIX) and p.is_file())
+    return sorted(found)
+
+
+def session_name(path):
+    return Path(path).stem[len(PREFIX):] if Path(path).stem.startswith(PREFIX) else Path(path).stem
+
+
+class Trajectories:
+    """Robot trajectories of many sessions in flat, ragged arrays.
+
+    Rows are sorted by trajectory (one per session and robot) and time;
+    trajectory i spans rows offsets[i]:offsets[i + 1]. Every metric is
+    computed for all trajectories at once with segment-aware NumPy
+    reductions (bincount, reduceat), so the cost does not depend on how
+    the rows are split into sessions and robots.
+    """
+
+    def __init__(self, frame):
+        frame = frame.sort_values(['Session', 'Robot', 'Timestamp'], kind='stable')
+        self.frame = frame.reset_index(drop=True)
+        session = self.frame['Session'].to_numpy()
+        robot = self.frame['Robot'].to_numpy()
+        n = len(self.frame)
+        new = np.ones(n, dtype=bool)
+        if n:
+            new[1:] = (session[1:] != session[:-1]) | (robot[1:] != robot[:-1])
+        self.traj = np.cumsum(new) - 1
+        starts = np.flatnonzero(new)
+        self.offsets = np.append(starts, n)
+        self.index = pd.DataFrame({'Session': session[starts], 'Robot': robot[starts]})
+        self.times = self.frame['Timestamp'].to_numpy(dtype=np.float64)
+        self.xy = self.frame[list(PLANE)].to_numpy(dtype=np.float64)
+        self.speed = self.frame['Speed'].to_numpy(dtype=np.float64)
+
+        # Steps between consecutive rows of the same trajectory
+        self.same = self.traj[1:] == self.traj[:-1]
+        self.step = np.hypot(*np.diff(self.xy, axis=0).T) * self.same
+
+    @classmethod
+    def from_files(cls, paths):
+        """Load logs and return (Trajectories, footers by session)"""
+        frames = []
+        footers = {}
+        for path in paths:
+            frame, session_footers = read_raspimouse_session(path)
+            frame.insert(0, 'Session', session_name(path))
+            frames.append(frame)
+            footers[session_name(path)] = session_footers
+        frame = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(
+            columns=['Session', 'Robot', 'Timestamp', *PLANE, 'Speed'])
+        return cls(frame), footers
+
+    def __len__(self):
+        return len(self.index)
+
+    def _per_trajectory(self, step_values):
+        """Sum per-step values (length n - 1) into their trajectories"""
+        return np.bincount(self.traj[1:], weights=step_values, minlength=len(self))
+
+    def path_length(self):
+        return self._per_trajectory(self.step)
+
+    def duration(self):
+        first = self.times[self.offsets[:-1]]
+        last = self.times[self.offsets[1:] - 1]
+        return last - first
+
+    def curvature(self, min_step=1e-4):
+        """Turning angle per metre at every row (NaN where undefined).
+
+        Headings come from position steps longer than `min_step` metres;
+        the heading change between two consecutive steps is divided by
+        their mean length.
+        """
+        delta = np.diff(self.xy, axis=0)
+        heading = np.arctan2(delta[:, 1], delta[:, 0])
+        valid = self.same & (self.step > min_step)
+        turn = np.angle(np.exp(1j * np.diff(heading)))
+        pair = valid[1:] & valid[:-1]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            kappa = np.abs(turn) / ((self.step[1:] + self.step[:-1]) / 2)
+        curvature = np.full(len(self.times), np.nan)
+        curvature[1:-1] = np.where(pair, kappa, np.nan)
+        return curvature
+
+    def mean_curvature(self, min_step=1e-4):
+        """Total turning (rad) over path length (m) per trajectory"""
+        delta = np.diff(self.xy, axis=0)
+        heading = np.arctan2(delta[:, 1], delta[:, 0])
+        valid = self.same & (self.step > min_step)
+        pair = valid[1:] & valid[:-1]
+        turn = np.abs(np.angle(np.exp(1j * np.diff(heading)))) * pair
+        total = np.bincount(self.traj[1:-1], weights=turn, minlength=len(self))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.path_length() > 0, total / self.path_length(), np.nan)
+
+    def stop_go_segments(self, stop_speed=STOP_SPEED):
+        """Run-length encoded moving/stopped segments of every trajectory"""
+        columns = ['Session', 'Robot', 'state', 'start', 'end', 'duration', 'distance']
+        n = len(self.times)
+        if n == 0:
+            return pd.DataFrame(columns=columns)
+        moving = self.speed > stop_speed
+        boundary = np.ones(n, dtype=bool)
+        boundary[1:] = (moving[1:] != moving[:-1]) | ~self.same
+        starts = np.flatnonzero(boundary)
+        last = np.append(starts[1:], n) - 1
+        # A segment lasts until the next one starts within its trajectory
+        traj = self.traj[starts]
+        next_in_traj = np.append(traj[1:] == traj[:-1], False)
+        end_index = np.where(next_in_traj, np.minimum(last + 1, n - 1), last)
+        travelled = np.concatenate(([0.0], np.cumsum(self.step)))
+        return pd.DataFrame({
+            'Session': self.index['Session'].to_numpy()[traj],
+            'Robot': self.index['Robot'].to_numpy()[traj],
+            'state': np.where(moving[starts], 'go', 'stop'),
+            'start': self.times[starts],
+            'end': self.times[end_index],
+            'duration': self.times[end_index] - self.times[starts],
+            'distance': travelled[end_index] - travelled[starts],
+        })
+
+    def speed_profile(self, qs=QUANTILES, stop_speed=STOP_SPEED):
+        """Mean, max, quantiles and moving time of the logged speed"""
+        count = np.diff(self.offsets)
+        speed = np.nan_to_num(self.speed)
+        profile = pd.DataFrame({
+            'mean_speed': np.bincount(self.traj, weights=speed, minlength=len(self))
+            / np.maximum(count, 1),
+            'max_speed': np.maximum.reduceat(speed, self.offsets[:-1]) if len(speed) else [],
+        })
+        # Sorting by (trajectory, speed) turns every quantile into an index
+        order = np.lexsort((speed, self.traj))
+        sorted_speed = speed[order]
+        for q in qs:
+            rank = self.offsets[:-1] + np.floor(q * (count - 1)).astype(np.int64)
+            profile[f'p{q * 100:g}_speed'] = sorted_speed[rank] if len(speed) else []
+        durations = np.append(np.diff(self.times) * self.same, 0.0)
+        profile['moving_time'] = np.bincount(self.traj, weights=durations * (speed > stop_speed),
+                                             minlength=len(self))
+        return profile
+
+    def separation(self):
+        """Distance between the two robots of each session at every sample.
+
+        Rows of the same session and timestamp are paired; samples where a
+        robot is missing are skipped.
+        """
+        columns = ['Session', 'Timestamp', 'Separation']
+        by_time = self.frame.sort_values(['Session', 'Timestamp', 'Robot'], kind='stable')
+        session = by_time['Session'].to_numpy()
+        times = by_time['Timestamp'].to_numpy()
+        n = len(times)
+        if n < 2:
+            return pd.DataFrame(columns=columns)
+        new = np.ones(n, dtype=bool)
+        new[1:] = (session[1:] != session[:-1]) | (times[1:] != times[:-1])
+        starts = np.flatnonzero(new)
+        sizes = np.diff(np.append(starts, n))
+        pairs = starts[sizes == 2]
+        xy = by_time[list(PLANE)].to_numpy(dtype=np.float64)
+        return pd.DataFrame({
+            'Session': session[pairs],
+            'Timestamp': times[pairs],
+            'Separation': np.hypot(*(xy[pairs + 1] - xy[pairs]).T),
+        })
+
+    def summary(self, stop_speed=STOP_SPEED):
+        """One row per trajectory, with the session's robot separation"""
+        segments = self.stop_go_segments(stop_speed)
+        stops = segments[segments['state'] == 'stop'].groupby(['Session', 'Robot']).size()
+        table = self.index.copy()
+        table['samples'] = np.diff(self.offsets)
+        table['duration'] = self.duration()
+        table['path_length'] = self.path_length()
+        table['mean_curvature'] = self.mean_curvature()
+        table = pd.concat([table, self.speed_profile(stop_speed=stop_speed)], axis=1)
+        table['stops'] = stops.reindex(pd.MultiIndex.from_frame(self.index),
+                                       fill_value=0).to_numpy()
+        separation = self.separation().groupby('Session')['Separation'].agg(
+            min_separation='min', mean_separation='mean')
+        return table.merge(separation, how='left', left_on='Session', right_index=True)
+
+
+def plot_session(trajectories, session, output_dir, profiles=DEFAULT_PROFILES, dpi=None,
+                 stop_speed=STOP_SPEED, segments=None, separation=None):
+    """Ground-plane paths, speed profiles and separation of one session.
+
+    Every series is decimated to the pixel width of its axes before it is
+    drawn, so long sessions render as fast as short ones. Pass `segments`
+    and `separation` when plotting many sessions to compute them once.
+    """
+    dpi = dpi or max(PROFILES[p]['dpi'] for p in profiles)
+    fig = plt.figure(figsize=(14, 7))
+    grid = fig.add_gridspec(2, 2, width_ratios=[1, 1.4])
+    ax_path = fig.add_subplot(grid[:, 0])
+    ax_speed = fig.add_subplot(grid[0, 1])
+    ax_sep = fig.add_subplot(grid[1, 1], sharex=ax_speed)
+
+    if segments is None:
+        segments = trajectories.stop_go_segments(stop_speed)
+    if separation is None:
+        separation = trajectories.separation()
+    rows = np.flatnonzero(trajectories.index['Session'].to_numpy() == session)
+    for color, i in zip(plt.rcParams['axes.prop_cycle'].by_key()['color'], rows):
+        lo, hi = trajectories.offsets[i], trajectories.offsets[i + 1]
+        robot = trajectories.index['Robot'].iloc[i]
+        t = trajectories.times[lo:hi]
+        x, z = trajectories.xy[lo:hi].T
+        max_points = 2 * pixel_width(ax_path, dpi)
+        _, xd, zd = decimate(np.arange(len(x)), x, z, max_points=max_points)
+        ax_path.plot(xd, zd, color=color, label=f'Robot {robot}')
+        ax_path.plot(x[:1], z[:1], 'o', color=color)
+        ax_path.plot(x[-1:], z[-1:], 's', color=color)
+        td, sd = decimate(t, trajectories.speed[lo:hi], max_points=2 * pixel_width(ax_speed, dpi))
+        ax_speed.plot(td, sd, color=color, label=f'Robot {robot}')
+
+    stops = segments[(segments['Session'] == session) & (segments['state'] == 'stop')]
+    ax_speed.broken_barh(list(zip(stops['start'], stops['duration'])), (0, stop_speed),
+                         facecolor='grey', alpha=0.3, label='Stopped')
+
+    separation = separation[separation['Session'] == session]
+    if len(separation):
+        td, sep = decimate(separation['Timestamp'].to_numpy(),
+                           separation['Separation'].to_numpy(),
+                           max_points=2 * pixel_width(ax_sep, dpi))
+        ax_sep.plot(td, sep, color='black')
+
+    ax_path.set_xlabel(f'{PLANE[0]} (m)')
+    ax_path.set_ylabel(f'{PLANE[1]} (m)')
+    ax_path.set_aspect('equal', adjustable='datalim')
+    ax_path.set_title('Trajectories (o start, ■ end)')
+    ax_path.legend(loc='best')
+    ax_speed.set_ylabel('Speed (m/s)')
+    ax_speed.legend(loc='upper right')
+    ax_sep.set_ylabel('Separation (m)')
+    ax_sep.set_xlabel('Time (s)')
+    for ax in (ax_path, ax_speed, ax_sep):
+        ax.grid(True, alpha=0.3)
+    fig.suptitle(f'raspimouse session {session}')
+    fig.tight_layout()
+
+    with FigureExporter(profiles) as exporter:
+        exporter.export(fig, output_dir, f'trajectory_{session}')
+    return exporter.records
+
+
+def main(argv=None):
+    """Command line entry point for trajectory analytics."""
+    parser = argparse.ArgumentParser(description='Trajectory metrics of raspimouse session logs')
+    parser.add_argument('inputs', nargs='+',
+                        help='raspimouse_session CSV files, glob patterns or directories')
+    parser.add_argument('-o', '--output-dir', default='trajectory_reports')
+    parser.add_argument('--stop-speed', type=float, default=STOP_SPEED,
+                        help='speed below which a robot counts as stopped (m/s)')
+    parser.add_argument('--plots', action='store_true', help='render one figure per session')
+    parser.add_argument('--profiles', nargs='+', choices=list(PROFILES),
+                        default=list(DEFAULT_PROFILES))
+    args = parser.parse_args(argv)
+
+    paths = find_logs(args.inputs)
+    if not paths:
+        print('No raspimouse_session files found')
+        return 1
+
+    start = time.perf_counter()
+    trajectories, footers = Trajectories.from_files(paths)
+    loaded = time.perf_counter()
+    summary = trajectories.summary(args.stop_speed)
+    segments = trajectories.stop_go_segments(args.stop_speed)
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    summary.to_csv(output_dir / 'trajectory_summary.csv', index=False)
+    segments.to_csv(output_dir / 'stop_go_segments.csv', index=False)
+    print(f'{len(paths)} sessions, {len(trajectories)} trajectories: loaded in '
+          f'{loaded - start:.2f}s, analyzed in {time.perf_counter() - loaded:.2f}s '
+          f'-> {output_dir}')
+    print(summary.to_string(index=False))
+    for session, blocks in footers.items():
+        for block in blocks:
+            print(f"{session} footer: distance {block.get('total_distance')} m, "
+                  f"average speed {block.get('average_speed')} m/s")
+
+    if args.plots:
+        separation = trajectories.separation()
+        for session in trajectories.index['Session'].unique():
+            plot_session(trajectories, session, output_dir, args.profiles,
+                         stop_speed=args.stop_speed, segments=segments, separation=separation)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())